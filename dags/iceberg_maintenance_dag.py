@@ -0,0 +1,80 @@
+"""
+Iceberg Maintenance DAG - options lakehouse
+===========================================
+
+매 적재/ETL 실행이 bronze/silver/gold 테이블에 작은 파일과 스냅샷을 쌓으므로,
+테이블별 정책(`spark_jobs/iceberg_maintenance.py`의 POLICIES)에 따라 매일 다음을 실행합니다:
+
+1. rewrite_data_files (binpack 또는 sort, 최근 파티션만)
+2. rewrite_manifests
+3. expire_snapshots (증분 ETL 워터마크 스냅샷은 보존)
+4. remove_orphan_files
+
+테이블마다 태스크 하나이며, 태스크 로그에 before/after 파일 수와 planning 시간이 한 줄 JSON으로 남습니다.
+한 테이블이 실패해도 다음 테이블은 계속 진행합니다(trigger_rule=all_done).
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import datetime, timedelta
+
+from airflow import DAG
+
+try:
+    from airflow.providers.standard.operators.bash import BashOperator
+except ModuleNotFoundError:
+    from airflow.operators.bash import BashOperator
+
+# spark_jobs 패키지가 있는 레포 경로 (Airflow 워커 기준)
+REPO_DIR = os.getenv("LAKEHOUSE_REPO_DIR", "/opt/airflow/repo")
+REPORT_DIR = os.getenv("ICEBERG_MAINTENANCE_REPORT_DIR", "/opt/airflow/logs/iceberg_maintenance")
+
+# 적재(bronze) → ETL(silver) → 피처(gold) 순서: 같은 Spark 리소스를 두고 경쟁하지 않도록 순차 실행
+TABLE_ORDER = [
+    "bronze_ticks",
+    "bronze_codes",
+    "ingest_manifest",
+    "etl_watermarks",
+    "silver_ticks",
+    "dim_contract",
+    "gold_bars_1m",
+    "gold_features_1m",
+    "gold_labels_1m",
+]
+
+default_args = {
+    "owner": "airflow",
+    "depends_on_past": False,
+    "email_on_failure": False,
+    "email_on_retry": False,
+    "retries": 1,
+    "retry_delay": timedelta(minutes=5),
+    "execution_timeout": timedelta(hours=2),
+}
+
+
+with DAG(
+    dag_id="iceberg_table_maintenance",
+    default_args=default_args,
+    description="Iceberg compaction / manifest rewrite / snapshot expiry / orphan cleanup for lakehouse.options",
+    schedule="0 3 * * *",  # 장 마감 후 적재/ETL 이 끝난 새벽
+    start_date=datetime(2025, 12, 25),
+    catchup=False,
+    max_active_runs=1,
+    tags=["iceberg", "maintenance", "lakehouse"],
+) as dag:
+    prev = None
+    for name in TABLE_ORDER:
+        task = BashOperator(
+            task_id=f"maintain_{name}",
+            bash_command=(
+                f"mkdir -p '{REPORT_DIR}/{{{{ ds_nodash }}}}' && cd '{REPO_DIR}' && "
+                f"python -m spark_jobs.iceberg_maintenance --tables {name} "
+                f"--out '{REPORT_DIR}/{{{{ ds_nodash }}}}/{name}.json'"
+            ),
+            trigger_rule="all_done",
+        )
+        if prev is not None:
+            prev >> task
+        prev = task
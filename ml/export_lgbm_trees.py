@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import argparse
+import os
+import tempfile
+
+import mlflow
+from mlflow.tracking import MlflowClient
+
+from runtime.tree_eval import ARTIFACT_NAME, FlatTrees
+
+
+def export_flat_trees(booster, artifact_path: str = "model") -> str:
+    """Flatten ``booster`` and log it as ``{artifact_path}/flat_trees.npz`` in the active run.
+
+    Logged next to the MLmodel files, so it ships with the registered model
+    version and the runtime model cache (runtime/agent_runtime.py, tree_predict).
+    """
+    trees = FlatTrees.from_booster(booster)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, ARTIFACT_NAME)
+        trees.save(path)
+        mlflow.log_artifact(path, artifact_path=artifact_path)
+    return f"{artifact_path}/{ARTIFACT_NAME}"
+
+
+def main():
+    # 이미 등록된 버전에 flat_trees.npz 를 추가 (같은 run의 model/ 아래)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mlflow-uri", required=True)
+    ap.add_argument("--model-name", default="options_offlineA_lgbm")
+    ap.add_argument("--version", default=None, help="default: latest Production version")
+    args = ap.parse_args()
+
+    mlflow.set_tracking_uri(args.mlflow_uri)
+    client = MlflowClient()
+    if args.version:
+        mv = client.get_model_version(args.model_name, args.version)
+    else:
+        mv = client.get_latest_versions(args.model_name, stages=["Production"])[0]
+
+    model = mlflow.sklearn.load_model(f"models:/{args.model_name}/{mv.version}")
+    with mlflow.start_run(run_id=mv.run_id):
+        out = export_flat_trees(model.booster_)
+    print(f"OK: logged {out} to run {mv.run_id} (model version {mv.version})")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ import ray
 from ray import tune
 
 from spark_jobs.common_spark import build_spark
+from ml.export_lgbm_trees import export_flat_trees
 
 
 FEATURE_COLS = [
@@ -148,8 +149,10 @@ def main():
             artifact_path="model",
             signature=signature,
             input_example=X.head(5),
-            registered_model_name="options_offlineA_lgbm",
         )
+        # 런타임 tree_predict 용 평탄화 트리 배열을 model/ 아래에 같이 남긴 뒤 등록
+        export_flat_trees(model.booster_)
+        mlflow.register_model(f"runs:/{run.info.run_id}/model", "options_offlineA_lgbm")
 
     print("OK: logged and registered model to MLflow Registry (check MLflow UI)")
     ray.shutdown()
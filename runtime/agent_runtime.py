@@ -1,14 +1,24 @@
 from __future__ import annotations
 
+import argparse
 import os
 import time
 import json
+import threading
 from dataclasses import dataclass
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Sequence
 
-import redis
-import mlflow
-import pandas as pd
+import numpy as np
+
+from runtime.feature_codec import FeatureCodec
+from runtime.l1_cache import L1FeatureCache
+from runtime.metrics import StageMetrics
+from runtime.model_cache import ModelCache
+from runtime.tree_eval import ARTIFACT_NAME as FLAT_TREES_ARTIFACT, FlatTrees
+
+# redis / mlflow / pandas 는 모듈 import 비용이 커서 (mlflow 단독 수백 ms) 사용 시점에 import.
+# FEATURE_COLS, RuntimeConfig 만 필요한 모듈(replay, bench, sharded)과 DAG 파싱이 가벼워짐
+# (python -m runtime.bench_startup 으로 측정).
 
 
 @dataclass
@@ -18,6 +28,28 @@ class RuntimeConfig:
     model_stage: str = "Production"  # or "Staging"
     redis_host: str = "localhost"
     redis_port: int = 6379
+    # True면 pyfunc/pandas 대신 네이티브 LightGBM Booster + NumPy 버퍼로 예측
+    fast_predict: bool = False
+    # True면 Booster 대신 평탄화 트리 배열(flat_trees.npz) 평가기로 예측 (fast_predict 포함).
+    # 배포 모델에서 `bench_runtime trees` 가 Booster 보다 빠를 때만 켤 것
+    tree_predict: bool = False
+    # > 0 이면 백그라운드 스레드가 N초마다 model_stage 버전을 확인해 핫리로드 (3B 전략)
+    reload_interval_s: float = 0.0
+    warmup_predictions: int = 3
+    # 로컬 모델 아티팩트 캐시 (None이면 매번 MLflow에서 다운로드)
+    model_cache_dir: Optional[str] = None
+    model_cache_max_versions: int = 3
+    # True면 레지스트리에 접속하지 않고 캐시의 마지막 model_stage 모델로 시작
+    offline: bool = False
+    # run_once 단계별 지연 계측 (metrics_port가 있으면 Prometheus /metrics 노출)
+    metrics: bool = False
+    metrics_port: Optional[int] = None
+    # > 0 이면 Redis 앞단 프로세스 내 L1 캐시 (바 경계 TTL + LRU + pub/sub 무효화)
+    l1_cache_size: int = 0
+    l1_invalidate_channel: str = "options:features"
+    # 설정 시 모든 결정을 백그라운드 Parquet 로그로 기록 (runtime/decision_log.py)
+    decision_log_dir: Optional[str] = None
+    decision_log_on_full: str = "drop"  # "drop" | "block"
 
 
 FEATURE_COLS = [
@@ -31,40 +63,311 @@ FEATURE_COLS = [
 ]
 
 
+def _no_clock() -> float:
+    return 0.0
+
+
+def _extract_booster(pyfunc_model):
+    """Pull the native LightGBM Booster out of a loaded pyfunc model.
+
+    options_offlineA_lgbm is logged with the sklearn flavor (LGBMRegressor),
+    so the raw model exposes ``booster_``; a plain Booster is returned as is.
+    """
+    try:
+        raw = pyfunc_model.get_raw_model()
+    except (AttributeError, NotImplementedError):
+        raw = getattr(pyfunc_model._model_impl, "sklearn_model", pyfunc_model._model_impl)
+
+    booster = getattr(raw, "booster_", raw)
+    if not hasattr(booster, "num_trees"):
+        raise TypeError(f"fast_predict requires a LightGBM model, got {type(raw).__name__}")
+    return booster
+
+
+@dataclass(frozen=True)
+class LoadedModel:
+    # 한 번에 교체되는 단위: 레지스트리 버전 + pyfunc 모델 + (fast_predict 시) Booster
+    version: Optional[str]
+    model: Any
+    booster: Any = None
+    trees: Optional[FlatTrees] = None
+
+    @property
+    def native(self):
+        # pandas 없이 ndarray를 받는 예측기: flat trees > Booster > 없음(pyfunc)
+        return self.trees if self.trees is not None else self.booster
+
+
 class TradingAgent:
     def __init__(self, cfg: RuntimeConfig):
+        import mlflow
+        import redis
+
         self.cfg = cfg
-        self.r = redis.Redis(host=cfg.redis_host, port=cfg.redis_port, decode_responses=True)
+        # 값은 바이너리 피처 코덱(또는 기존 JSON)이므로 bytes 그대로 받습니다.
+        self.r = redis.Redis(host=cfg.redis_host, port=cfg.redis_port, decode_responses=False)
+        self.codec = FeatureCodec(FEATURE_COLS)
+        self.l1: Optional[L1FeatureCache] = None
+        if cfg.l1_cache_size > 0:
+            self.l1 = L1FeatureCache(max_entries=cfg.l1_cache_size)
+            self.l1.start_invalidation(self.r, cfg.l1_invalidate_channel)
 
         mlflow.set_tracking_uri(cfg.mlflow_uri)
-        self.model = self._load_model()
+        self.model_cache = (
+            ModelCache(cfg.model_cache_dir, max_versions=cfg.model_cache_max_versions)
+            if cfg.model_cache_dir else None
+        )
+        if cfg.offline:
+            self.active = self._load_cached_model()
+        else:
+            self.active = self._load_model(self._resolve_model_version())
+        self.previous: Optional[LoadedModel] = None
+        self._rejected_version: Optional[str] = None
+        self._swap_lock = threading.Lock()
+
+        # fast_predict: 단일 행 버퍼를 미리 할당
+        # (버퍼를 재사용하므로 한 에이전트 인스턴스를 여러 스레드에서 공유하지 않습니다)
+        self._x1 = np.empty((1, len(FEATURE_COLS)), dtype=np.float64)
+
+        # 비활성 시 None: run_once 오버헤드는 None 검사 1회
+        self.metrics: Optional[StageMetrics] = None
+        if cfg.metrics or cfg.metrics_port is not None:
+            self.metrics = StageMetrics(port=cfg.metrics_port)
+
+        self.decision_log = None
+        if cfg.decision_log_dir:
+            self.open_decision_log(cfg.decision_log_dir)
+
+        self._stop_reload = threading.Event()
+        self._reload_thread: Optional[threading.Thread] = None
+        if cfg.reload_interval_s > 0 and not cfg.offline:
+            self._reload_thread = threading.Thread(
+                target=self._reload_loop, name="model-reload", daemon=True
+            )
+            self._reload_thread.start()
+
+    def open_decision_log(self, out_dir: str, name: str = "decisions") -> None:
+        """Start a decision log writer for this process (forked workers call this after fork)."""
+        from runtime.decision_log import DecisionLogWriter
 
-    def _load_model(self):
+        self.decision_log = DecisionLogWriter(out_dir, on_full=self.cfg.decision_log_on_full, name=name)
+
+    @property
+    def model(self):
+        return self.active.model
+
+    @property
+    def booster(self):
+        return self.active.booster
+
+    def _resolve_model_version(self):
+        # model_stage의 현재 ModelVersion (레지스트리 조회 실패 시 None → stage URI로 로드)
+        import mlflow
+
+        try:
+            client = mlflow.MlflowClient()
+            mvs = client.get_latest_versions(self.cfg.model_name, stages=[self.cfg.model_stage])
+        except Exception:
+            return None
+        return mvs[0] if mvs else None
+
+    def _load_model(self, mv=None) -> LoadedModel:
         # Load model from MLflow Registry (stage)
         # Example URI:
         #   models:/options_offlineA_lgbm/Production
-        uri = f"models:/{self.cfg.model_name}/{self.cfg.model_stage}"
+        #   models:/options_offlineA_lgbm/12      (핫리로드 시 버전 고정)
+        if mv is not None and self.model_cache is not None:
+            entry = self.model_cache.fetch(
+                self.cfg.model_name, mv.version, mv.run_id, stage=self.cfg.model_stage
+            )
+            return self._load_from_path(entry.path, mv.version)
+
+        version = mv.version if mv is not None else None
+        ref = version if version is not None else self.cfg.model_stage
+        return self._load_from_path(f"models:/{self.cfg.model_name}/{ref}", version)
+
+    def _load_cached_model(self) -> LoadedModel:
+        # offline: 캐시에 마지막으로 기록된 model_stage 버전으로 시작
+        if self.model_cache is None:
+            raise ValueError("offline mode requires model_cache_dir")
+        entry = self.model_cache.latest(self.cfg.model_name, self.cfg.model_stage)
+        return self._load_from_path(entry.path, entry.version)
+
+    def _load_from_path(self, uri: str, version: Optional[str]) -> LoadedModel:
+        import mlflow.pyfunc
+
         model = mlflow.pyfunc.load_model(uri)
-        return model
+        booster = None
+        if self.cfg.fast_predict or self.cfg.tree_predict:
+            booster = _extract_booster(model)
+        trees = None
+        if self.cfg.tree_predict:
+            # ml/export_lgbm_trees.py 가 남긴 배열만 사용 (배열 로드뿐). 리로드 스레드에서 Booster 를
+            # 평탄화하면 수 초간 GIL 을 잡으므로, 아티팩트가 없거나 오래된 형식이면 Booster 로 예측
+            local = self._flat_trees_artifact(uri)
+            try:
+                trees = FlatTrees.load(local) if local else None
+            except ValueError as e:
+                print(json.dumps({"event": "flat_trees_unusable", "version": version, "error": str(e)}))
+            if trees is None:
+                print(json.dumps({"event": "flat_trees_fallback_booster", "version": version}))
+        return LoadedModel(version=version, model=model, booster=booster, trees=trees)
+
+    @staticmethod
+    def _flat_trees_artifact(uri: str) -> Optional[str]:
+        # 로컬 모델 디렉터리(캐시)는 그대로, models:/ URI는 flat_trees.npz 하나만 다운로드
+        local = os.path.join(uri, FLAT_TREES_ARTIFACT)
+        if os.path.isfile(local):
+            return local
+        if os.path.isdir(uri):
+            return None
+        import mlflow.artifacts
 
-    def _get_features_from_cache(self, key: str) -> Optional[Dict[str, float]]:
-        v = self.r.get(key)
-        if v is None:
+        try:
+            return mlflow.artifacts.download_artifacts(artifact_uri=f"{uri}/{FLAT_TREES_ARTIFACT}")
+        except Exception:
+            # export 전에 등록된 버전: 아티팩트 없음
             return None
-        return json.loads(v)
+
+    def _warm_up(self, m: LoadedModel) -> None:
+        # 더미 예측으로 지연 초기화를 끝내고 출력이 유한한지 검증 (실패 시 ValueError)
+        import pandas as pd
+
+        x = np.zeros((1, len(FEATURE_COLS)), dtype=np.float64)
+        df = pd.DataFrame(x, columns=FEATURE_COLS)
+        for _ in range(max(1, self.cfg.warmup_predictions)):
+            preds = [np.asarray(m.model.predict(df), dtype=np.float64)]
+            if m.booster is not None:
+                preds.append(np.asarray(m.booster.predict(x), dtype=np.float64))
+            if m.trees is not None:
+                preds.append(np.asarray(m.trees.predict(x), dtype=np.float64))
+            for p in preds:
+                if p.shape[0] != 1 or not np.all(np.isfinite(p)):
+                    raise ValueError(f"model version {m.version} failed warm-up validation: {p!r}")
+            if any(p[0] != preds[0][0] for p in preds[1:]):
+                raise ValueError(f"model version {m.version}: native predict differs from pyfunc: {preds!r}")
+
+    def load_candidate(self, mv) -> LoadedModel:
+        """Load and warm up ``mv`` without touching the active model (ValueError if invalid)."""
+        candidate = self._load_model(mv)
+        self._warm_up(candidate)
+        return candidate
+
+    def swap(self, candidate: LoadedModel) -> None:
+        # hot path 는 self.active 참조 하나만 읽으므로 교체는 대입 1회
+        with self._swap_lock:
+            self.previous, self.active = self.active, candidate
+
+    def check_for_update(self) -> bool:
+        """Load and swap in a new ``model_stage`` version if one was promoted.
+
+        Loading and warm-up happen on the caller's thread; the hot path only
+        ever sees the single ``self.active`` reference flip. A version that
+        fails validation is not swapped in and is not retried.
+        """
+        mv = self._resolve_model_version()
+        if mv is None or mv.version in (self.active.version, self._rejected_version):
+            return False
+
+        version = mv.version
+        try:
+            candidate = self.load_candidate(mv)
+        except Exception:
+            self._rejected_version = version
+            raise
+
+        self.swap(candidate)
+        print(json.dumps({"event": "model_swapped", "from": self.previous.version, "to": version}))
+        return True
+
+    def rollback(self) -> None:
+        """Instantly swap back to the previously active model."""
+        with self._swap_lock:
+            if self.previous is None:
+                raise RuntimeError("no previous model to roll back to")
+            self._rejected_version = self.active.version
+            self.active, self.previous = self.previous, self.active
+        print(json.dumps({"event": "model_rolled_back", "to": self.active.version}))
+
+    def _reload_loop(self) -> None:
+        while not self._stop_reload.wait(self.cfg.reload_interval_s):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                # 로딩/검증 실패: 기존 모델로 계속 서비스
+                print(json.dumps({"event": "model_reload_failed", "error": str(e)}))
+
+    def close(self) -> None:
+        if self.l1 is not None:
+            self.l1.stop()
+        self._stop_reload.set()
+        if self._reload_thread is not None:
+            self._reload_thread.join()
+        if self.decision_log is not None:
+            self.decision_log.close()
+
+    def _get_features_batch_from_cache(self, keys: Sequence[str]) -> List[Optional[Dict[str, float]]]:
+        # MGET: 키 N개를 1회 왕복으로 조회 (없는 키는 None)
+        if not keys:
+            return []
+        decode = self.codec.decode
+        l1 = self.l1
+        if l1 is None:
+            return [None if v is None else decode(v) for v in self.r.mget(keys)]
+
+        # L1 미스만 MGET
+        out: List[Optional[Dict[str, float]]] = [l1.get(k) for k in keys]
+        miss = [i for i, f in enumerate(out) if f is None]
+        if miss:
+            token = l1.token()
+            for i, v in zip(miss, self.r.mget([keys[i] for i in miss])):
+                if v is not None:
+                    out[i] = decode(v)
+                    l1.put(keys[i], out[i], token)
+        return out
 
     def predict(self, feature_dict: Dict[str, float]) -> float:
+        if self.active.native is not None:
+            return self.predict_fast(feature_dict)
+        return self.predict_pyfunc(feature_dict)
+
+    def predict_pyfunc(self, feature_dict: Dict[str, float]) -> float:
+        import pandas as pd
+
         df = pd.DataFrame([feature_dict], columns=FEATURE_COLS)
         pred = float(self.model.predict(df)[0])
         return pred
 
-    def run_once(self, key: str) -> Dict[str, Any]:
-        feat = self._get_features_from_cache(key)
-        if feat is None:
-            return {"ok": False, "reason": "no_features_in_cache", "key": key}
+    def _fill_row(self, feature_dict: Dict[str, float]) -> np.ndarray:
+        x = self._x1
+        for j, col in enumerate(FEATURE_COLS):
+            v = feature_dict.get(col)
+            x[0, j] = np.nan if v is None else v
+        return x
+
+    def predict_fast(self, feature_dict: Dict[str, float]) -> float:
+        native = self.active.native
+        return float(native.predict(self._fill_row(feature_dict))[0])
+
+    def predict_batch(self, feature_dicts: Sequence[Dict[str, float]]) -> np.ndarray:
+        # (N, len(FEATURE_COLS)) 행렬을 FEATURE_COLS 순서로 채워 predict 1회 호출
+        m = self.active
+        x = np.empty((len(feature_dicts), len(FEATURE_COLS)), dtype=np.float64)
+        for i, feat in enumerate(feature_dicts):
+            for j, col in enumerate(FEATURE_COLS):
+                v = feat.get(col)
+                x[i, j] = np.nan if v is None else v
+        native = m.native
+        if native is not None:
+            return np.asarray(native.predict(x), dtype=np.float64).reshape(-1)
+        import pandas as pd
 
+        df = pd.DataFrame(x, columns=FEATURE_COLS)
+        return np.asarray(m.model.predict(df), dtype=np.float64).reshape(-1)
+
+    @staticmethod
+    def _decide(key: str, pred: float) -> Dict[str, Any]:
         # Minimal risk gate placeholder
-        pred = self.predict(feat)
         decision = "HOLD"
         if pred > 0.001:
             decision = "BUY"
@@ -78,19 +381,160 @@ class TradingAgent:
             "decision": decision,
         }
 
+    def run_once(self, key: str) -> Dict[str, Any]:
+        # 계측 여부와 무관하게 같은 본문: metrics 가 없으면 시계 호출은 0을 반환하는 no-op
+        # (L1 사용 시 fetch에 L1 조회 포함, L1 히트면 decode는 0)
+        metrics = self.metrics
+        pc = time.perf_counter if metrics is not None else _no_clock
+        t0 = pc()
+        l1 = self.l1
+        feat = l1.get(key) if l1 is not None else None
+        if feat is not None:
+            t1 = t2 = pc()
+        else:
+            token = l1.token() if l1 is not None else None
+            v = self.r.get(key)
+            t1 = pc()
+            if v is None:
+                return self._log({"ok": False, "reason": "no_features_in_cache", "key": key})
+            feat = self.codec.decode(v)
+            if l1 is not None:
+                l1.put(key, feat, token)
+            t2 = pc()
+        m = self.active
+        native = m.native
+        if native is not None:
+            x = self._fill_row(feat)
+            t3 = pc()
+            pred = float(native.predict(x)[0])
+        else:
+            import pandas as pd
+
+            df = pd.DataFrame([feat], columns=FEATURE_COLS)
+            t3 = pc()
+            pred = float(m.model.predict(df)[0])
+        t4 = pc()
+        out = self._log(self._decide(key, pred))
+        if metrics is not None:
+            metrics.observe(t1 - t0, t2 - t1, t3 - t2, t4 - t3, pc() - t4)
+        return out
+
+    def _log(self, out: Dict[str, Any]) -> Dict[str, Any]:
+        # 큐에 넣기만 하고 반환 (쓰기는 백그라운드 스레드)
+        if self.decision_log is not None:
+            self.decision_log.log(out, self.active.version)
+        return out
+
+    def run_batch(self, keys: Sequence[str]) -> List[Dict[str, Any]]:
+        """Score many feature keys (e.g. a whole option chain) in one pass.
+
+        Returns one decision dict per key, in input order, identical in shape
+        to ``run_once``. Missing keys are marked ``no_features_in_cache``.
+        """
+        return self.score_batch(keys, self._get_features_batch_from_cache(keys))
+
+    def score_batch(
+        self, keys: Sequence[str], feats: Sequence[Optional[Dict[str, float]]]
+    ) -> List[Dict[str, Any]]:
+        # 이미 조회한 피처(없으면 None)로 결정만 계산 (async 런타임과 공유)
+        hit_idx = [i for i, f in enumerate(feats) if f is not None]
+
+        out: List[Dict[str, Any]] = [
+            {"ok": False, "reason": "no_features_in_cache", "key": k} for k in keys
+        ]
+        if hit_idx:
+            preds = self.predict_batch([feats[i] for i in hit_idx])
+            for i, pred in zip(hit_idx, preds):
+                out[i] = self._decide(keys[i], float(pred))
+        if self.decision_log is not None:
+            version = self.active.version
+            for o in out:
+                self.decision_log.log(o, version)
+        return out
+
+
+def bench(agent: TradingAgent, n: int) -> Dict[str, Any]:
+    """Replay ``n`` run_once calls over the options:* keys in Redis.
+
+    Seeds synthetic keys (see runtime/bench_runtime.py) if none exist.
+    """
+    from runtime.bench_runtime import seed_redis, synth_chain_keys
+
+    keys = []
+    for k in agent.r.scan_iter(match="options:*", count=1000):
+        keys.append(k.decode())
+        if len(keys) >= n:
+            break
+    if not keys:
+        keys = synth_chain_keys(min(n, 400))
+        seed_redis(agent, keys)
+
+    agent.metrics = StageMetrics(keep_samples=True)
+    for i in range(n):
+        agent.run_once(keys[i % len(keys)])
+    out: Dict[str, Any] = {"n": n, "distinct_keys": len(keys), "stages": agent.metrics.percentiles()}
+    if agent.l1 is not None:
+        out["l1"] = agent.l1.stats()
+    return out
+
+
+def add_cache_and_log_args(ap: argparse.ArgumentParser, l1: bool = True) -> None:
+    """L1 cache / decision log flags shared by the runtime CLIs (env defaults for deployments)."""
+    if l1:
+        ap.add_argument("--l1-cache-size", type=int, default=int(os.environ.get("RUNTIME_L1_CACHE_SIZE", "0")),
+                        help="in-process L1 feature cache entries, 0 = off [RUNTIME_L1_CACHE_SIZE]")
+        ap.add_argument("--l1-invalidate-channel",
+                        default=os.environ.get("RUNTIME_L1_INVALIDATE_CHANNEL", RuntimeConfig.l1_invalidate_channel),
+                        help="pub/sub channel for L1 invalidation [RUNTIME_L1_INVALIDATE_CHANNEL]")
+    ap.add_argument("--decision-log-dir", default=os.environ.get("RUNTIME_DECISION_LOG_DIR") or None,
+                    help="write every decision to Parquet files here [RUNTIME_DECISION_LOG_DIR]")
+    ap.add_argument("--decision-log-on-full", choices=["drop", "block"],
+                    default=os.environ.get("RUNTIME_DECISION_LOG_ON_FULL", RuntimeConfig.decision_log_on_full),
+                    help="decision log queue-full policy [RUNTIME_DECISION_LOG_ON_FULL]")
+
 
 def main():
-    cfg = RuntimeConfig()
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bench", type=int, default=0, metavar="N",
+                    help="replay N keys and print p50/p95/p99 per run_once stage")
+    ap.add_argument("--metrics-port", type=int, default=None)
+    add_cache_and_log_args(ap)
+    args = ap.parse_args()
+
+    cfg = RuntimeConfig(
+        fast_predict=os.environ.get("RUNTIME_FAST_PREDICT", "0") == "1",
+        tree_predict=os.environ.get("RUNTIME_TREE_PREDICT", "0") == "1",
+        model_cache_dir=os.environ.get("RUNTIME_MODEL_CACHE_DIR") or None,
+        offline=os.environ.get("RUNTIME_OFFLINE", "0") == "1",
+        metrics_port=args.metrics_port,
+        l1_cache_size=args.l1_cache_size,
+        l1_invalidate_channel=args.l1_invalidate_channel,
+        decision_log_dir=args.decision_log_dir,
+        decision_log_on_full=args.decision_log_on_full,
+    )
     agent = TradingAgent(cfg)
+    try:
+        _run_main(agent, args)
+    finally:
+        # 결정 로그의 남은 큐를 비우고 파일을 닫음
+        agent.close()
+
+
+def _run_main(agent: TradingAgent, args) -> None:
+    if args.bench:
+        print(json.dumps(bench(agent, args.bench), ensure_ascii=False, indent=2))
+        return
 
     # Example key:
     #  options:202601:CALL:B0161530:530:2025-12-01T10:05:00Z
+    # 여러 키는 콤마로 구분하면 run_batch(MGET + predict 1회)로 처리합니다.
     key = os.environ.get("RUNTIME_FEATURE_KEY", "")
     if not key:
-        print("Set env RUNTIME_FEATURE_KEY to a Redis key that contains feature JSON.")
+        print("Set env RUNTIME_FEATURE_KEY to a Redis key that contains features.")
         return
 
-    out = agent.run_once(key)
+    keys = [k.strip() for k in key.split(",") if k.strip()]
+    out = agent.run_once(keys[0]) if len(keys) == 1 else agent.run_batch(keys)
     print(json.dumps(out, ensure_ascii=False, indent=2))
 
 
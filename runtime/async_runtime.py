@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import signal
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import redis.asyncio as aioredis
+
+from runtime.agent_runtime import RuntimeConfig, TradingAgent, add_cache_and_log_args
+
+
+@dataclass
+class AsyncRuntimeConfig:
+    # "keyspace": Redis keyspace notification (__keyspace@{db}__:options:*)
+    # "channel":  writer가 PUBLISH {channel} {key} 로 새 키를 알림
+    source: str = "keyspace"
+    channel: str = "options:features"
+    key_pattern: str = "options:*"
+    redis_db: int = 0
+    configure_notify: bool = False  # True면 CONFIG SET notify-keyspace-events K$
+    workers: int = 4                # 동시에 진행 중인 MGET/스코어링 수 상한
+    queue_size: int = 10_000        # 가득 차면 구독 수신을 멈춰 backpressure
+    max_batch: int = 256            # 워커 1회당 최대 키 수 (MGET 1회)
+
+
+async def notification_batches(r, cfg: AsyncRuntimeConfig, stop: asyncio.Event) -> AsyncIterator[List[str]]:
+    """Yield batches of updated keys from ``cfg.source`` until ``stop`` is set.
+
+    Waits up to 0.5s for the first message, then drains whatever is already
+    buffered (up to ``cfg.max_batch``) without waiting.
+    """
+    pubsub = r.pubsub()
+    if cfg.source == "keyspace":
+        if cfg.configure_notify:
+            await r.config_set("notify-keyspace-events", "K$")
+        prefix = f"__keyspace@{cfg.redis_db}__:"
+        await pubsub.psubscribe(prefix + cfg.key_pattern)
+    elif cfg.source == "channel":
+        prefix = ""
+        await pubsub.subscribe(cfg.channel)
+    else:
+        raise ValueError(f"unknown source: {cfg.source}")
+
+    try:
+        while not stop.is_set():
+            keys: List[str] = []
+            timeout = 0.5
+            while len(keys) < cfg.max_batch:
+                msg = await pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+                if msg is None:
+                    break
+                timeout = 0.0
+                if prefix:
+                    # keyspace: channel=__keyspace@0__:<key>, data=<event>
+                    if msg["data"] != b"set":
+                        continue
+                    keys.append(msg["channel"][len(prefix):].decode())
+                else:
+                    keys.append(msg["data"].decode())
+            if keys:
+                yield keys
+    finally:
+        await pubsub.aclose()
+
+
+class AsyncAgentRuntime:
+    """Event-driven scoring loop: Redis notification -> queue -> batched scoring.
+
+    The subscriber awaits ``queue.put`` when the queue is full, so a slow
+    scorer stops the reader instead of growing memory. Workers drain up to
+    ``max_batch`` keys at a time, fetch them with one async MGET and score
+    them with ``TradingAgent.score_batch`` on the event loop thread (the
+    agent's predict buffers are not shared across threads).
+    """
+
+    def __init__(
+        self,
+        agent: TradingAgent,
+        cfg: AsyncRuntimeConfig,
+        on_decision: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ):
+        self.agent = agent
+        self.cfg = cfg
+        self.on_decision = on_decision or _print_decision
+        self.r = aioredis.Redis(
+            host=agent.cfg.redis_host,
+            port=agent.cfg.redis_port,
+            db=cfg.redis_db,
+            decode_responses=False,
+        )
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=cfg.queue_size)
+        self._stop = asyncio.Event()
+        self.stats = {"received": 0, "scored": 0, "missing": 0, "batches": 0, "errors": 0}
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def _subscribe(self) -> None:
+        async for keys in notification_batches(self.r, self.cfg, self._stop):
+            for key in keys:
+                self.stats["received"] += 1
+                await self.queue.put(key)  # backpressure
+
+    async def _worker(self) -> None:
+        while True:
+            key = await self.queue.get()
+            keys = [key]
+            while len(keys) < self.cfg.max_batch:
+                try:
+                    keys.append(self.queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+            try:
+                raw = await self.r.mget(keys)
+                decode = self.agent.codec.decode
+                feats = [None if v is None else decode(v) for v in raw]
+                for out in self.agent.score_batch(keys, feats):
+                    self.stats["scored" if out["ok"] else "missing"] += 1
+                    self.on_decision(out)
+                self.stats["batches"] += 1
+            except Exception as e:  # Redis 장애 등: 배치를 버리고 루프는 유지
+                self.stats["errors"] += 1
+                print(json.dumps({"ok": False, "reason": f"batch_failed: {e}", "n_keys": len(keys)}))
+            finally:
+                for _ in keys:
+                    self.queue.task_done()
+
+    async def run(self) -> Dict[str, int]:
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.cfg.workers)]
+        try:
+            await self._subscribe()
+            # graceful shutdown: 수신 중단 후 큐에 남은 키는 모두 처리
+            await self.queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await self.r.aclose()
+        return self.stats
+
+
+def _print_decision(out: Dict[str, Any]) -> None:
+    print(json.dumps(out, ensure_ascii=False))
+
+
+async def _amain(rt: AsyncAgentRuntime) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, rt.stop)
+
+    t0 = time.perf_counter()
+    stats = await rt.run()
+    stats_out: Dict[str, Any] = dict(stats, elapsed_s=time.perf_counter() - t0)
+    print(json.dumps(stats_out, ensure_ascii=False))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", default="keyspace", choices=["keyspace", "channel"])
+    ap.add_argument("--channel", default=AsyncRuntimeConfig.channel)
+    ap.add_argument("--key-pattern", default=AsyncRuntimeConfig.key_pattern)
+    ap.add_argument("--configure-notify", action="store_true")
+    ap.add_argument("--workers", type=int, default=AsyncRuntimeConfig.workers)
+    ap.add_argument("--queue-size", type=int, default=AsyncRuntimeConfig.queue_size)
+    ap.add_argument("--max-batch", type=int, default=AsyncRuntimeConfig.max_batch)
+    ap.add_argument("--fast-predict", action="store_true")
+    ap.add_argument("--tree-predict", action="store_true", help="use flat_trees.npz evaluator (only if bench_runtime trees beats Booster)")
+    ap.add_argument("--reload-interval-s", type=float, default=300.0)
+    ap.add_argument("--model-cache-dir", default=None)
+    ap.add_argument("--offline", action="store_true")
+    # L1 은 run_once/run_batch 경로용 (async 워커는 MGET 을 직접 호출)
+    add_cache_and_log_args(ap, l1=False)
+    args = ap.parse_args()
+
+    agent = TradingAgent(RuntimeConfig(
+        fast_predict=args.fast_predict,
+        tree_predict=args.tree_predict,
+        reload_interval_s=args.reload_interval_s,
+        model_cache_dir=args.model_cache_dir,
+        offline=args.offline,
+        decision_log_dir=args.decision_log_dir,
+        decision_log_on_full=args.decision_log_on_full,
+    ))
+    rt = AsyncAgentRuntime(
+        agent,
+        AsyncRuntimeConfig(
+            source=args.source,
+            channel=args.channel,
+            key_pattern=args.key_pattern,
+            configure_notify=args.configure_notify,
+            workers=args.workers,
+            queue_size=args.queue_size,
+            max_batch=args.max_batch,
+        ),
+    )
+    try:
+        asyncio.run(_amain(rt))
+    finally:
+        agent.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from typing import List
+
+from runtime.agent_runtime import FEATURE_COLS, RuntimeConfig, TradingAgent
+from runtime.feature_codec import FeatureCodec, write_features
+
+
+# 벤치마크용 합성 피처 키 (실제 키 포맷과 동일)
+#  options:{ymcode}:{side}:{code}:{strike}:{asof_ts}
+def synth_chain_keys(n_keys: int, asof_ts: str = "2025-12-01T10:05:00Z") -> List[str]:
+    keys = []
+    for i in range(n_keys):
+        ymcode = f"2026{(i // 200) % 12 + 1:02d}"
+        side = "CALL" if i % 2 == 0 else "PUT"
+        strike = 400 + (i // 2) % 100 * 5
+        code = f"B{'0' if side == 'CALL' else '1'}16{ymcode[-2:]}{strike:03d}"
+        keys.append(f"options:{ymcode}:{side}:{code}:{strike}:{asof_ts}")
+    return keys
+
+
+def synth_features(rng: random.Random) -> dict:
+    return {c: rng.gauss(0.0, 0.01) for c in FEATURE_COLS}
+
+
+def seed_redis(agent: TradingAgent, keys: List[str], seed: int = 42) -> None:
+    rng = random.Random(seed)
+    pipe = agent.r.pipeline(transaction=False)
+    for k in keys:
+        write_features(pipe, agent.codec, k, synth_features(rng), k.split(":", 5)[5])
+    pipe.execute()
+
+
+def _timeit(fn, repeat: int) -> List[float]:
+    out = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        out.append((time.perf_counter() - t0) * 1000.0)
+    return out
+
+
+def _pct(xs: List[float], p: float) -> float:
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(p / 100.0 * (len(xs) - 1))))]
+
+
+def bench_batch(agent: TradingAgent, n_keys: int, repeat: int) -> dict:
+    """Chain-wide latency: per-key run_once loop vs one run_batch call."""
+    keys = synth_chain_keys(n_keys)
+    seed_redis(agent, keys)
+
+    loop_ms = _timeit(lambda: [agent.run_once(k) for k in keys], repeat)
+    batch_ms = _timeit(lambda: agent.run_batch(keys), repeat)
+
+    # 동일 결정인지 확인
+    a = [agent.run_once(k) for k in keys]
+    b = agent.run_batch(keys)
+    max_abs_diff = max(abs(x["pred"] - y["pred"]) for x, y in zip(a, b))
+    same_decision = all(x["decision"] == y["decision"] for x, y in zip(a, b))
+
+    return {
+        "n_keys": n_keys,
+        "repeat": repeat,
+        "loop_p50_ms": _pct(loop_ms, 50),
+        "loop_p99_ms": _pct(loop_ms, 99),
+        "batch_p50_ms": _pct(batch_ms, 50),
+        "batch_p99_ms": _pct(batch_ms, 99),
+        "speedup_p50": _pct(loop_ms, 50) / max(_pct(batch_ms, 50), 1e-9),
+        "max_abs_pred_diff": max_abs_diff,
+        "same_decision": same_decision,
+    }
+
+
+def bench_predict(agent: TradingAgent, n_calls: int, tol: float = 1e-12) -> dict:
+    """Single-row predict: pyfunc/pandas path vs native booster + NumPy buffer.
+
+    Also checks parity (max |pyfunc - fast|) on the same random rows.
+    """
+    if agent.booster is None:
+        raise SystemExit("bench predict requires fast_predict=True")
+
+    rng = random.Random(7)
+    rows = [synth_features(rng) for _ in range(n_calls)]
+
+    max_abs_diff = max(abs(agent.predict_pyfunc(f) - agent.predict_fast(f)) for f in rows[:200])
+
+    def per_call(fn) -> List[float]:
+        out = []
+        for f in rows:
+            t0 = time.perf_counter()
+            fn(f)
+            out.append((time.perf_counter() - t0) * 1e6)
+        return out
+
+    pyfunc_us = per_call(agent.predict_pyfunc)
+    fast_us = per_call(agent.predict_fast)
+
+    return {
+        "n_calls": n_calls,
+        "parity_ok": max_abs_diff <= tol,
+        "max_abs_pred_diff": max_abs_diff,
+        "pyfunc_p50_us": _pct(pyfunc_us, 50),
+        "pyfunc_p99_us": _pct(pyfunc_us, 99),
+        "fast_p50_us": _pct(fast_us, 50),
+        "fast_p99_us": _pct(fast_us, 99),
+        "speedup_p50": _pct(pyfunc_us, 50) / max(_pct(fast_us, 50), 1e-9),
+    }
+
+
+def bench_trees(agent: TradingAgent, n_rows: int, repeat: int, sizes=(1, 8, 64)) -> dict:
+    """Flat tree evaluator vs Booster.predict (= predict_fast): exact parity and latency per batch size.
+
+    Parity rows include NaN and exact zeros so missing-value routing is exercised.
+    ``use_tree_predict`` is true only if the flat trees are faster at every size.
+    """
+    import numpy as np
+
+    if agent.active.trees is None:
+        raise SystemExit("bench trees requires tree_predict=True")
+    booster, trees = agent.active.booster, agent.active.trees
+
+    rng = np.random.default_rng(13)
+    x = rng.normal(0.0, 0.01, size=(n_rows, len(FEATURE_COLS)))
+    x[rng.random(x.shape) < 0.05] = np.nan
+    x[rng.random(x.shape) < 0.05] = 0.0
+    max_abs_diff = float(np.max(np.abs(booster.predict(x) - trees.predict(x))))
+
+    out = {
+        "n_rows": n_rows,
+        "repeat": repeat,
+        "num_trees": trees.num_trees,
+        "max_depth": int(trees.arrays["max_depth"]),
+        "parity_exact": max_abs_diff == 0.0,
+        "max_abs_pred_diff": max_abs_diff,
+    }
+    for n in sizes:
+        xb = np.ascontiguousarray(x[:n])
+        b_ms = _timeit(lambda: booster.predict(xb), repeat)
+        t_ms = _timeit(lambda: trees.predict(xb), repeat)
+        out[f"booster_p50_us_n{n}"] = _pct(b_ms, 50) * 1000.0
+        out[f"trees_p50_us_n{n}"] = _pct(t_ms, 50) * 1000.0
+        out[f"speedup_p50_n{n}"] = _pct(b_ms, 50) / max(_pct(t_ms, 50), 1e-12)
+    out["use_tree_predict"] = out["parity_exact"] and all(out[f"speedup_p50_n{n}"] > 1.0 for n in sizes)
+    return out
+
+
+def bench_reload(agent: TradingAgent, n_keys: int, n_calls: int, reloads: int) -> dict:
+    """run_once latency at steady state vs while a background thread reloads the model.
+
+    The reload thread runs the same load + warm-up + swap as ``check_for_update``
+    (re-loading the current ``model_stage`` version ``reloads`` times), so any
+    GIL contention from MLflow loading / tree flattening shows up in p99/max.
+    """
+    import threading
+
+    keys = synth_chain_keys(n_keys)
+    seed_redis(agent, keys)
+    for k in keys:
+        agent.run_once(k)
+
+    def per_call(done) -> List[float]:
+        out: List[float] = []
+        while not done(len(out)):
+            t0 = time.perf_counter()
+            agent.run_once(keys[len(out) % len(keys)])
+            out.append((time.perf_counter() - t0) * 1e6)
+        return out
+
+    steady_us = per_call(lambda n: n >= n_calls)
+
+    mv = agent._resolve_model_version()
+    reload_s: List[float] = []
+
+    def reload_loop():
+        for _ in range(reloads):
+            t0 = time.perf_counter()
+            agent.swap(agent.load_candidate(mv))
+            reload_s.append(time.perf_counter() - t0)
+
+    th = threading.Thread(target=reload_loop, name="bench-reload")
+    th.start()
+    during_us = per_call(lambda n: not th.is_alive())
+    th.join()
+
+    return {
+        "n_keys": n_keys,
+        "reloads": reloads,
+        "reload_s_mean": sum(reload_s) / max(len(reload_s), 1),
+        "steady_calls": len(steady_us),
+        "steady_p50_us": _pct(steady_us, 50),
+        "steady_p99_us": _pct(steady_us, 99),
+        "steady_max_us": max(steady_us),
+        "reload_calls": len(during_us),
+        "reload_p50_us": _pct(during_us, 50) if during_us else None,
+        "reload_p99_us": _pct(during_us, 99) if during_us else None,
+        "reload_max_us": max(during_us) if during_us else None,
+    }
+
+
+def bench_shards(cfg: RuntimeConfig, n_keys: int, n_events: int, worker_counts: List[int],
+                 dispatch: str = "relay") -> dict:
+    """Sharded runtime throughput vs worker count (channel source, quiet workers).
+
+    For each worker count a fresh ``ShardSupervisor`` is started, ``n_events``
+    key notifications are PUBLISHed (to the base channel for ``relay``, to the
+    shard channels for ``direct``) and the time until all decisions are
+    reported is measured (workers report every 0.2s, so keep ``n_events``
+    large enough for runs of several seconds). ``scaling_efficiency`` =
+    throughput / (workers x throughput per worker of the first run).
+    """
+    import dataclasses
+    import threading
+
+    import redis
+
+    from runtime.async_runtime import AsyncRuntimeConfig
+    from runtime.sharded_runtime import ShardSupervisor, shard_channel, shard_of
+
+    r = redis.Redis(host=cfg.redis_host, port=cfg.redis_port)
+    codec = FeatureCodec(FEATURE_COLS)
+    keys = synth_chain_keys(n_keys)
+    rng = random.Random(42)
+    pipe = r.pipeline(transaction=False)
+    for k in keys:
+        write_features(pipe, codec, k, synth_features(rng), k.split(":", 5)[5])
+    pipe.execute()
+
+    acfg = AsyncRuntimeConfig(source="channel", channel="bench:shards")
+    runs = []
+    for n in worker_counts:
+        sup = ShardSupervisor(dataclasses.replace(cfg), acfg, n_workers=n, report_interval_s=0.2,
+                              quiet=True, dispatch=dispatch)
+        subs = [shard_channel(acfg.channel, i) for i in range(n)]
+        if dispatch == "relay":
+            subs.append(acfg.channel)
+        target = [shard_channel(acfg.channel, shard_of(k, n)) for k in keys] if dispatch == "direct" else None
+        started: List[float] = []
+
+        def publish():
+            # 모든 워커(+relay)가 구독을 마친 뒤 발행
+            while any(cnt == 0 for _, cnt in r.pubsub_numsub(*subs)):
+                time.sleep(0.05)
+            started.append(time.perf_counter())
+            p = r.pipeline(transaction=False)
+            for i in range(n_events):
+                j = i % n_keys
+                p.publish(target[j] if target else acfg.channel, keys[j])
+                if len(p) >= 1000:
+                    p.execute()
+            p.execute()
+
+        th = threading.Thread(target=publish, name="bench-publish", daemon=True)
+        th.start()
+        res = sup.run(stop_after=n_events)
+        th.join()
+        elapsed = sup.done_at - started[0]
+        runs.append({"workers": n, "decisions": res.get("scored", 0) + res.get("missing", 0),
+                     "elapsed_s": elapsed, "decisions_per_s": n_events / max(elapsed, 1e-9)})
+
+    base = runs[0]["decisions_per_s"] / runs[0]["workers"]
+    for run in runs:
+        run["scaling_efficiency"] = run["decisions_per_s"] / max(run["workers"] * base, 1e-9)
+    return {"n_keys": n_keys, "n_events": n_events, "dispatch": dispatch, "runs": runs}
+
+
+def bench_codec(n_keys: int) -> dict:
+    """Decode time per key and bytes per key: legacy JSON vs binary codec."""
+    codec = FeatureCodec(FEATURE_COLS)
+    rng = random.Random(11)
+    feats = [synth_features(rng) for _ in range(n_keys)]
+    js = [json.dumps(f).encode("utf-8") for f in feats]
+    bs = [codec.encode(f, "2025-12-01T10:05:00Z") for f in feats]
+
+    def per_key_us(fn, vals) -> float:
+        t0 = time.perf_counter()
+        for v in vals:
+            fn(v)
+        return (time.perf_counter() - t0) * 1e6 / len(vals)
+
+    max_abs_diff = 0.0
+    for f, v in zip(feats, bs):
+        d = codec.decode(v)
+        max_abs_diff = max(max_abs_diff, max(abs(f[c] - d[c]) for c in FEATURE_COLS))
+
+    return {
+        "n_keys": n_keys,
+        "json_bytes_per_key": sum(map(len, js)) / n_keys,
+        "binary_bytes_per_key": sum(map(len, bs)) / n_keys,
+        "json_decode_us_per_key": per_key_us(json.loads, js),
+        "binary_decode_us_per_key": per_key_us(codec.decode, bs),
+        "json_fallback_decode_us_per_key": per_key_us(codec.decode, js),
+        "max_abs_roundtrip_diff": max_abs_diff,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("mode", choices=["batch", "predict", "trees", "codec", "reload", "shards"])
+    ap.add_argument("--mlflow-uri", default=RuntimeConfig.mlflow_uri)
+    ap.add_argument("--redis-host", default=RuntimeConfig.redis_host)
+    ap.add_argument("--redis-port", type=int, default=RuntimeConfig.redis_port)
+    ap.add_argument("--n-keys", type=int, default=400)
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--n-calls", type=int, default=5000)
+    ap.add_argument("--reloads", type=int, default=3, help="reload mode: background model reloads")
+    ap.add_argument("--predictor", default="fast", choices=["pyfunc", "fast", "trees"],
+                    help="reload mode: predict path served during the reload")
+    ap.add_argument("--model-cache-dir", default=None)
+    ap.add_argument("--n-events", type=int, default=500_000, help="shards mode: notifications per run")
+    ap.add_argument("--workers", default="1,2,4", help="shards mode: comma-separated worker counts")
+    ap.add_argument("--dispatch", default="relay", choices=["relay", "direct"])
+    args = ap.parse_args()
+
+    if args.mode == "codec":
+        print(json.dumps(bench_codec(args.n_calls), ensure_ascii=False, indent=2))
+        return
+
+    cfg = RuntimeConfig(
+        mlflow_uri=args.mlflow_uri,
+        redis_host=args.redis_host,
+        redis_port=args.redis_port,
+        fast_predict=args.mode == "predict" or (args.mode == "reload" and args.predictor == "fast"),
+        tree_predict=args.mode == "trees" or (args.mode == "reload" and args.predictor == "trees"),
+        model_cache_dir=args.model_cache_dir,
+    )
+    if args.mode == "shards":
+        counts = [int(w) for w in args.workers.split(",") if w]
+        print(json.dumps(bench_shards(cfg, args.n_keys, args.n_events, counts, args.dispatch),
+                         ensure_ascii=False, indent=2))
+        return
+
+    agent = TradingAgent(cfg)
+
+    if args.mode == "batch":
+        out = bench_batch(agent, args.n_keys, args.repeat)
+    elif args.mode == "predict":
+        out = bench_predict(agent, args.n_calls)
+    elif args.mode == "trees":
+        out = bench_trees(agent, args.n_keys, args.repeat)
+    elif args.mode == "reload":
+        out = bench_reload(agent, args.n_keys, args.n_calls, args.reloads)
+
+    print(json.dumps(out, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+RUNTIME_MODULES = (
+    "runtime.agent_runtime",
+    "runtime.async_runtime",
+    "runtime.sharded_runtime",
+    "runtime.replay",
+)
+# import 되면 안 되는(지연 로드 대상) 무거운 패키지
+HEAVY = ("mlflow", "pandas", "redis", "pyspark", "lightgbm", "sklearn")
+
+_IMPORT_CHILD = """
+import json, sys, time
+t0 = time.perf_counter()
+import {mod}
+t1 = time.perf_counter()
+print(json.dumps({{"import_s": t1 - t0,
+                   "heavy_loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+_FIRST_DECISION_CHILD = """
+import json, time
+t0 = time.perf_counter()
+from runtime.agent_runtime import RuntimeConfig, TradingAgent
+t1 = time.perf_counter()
+agent = TradingAgent(RuntimeConfig(fast_predict={fast!r}, model_cache_dir={cache!r}, offline={offline!r}))
+t2 = time.perf_counter()
+out = agent.run_once({key!r})
+t3 = time.perf_counter()
+agent.run_once({key!r})
+t4 = time.perf_counter()
+agent.close()
+print(json.dumps({{"import_s": t1 - t0, "agent_init_s": t2 - t1, "first_decision_s": t3 - t2,
+                   "steady_decision_s": t4 - t3, "time_to_first_decision_s": t3 - t0,
+                   "ok": out.get("ok"), "model_version": agent.active.version}}))
+"""
+
+_DAG_CHILD = """
+import importlib.util, json, sys, time
+t0 = time.perf_counter()
+import airflow
+from airflow import DAG
+t1 = time.perf_counter()
+spec = importlib.util.spec_from_file_location("_profiled_dag", {path!r})
+mod = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(mod)
+t2 = time.perf_counter()
+print(json.dumps({{"airflow_import_s": t1 - t0, "parse_s": t2 - t1,
+                   "dags": sorted(v.dag_id for v in vars(mod).values() if isinstance(v, DAG)),
+                   "heavy_loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def _child(code: str, timeout_s: float = 300.0) -> Dict[str, Any]:
+    # 매번 새 인터프리터: sys.modules 캐시 없이 콜드 import 를 측정
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    try:
+        p = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env,
+                           capture_output=True, text=True, timeout=timeout_s)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout after {timeout_s}s"}
+    if p.returncode != 0:
+        lines = p.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {p.returncode}"}
+    return json.loads(p.stdout.strip().splitlines()[-1])
+
+
+def _best_of(code: str, repeat: int, key: str) -> Dict[str, Any]:
+    """Run ``code`` ``repeat`` times and keep the run with the smallest ``key``."""
+    runs = [_child(code) for _ in range(repeat)]
+    ok = [r for r in runs if "error" not in r]
+    if not ok:
+        return runs[0]
+    best = min(ok, key=lambda r: r[key])
+    return dict(best, runs=len(ok))
+
+
+def import_times(modules=RUNTIME_MODULES, repeat: int = 5, top: int = 10) -> Dict[str, Any]:
+    out = {}
+    for mod in modules:
+        r = _best_of(_IMPORT_CHILD.format(mod=mod, heavy=HEAVY), repeat, "import_s")
+        if "error" not in r:
+            r["top_cumulative_us"] = importtime_top(mod, top)
+        out[mod] = r
+    return out
+
+
+def importtime_top(mod: str, top: int = 10) -> List[Dict[str, Any]]:
+    """Heaviest direct imports of ``mod`` from ``python -X importtime``."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    p = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {mod}"],
+                       cwd=ROOT, env=env, capture_output=True, text=True)
+    direct: List[Dict[str, Any]] = []
+    rows: List[Dict[str, Any]] = []
+    for line in p.stderr.splitlines():
+        # "import time:   self [us] | cumulative | imported package" (하위 import 가 상위보다 먼저, 들여쓰기 2칸/단계)
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        row = {"module": name.strip(), "self_us": int(self_us.strip()), "cumulative_us": int(cum_us.strip())}
+        if depth == 1:
+            direct.append(row)
+        elif depth == 0:
+            if row["module"] == mod.split(".")[0] or row["module"] == mod:
+                rows.extend(direct)
+            direct = []
+    return sorted(rows, key=lambda r: -r["cumulative_us"])[:top]
+
+
+def first_decision(key: str, fast_predict: bool, model_cache_dir: Optional[str],
+                   offline: bool) -> Dict[str, Any]:
+    # Redis/MLflow(또는 모델 캐시)가 필요: 없으면 error 만 기록
+    return _child(_FIRST_DECISION_CHILD.format(key=key, fast=fast_predict, cache=model_cache_dir,
+                                               offline=offline))
+
+
+def dag_parse_times(dags_dir: str, repeat: int = 3) -> Dict[str, Any]:
+    out = {}
+    for d, _, files in os.walk(dags_dir):
+        for fn in sorted(files):
+            if not fn.endswith(".py"):
+                continue
+            path = os.path.abspath(os.path.join(d, fn))
+            code = _DAG_CHILD.format(path=path, heavy=HEAVY)
+            out[os.path.relpath(path, ROOT)] = _best_of(code, repeat, "parse_s")
+    return dict(sorted(out.items()))
+
+
+def flatten_metrics(report: Dict[str, Any]) -> Dict[str, float]:
+    """Timing metrics (seconds) keyed by a stable name, for baseline comparison."""
+    m: Dict[str, float] = {}
+    for mod, r in report.get("imports", {}).items():
+        if "import_s" in r:
+            m[f"import:{mod}"] = r["import_s"]
+    fd = report.get("first_decision") or {}
+    for k in ("agent_init_s", "first_decision_s", "time_to_first_decision_s"):
+        if k in fd:
+            m[f"first_decision:{k}"] = fd[k]
+    for path, r in report.get("dags", {}).items():
+        if "parse_s" in r:
+            m[f"dag_parse:{path}"] = r["parse_s"]
+    return m
+
+
+def compare(current: Dict[str, float], baseline: Dict[str, float],
+            max_regression: float, min_delta_s: float) -> List[Dict[str, Any]]:
+    # 상대(max_regression)와 절대(min_delta_s) 기준을 모두 넘을 때만 회귀로 판단 (측정 잡음 배제)
+    out = []
+    for name, cur in sorted(current.items()):
+        base = baseline.get(name)
+        if base is None:
+            continue
+        if cur > base * (1.0 + max_regression) and cur - base > min_delta_s:
+            out.append({"metric": name, "baseline_s": base, "current_s": cur,
+                        "ratio": cur / max(base, 1e-12)})
+    return out
+
+
+def _git_rev() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--dags-dir", default=os.path.join(ROOT, "dags"))
+    ap.add_argument("--skip-dags", action="store_true")
+    ap.add_argument("--key", default=None, help="feature key for first-decision latency (needs Redis + model)")
+    ap.add_argument("--fast-predict", action="store_true")
+    ap.add_argument("--model-cache-dir", default=None)
+    ap.add_argument("--offline", action="store_true")
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    ap.add_argument("--baseline", default=None, help="previous report to compare against")
+    ap.add_argument("--max-regression", type=float, default=0.2, help="allowed relative slowdown")
+    ap.add_argument("--min-delta-ms", type=float, default=20.0, help="ignore slowdowns below this")
+    args = ap.parse_args()
+
+    report: Dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+    }
+    t0 = time.perf_counter()
+    report["imports"] = import_times(repeat=args.repeat)
+    if args.key:
+        report["first_decision"] = first_decision(args.key, args.fast_predict,
+                                                  args.model_cache_dir, args.offline)
+    if not args.skip_dags:
+        report["dags"] = dag_parse_times(args.dags_dir, repeat=max(1, args.repeat // 2))
+    report["metrics"] = flatten_metrics(report)
+    report["profile_elapsed_s"] = time.perf_counter() - t0
+
+    regressions: List[Dict[str, Any]] = []
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            base = json.load(f)
+        regressions = compare(report["metrics"], base.get("metrics", {}),
+                              args.max_regression, args.min_delta_ms / 1000.0)
+        report["baseline"] = {"path": args.baseline, "git_rev": base.get("git_rev"),
+                              "regressions": regressions}
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    if regressions:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
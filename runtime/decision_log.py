@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+DECISION_SCHEMA = pa.schema([
+    pa.field("logged_at", pa.timestamp("us", tz="UTC")),
+    pa.field("key", pa.string()),
+    pa.field("ok", pa.bool_()),
+    pa.field("pred", pa.float64()),
+    pa.field("decision", pa.string()),
+    pa.field("reason", pa.string()),
+    pa.field("model_version", pa.string()),
+])
+
+
+class DecisionLogWriter:
+    """Bounded queue + background writer that rolls decisions into Parquet files.
+
+    ``log()`` only enqueues. A writer thread drains up to ``batch_size``
+    records (or whatever arrived within ``flush_interval_s``) into one
+    row group. Files are written as ``*.parquet.inprogress`` and renamed
+    to ``*.parquet`` when they exceed ``rollover_bytes`` or are older than
+    ``rollover_s``, so loaders (spark_jobs/load_decision_logs.py) only see
+    complete files. File names are ``{name}-{ts}-{pid}-{seq}``; the writer
+    thread does not survive fork, so each forked process needs its own writer.
+
+    A failed write or rollover is counted (``write_errors``; its records
+    in ``failed``) and logged; the open file is abandoned as
+    ``.inprogress`` and the thread keeps draining into a new file.
+
+    Queue-full policy (``on_full``):
+      - ``"drop"``:  the record is discarded and counted in ``dropped`` (hot path never waits)
+      - ``"block"``: the caller waits up to ``block_timeout_s`` (None = forever), then drops
+    """
+
+    def __init__(self, out_dir: str, max_queue: int = 100_000, batch_size: int = 5_000,
+                 flush_interval_s: float = 1.0, rollover_bytes: int = 128 << 20,
+                 rollover_s: float = 300.0, on_full: str = "drop",
+                 block_timeout_s: Optional[float] = None, name: str = "decisions"):
+        if on_full not in ("drop", "block"):
+            raise ValueError(f"on_full must be 'drop' or 'block', got {on_full!r}")
+        self.out_dir = out_dir
+        self.name = name
+        self.batch_size = batch_size
+        self.flush_interval_s = flush_interval_s
+        self.rollover_bytes = rollover_bytes
+        self.rollover_s = rollover_s
+        self.on_full = on_full
+        self.block_timeout_s = block_timeout_s
+        os.makedirs(out_dir, exist_ok=True)
+
+        self.q: "queue.Queue[Optional[Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self.stats = {"enqueued": 0, "dropped": 0, "written": 0, "files": 0, "write_errors": 0, "failed": 0}
+        self._writer: Optional[pq.ParquetWriter] = None
+        self._path: Optional[str] = None
+        self._opened_at = 0.0
+        self._seq = 0
+        self._thread = threading.Thread(target=self._run, name="decision-log", daemon=True)
+        self._thread.start()
+
+    def log(self, out: Dict[str, Any], model_version: Optional[str] = None) -> bool:
+        rec = dict(out, logged_at=datetime.now(timezone.utc), model_version=model_version)
+        try:
+            if self.on_full == "drop":
+                self.q.put_nowait(rec)
+            else:
+                self.q.put(rec, timeout=self.block_timeout_s)
+        except queue.Full:
+            self.stats["dropped"] += 1
+            return False
+        self.stats["enqueued"] += 1
+        return True
+
+    def _run(self) -> None:
+        stop = False
+        while not stop:
+            batch: List[Dict[str, Any]] = []
+            deadline = time.monotonic() + self.flush_interval_s
+            while len(batch) < self.batch_size:
+                try:
+                    rec = self.q.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if rec is None:
+                    stop = True
+                    break
+                batch.append(rec)
+            if batch:
+                try:
+                    self._write(batch)
+                except Exception as e:
+                    self._fail(e, len(batch))
+            try:
+                if self._writer is not None and (stop or self._should_roll()):
+                    self._roll()
+            except Exception as e:
+                self._fail(e, 0)
+
+    def _fail(self, e: Exception, n_records: int) -> None:
+        # 쓰기 스레드가 죽으면 큐만 차오르므로: 기록하고 현재 파일은 버린 뒤 계속 drain
+        self.stats["write_errors"] += 1
+        self.stats["failed"] += n_records
+        print(json.dumps({"event": "decision_log_write_failed", "path": self._path,
+                          "records": n_records, "error": repr(e)}))
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+        self._writer = None
+        self._path = None
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if self._writer is None:
+            self._seq += 1
+            ts = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+            self._path = os.path.join(
+                self.out_dir, f"{self.name}-{ts}-{os.getpid()}-{self._seq:05d}.parquet.inprogress"
+            )
+            self._writer = pq.ParquetWriter(self._path, DECISION_SCHEMA, compression="zstd")
+            self._opened_at = time.monotonic()
+        cols = {f.name: [r.get(f.name) for r in batch] for f in DECISION_SCHEMA}
+        self._writer.write_table(pa.Table.from_pydict(cols, schema=DECISION_SCHEMA))
+        self.stats["written"] += len(batch)
+
+    def _should_roll(self) -> bool:
+        if time.monotonic() - self._opened_at >= self.rollover_s:
+            return True
+        return os.path.getsize(self._path) >= self.rollover_bytes
+
+    def _roll(self) -> None:
+        self._writer.close()
+        os.replace(self._path, self._path[: -len(".inprogress")])
+        self.stats["files"] += 1
+        self._writer = None
+        self._path = None
+
+    def close(self) -> None:
+        """Flush everything still queued, close the open file and stop the thread."""
+        self.q.put(None)
+        self._thread.join()
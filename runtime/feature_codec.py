@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+import zlib
+from datetime import datetime, timezone
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+
+# Redis 온라인 피처 값 바이너리 포맷 (v1, little-endian)
+#
+#   offset  size  field
+#   0       2     magic  b"OF"
+#   2       1     version (1)
+#   3       1     reserved (0)
+#   4       4     schema hash: crc32(",".join(cols)) — 컬럼 순서/이름 변경 감지
+#   8       8     asof_ts: epoch microseconds (int64, UTC)
+#   16      8*N   float64 x N (cols 순서, 결측은 NaN)
+#
+# 첫 바이트가 magic이 아니면 기존 JSON 값으로 보고 json.loads로 디코딩합니다.
+MAGIC = b"OF"
+VERSION = 1
+_HEADER = struct.Struct("<2sBxIq")
+
+AsofTs = Union[datetime, str, int, None]
+
+
+def schema_hash(cols: Sequence[str]) -> int:
+    return zlib.crc32(",".join(cols).encode("utf-8"))
+
+
+def _asof_to_us(asof_ts: AsofTs) -> int:
+    if asof_ts is None:
+        return 0
+    if isinstance(asof_ts, int):
+        return asof_ts
+    if isinstance(asof_ts, str):
+        asof_ts = datetime.fromisoformat(asof_ts.replace("Z", "+00:00"))
+    if asof_ts.tzinfo is None:
+        asof_ts = asof_ts.replace(tzinfo=timezone.utc)
+    return int(round(asof_ts.timestamp() * 1_000_000))
+
+
+class FeatureCodec:
+    """Versioned binary codec for one feature vector per Redis key.
+
+    Shared by feature writers (``write_features``) and ``TradingAgent``.
+    ``decode`` transparently accepts legacy JSON values.
+    """
+
+    def __init__(self, cols: Sequence[str]):
+        self.cols = list(cols)
+        self.hash = schema_hash(self.cols)
+        self._values = struct.Struct(f"<{len(self.cols)}d")
+        self.size = _HEADER.size + self._values.size
+
+    def encode(self, feat: Dict[str, Optional[float]], asof_ts: AsofTs = None) -> bytes:
+        vals = [math.nan if feat.get(c) is None else float(feat[c]) for c in self.cols]
+        return _HEADER.pack(MAGIC, VERSION, self.hash, _asof_to_us(asof_ts)) + self._values.pack(*vals)
+
+    def decode_with_asof(self, raw: Union[bytes, str]) -> Tuple[Optional[int], Dict[str, float]]:
+        """Return (asof epoch-us or None for JSON values, feature dict)."""
+        if isinstance(raw, str) or raw[:2] != MAGIC:
+            return None, json.loads(raw)
+
+        if len(raw) != self.size:
+            raise ValueError(f"feature value has {len(raw)} bytes, expected {self.size}")
+        _, version, h, asof_us = _HEADER.unpack_from(raw)
+        if version != VERSION:
+            raise ValueError(f"unsupported feature codec version: {version}")
+        if h != self.hash:
+            raise ValueError(f"feature schema hash mismatch: {h:#010x} != {self.hash:#010x}")
+        return asof_us, dict(zip(self.cols, self._values.unpack_from(raw, _HEADER.size)))
+
+    def decode(self, raw: Union[bytes, str]) -> Dict[str, float]:
+        return self.decode_with_asof(raw)[1]
+
+
+def write_features(r, codec: FeatureCodec, key: str, feat: Dict[str, Optional[float]],
+                   asof_ts: AsofTs = None, ttl_s: Optional[int] = None) -> None:
+    """Writer side: SET one encoded feature vector (r may be a pipeline)."""
+    r.set(key, codec.encode(feat, asof_ts), ex=ttl_s)
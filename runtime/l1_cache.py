@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class L1FeatureCache:
+    """Bounded in-process LRU cache of decoded feature dicts, keyed by Redis key.
+
+    Entries expire at the next bar boundary (``bar_seconds``), so a value
+    never outlives the minute it was read in. Writers PUBLISH the key they
+    overwrote on ``channel``; ``start_invalidation`` subscribes and drops
+    those keys (message ``*`` clears everything). Thread-safe; cached dicts
+    are shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 10_000, bar_seconds: int = 60,
+                 clock: Callable[[], float] = time.time):
+        self.max_entries = max_entries
+        self.bar_seconds = bar_seconds
+        self.clock = clock
+        self._d: "OrderedDict[str, Tuple[Dict[str, float], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._pubsub_thread = None
+        self._gen = 0  # 무효화마다 증가: 조회 도중 무효화된 값을 put하지 않도록
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _next_boundary(self, now: float) -> float:
+        return (now // self.bar_seconds + 1) * self.bar_seconds
+
+    def get(self, key: str) -> Optional[Dict[str, float]]:
+        now = self.clock()
+        with self._lock:
+            item = self._d.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if now >= expires_at:
+                del self._d[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._d.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def token(self) -> int:
+        """Take before reading Redis; pass to ``put`` to drop racing writes."""
+        return self._gen
+
+    def put(self, key: str, value: Dict[str, float], token: Optional[int] = None) -> None:
+        expires_at = self._next_boundary(self.clock())
+        with self._lock:
+            if token is not None and token != self._gen:
+                return
+            self._d[key] = (value, expires_at)
+            self._d.move_to_end(key)
+            while len(self._d) > self.max_entries:
+                self._d.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._gen += 1
+            if key == "*":
+                self.invalidations += len(self._d)
+                self._d.clear()
+            elif self._d.pop(key, None) is not None:
+                self.invalidations += 1
+
+    def stats(self) -> Dict[str, Any]:
+        # 카운터는 get/put/invalidate 와 같은 락 아래에서 한 번에 읽음 (일관된 스냅샷)
+        with self._lock:
+            size, hits, misses = len(self._d), self.hits, self.misses
+            evictions, expirations, invalidations = self.evictions, self.expirations, self.invalidations
+        lookups = hits + misses
+        return {
+            "size": size,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": evictions,
+            "expirations": expirations,
+            "invalidations": invalidations,
+        }
+
+    def start_invalidation(self, r, channel: str) -> None:
+        """Subscribe to ``channel`` on a background thread (redis-py run_in_thread)."""
+        def _on_message(msg):
+            data = msg["data"]
+            self.invalidate(data.decode() if isinstance(data, bytes) else data)
+
+        pubsub = r.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{channel: _on_message})
+        self._pubsub_thread = pubsub.run_in_thread(sleep_time=0.5, daemon=True)
+
+    def stop(self) -> None:
+        if self._pubsub_thread is not None:
+            self._pubsub_thread.stop()
+            self._pubsub_thread = None
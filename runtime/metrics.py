@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+
+# run_once 단계: Redis 조회 → 디코드 → 입력 구성(DataFrame/버퍼) → predict → 결정
+STAGES = ("fetch", "decode", "frame", "predict", "decide")
+
+# 마이크로초 ~ 0.5초 고해상도 버킷
+BUCKETS = (
+    5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+    1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5,
+)
+
+
+class StageMetrics:
+    """Per-stage latency recorder for ``TradingAgent.run_once``.
+
+    Observations go to a Prometheus histogram ``agent_stage_seconds{stage}``
+    when ``prometheus_client`` is installed, and to in-memory sample lists
+    when ``keep_samples`` is set (used by ``--bench``). The agent only
+    creates one of these when metrics are enabled, so the disabled path
+    costs a single ``is None`` check per call.
+    """
+
+    def __init__(self, keep_samples: bool = False, port: Optional[int] = None):
+        self.samples: Optional[Dict[str, List[float]]] = (
+            {s: [] for s in STAGES + ("total",)} if keep_samples else None
+        )
+        self._hist = None
+        try:
+            from prometheus_client import Histogram, start_http_server
+        except ImportError:
+            if port is not None:
+                raise
+            return
+
+        h = _histogram(Histogram)
+        self._hist = {s: h.labels(stage=s) for s in STAGES + ("total",)}
+        if port is not None:
+            start_http_server(port)
+
+    def observe(self, fetch: float, decode: float, frame: float, predict: float, decide: float) -> None:
+        vals = (fetch, decode, frame, predict, decide)
+        total = sum(vals)
+        if self._hist is not None:
+            for s, v in zip(STAGES, vals):
+                self._hist[s].observe(v)
+            self._hist["total"].observe(total)
+        if self.samples is not None:
+            for s, v in zip(STAGES, vals):
+                self.samples[s].append(v)
+            self.samples["total"].append(total)
+
+    def percentiles(self, ps=(50, 95, 99)) -> Dict[str, Dict[str, float]]:
+        """p50/p95/p99 per stage in microseconds (requires keep_samples)."""
+        out = {}
+        for s, xs in (self.samples or {}).items():
+            xs = sorted(xs)
+            if not xs:
+                continue
+            out[s] = {
+                f"p{p}_us": xs[min(len(xs) - 1, int(round(p / 100.0 * (len(xs) - 1))))] * 1e6
+                for p in ps
+            }
+        return out
+
+
+_HIST = None
+
+
+def _histogram(Histogram):
+    # 프로세스당 1회 등록 (같은 이름 재등록 시 prometheus_client가 오류)
+    global _HIST
+    if _HIST is None:
+        _HIST = Histogram(
+            "agent_stage_seconds",
+            "TradingAgent.run_once latency per stage",
+            ["stage"],
+            buckets=BUCKETS,
+        )
+    return _HIST
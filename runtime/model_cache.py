@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+MANIFEST = "cache_manifest.json"
+
+
+@dataclass
+class CacheEntry:
+    name: str
+    version: str
+    run_id: str
+    path: str           # pyfunc.load_model()에 넘길 로컬 모델 디렉터리
+    digest: str         # 모든 파일 sha256의 트리 해시
+    last_used: float
+
+
+def _sha256_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _checksums(root: str) -> Dict[str, str]:
+    out = {}
+    for d, _, files in os.walk(root):
+        for fn in files:
+            p = os.path.join(d, fn)
+            out[os.path.relpath(p, root)] = _sha256_file(p)
+    return out
+
+
+def _tree_digest(sums: Dict[str, str]) -> str:
+    h = hashlib.sha256()
+    for rel in sorted(sums):
+        h.update(f"{rel}\0{sums[rel]}\n".encode("utf-8"))
+    return h.hexdigest()
+
+
+class ModelCache:
+    """On-disk MLflow model artifact cache keyed by (model version, run_id).
+
+    Layout::
+
+        {root}/{name}/v{version}-{run_id}/model/...        downloaded artifact files
+        {root}/{name}/v{version}-{run_id}/cache_manifest.json
+        {root}/{name}/{stage}.json                         last version cached for a stage
+
+    Every hit re-verifies the per-file sha256 checksums; a corrupt entry is
+    deleted and downloaded again. Only the ``max_versions`` most recently
+    used versions are kept (entries pinned by a stage pointer are never evicted).
+    """
+
+    def __init__(self, root: str, max_versions: int = 3, verify: bool = True):
+        self.root = root
+        self.max_versions = max_versions
+        self.verify = verify
+
+    def _entry_dir(self, name: str, version: str, run_id: str) -> str:
+        return os.path.join(self.root, name, f"v{version}-{run_id}")
+
+    def _read_entry(self, entry_dir: str) -> Optional[CacheEntry]:
+        try:
+            with open(os.path.join(entry_dir, MANIFEST), encoding="utf-8") as f:
+                m = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(
+            name=m["name"], version=m["version"], run_id=m["run_id"],
+            path=os.path.join(entry_dir, m["model_path"]), digest=m["digest"], last_used=m["last_used"],
+        )
+
+    def _valid(self, entry_dir: str) -> bool:
+        try:
+            with open(os.path.join(entry_dir, MANIFEST), encoding="utf-8") as f:
+                m = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if not self.verify:
+            return True
+        model_dir = os.path.join(entry_dir, "model")
+        return os.path.isdir(model_dir) and _checksums(model_dir) == m["files"]
+
+    def _touch(self, entry_dir: str, stage: Optional[str]) -> CacheEntry:
+        p = os.path.join(entry_dir, MANIFEST)
+        with open(p, encoding="utf-8") as f:
+            m = json.load(f)
+        m["last_used"] = time.time()
+        _write_json(p, m)
+        if stage:
+            _write_json(os.path.join(self.root, m["name"], f"{stage}.json"),
+                        {"version": m["version"], "run_id": m["run_id"]})
+        return self._read_entry(entry_dir)
+
+    def fetch(self, name: str, version: str, run_id: str, stage: Optional[str] = None) -> CacheEntry:
+        """Return a verified local copy of models:/{name}/{version}, downloading on miss."""
+        entry_dir = self._entry_dir(name, version, run_id)
+        if os.path.isdir(entry_dir):
+            if self._valid(entry_dir):
+                return self._touch(entry_dir, stage)
+            shutil.rmtree(entry_dir, ignore_errors=True)
+
+        import mlflow.artifacts
+
+        os.makedirs(os.path.join(self.root, name), exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".download-", dir=os.path.join(self.root, name))
+        try:
+            model_dir = os.path.join(tmp, "model")
+            os.makedirs(model_dir)
+            local = mlflow.artifacts.download_artifacts(
+                artifact_uri=f"models:/{name}/{version}", dst_path=model_dir
+            )
+            sums = _checksums(model_dir)
+            _write_json(os.path.join(tmp, MANIFEST), {
+                "name": name, "version": str(version), "run_id": run_id,
+                "model_path": os.path.relpath(local, tmp),
+                "files": sums, "digest": _tree_digest(sums), "last_used": time.time(),
+            })
+            try:
+                os.replace(tmp, entry_dir)  # 다운로드가 끝난 항목만 보이도록 원자적 rename
+            except OSError:
+                # 다른 프로세스가 같은 버전을 먼저 채웠으면 그 항목을 사용
+                if not self._valid(entry_dir):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        entry = self._touch(entry_dir, stage)
+        self.evict(name)
+        return entry
+
+    def latest(self, name: str, stage: str) -> CacheEntry:
+        """Last verified entry cached for ``stage`` (offline start)."""
+        try:
+            with open(os.path.join(self.root, name, f"{stage}.json"), encoding="utf-8") as f:
+                ptr = json.load(f)
+        except OSError:
+            raise FileNotFoundError(f"no cached {stage} model for {name} under {self.root}")
+        entry_dir = self._entry_dir(name, ptr["version"], ptr["run_id"])
+        if not self._valid(entry_dir):
+            raise FileNotFoundError(f"cached {name} v{ptr['version']} is missing or corrupt")
+        return self._touch(entry_dir, None)
+
+    def entries(self, name: str) -> List[CacheEntry]:
+        base = os.path.join(self.root, name)
+        if not os.path.isdir(base):
+            return []
+        out = [self._read_entry(os.path.join(base, d)) for d in os.listdir(base) if d.startswith("v")]
+        return sorted((e for e in out if e is not None), key=lambda e: e.last_used, reverse=True)
+
+    def evict(self, name: str) -> List[str]:
+        base = os.path.join(self.root, name)
+        pinned = set()
+        for fn in os.listdir(base):
+            if fn.endswith(".json"):
+                with open(os.path.join(base, fn), encoding="utf-8") as f:
+                    ptr = json.load(f)
+                pinned.add((ptr["version"], ptr["run_id"]))
+
+        evicted = []
+        for e in self.entries(name)[self.max_versions:]:
+            if (e.version, e.run_id) in pinned:
+                continue
+            shutil.rmtree(self._entry_dir(name, e.version, e.run_id), ignore_errors=True)
+            evicted.append(e.version)
+        return evicted
+
+
+def _write_json(path: str, obj) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
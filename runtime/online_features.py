@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+
+from runtime.agent_runtime import FEATURE_COLS
+
+
+# spark_jobs/features_silver_to_gold.py 와 동일한 피처를 틱 스트림에서 증분 계산합니다.
+#
+#   bars (1m):  o = 첫 틱 open, h = max(high), l = min(low), c = 마지막 틱 price,
+#               tick_count, v = sum(ccnt), oi_last = 마지막 틱 oi
+#   features:   f_ret_1  = c / c_lag1 - 1
+#               f_ret_5  = c / c_lag5 - 1
+#               f_vol_20 = stddev_samp(ret_1) over 20 bars (null 제외)
+#               f_range_5 = f_spread_proxy = avg((h - l) / c) over 5 bars (null 제외)
+#               f_oi_chg_5 = oi_last - oi_lag5
+#               f_iv_proxy = f_vol_20
+#
+# 바 1개당 상수 시간: 종가/OI/range는 길이 5 링버퍼, 변동성은 길이 20 링버퍼.
+# Spark 는 rowsBetween 슬라이딩 프레임마다 집계를 처음부터 다시 계산하므로
+# 링버퍼를 같은 순서·같은 갱신식으로 다시 훑어 모든 피처가 비트 단위로 일치합니다.
+# 같은 ts 의 틱은 gold 와 같이 (ts, tcnt) 순서로 open / close / oi_last 를 정합니다.
+
+EntityKey = Tuple[str, str, str, int]  # (ymcode, side, code, strike)
+
+
+@dataclass
+class Bar:
+    bar_ts: datetime
+    o: Optional[float] = None
+    h: Optional[float] = None
+    l: Optional[float] = None
+    c: Optional[float] = None
+    tick_count: int = 0
+    v: int = 0
+    oi_last: Optional[float] = None
+    first: Optional[Tuple[datetime, bool, int]] = None  # open 을 정한 틱의 (ts, tcnt) 순서 키
+    last: Optional[Tuple[datetime, bool, int]] = None   # close / oi_last 를 정한 틱
+
+
+class RollingStd:
+    """Sample std over the last ``n`` values (None ignored), O(n) per update.
+
+    Recomputes the window with Spark's ``stddev_samp`` update
+    (CentralMomentAgg) in row order, so the result is bit-identical to
+    ``stddev_samp(...) OVER (ROWS BETWEEN n-1 PRECEDING AND CURRENT ROW)``.
+    """
+
+    def __init__(self, n: int):
+        self.buf: Deque[Optional[float]] = deque(maxlen=n)
+
+    def push(self, x: Optional[float]) -> Optional[float]:
+        self.buf.append(x)
+        k, avg, m2 = 0.0, 0.0, 0.0
+        for v in self.buf:
+            if v is None:
+                continue
+            k += 1.0
+            delta = v - avg
+            delta_n = delta / k
+            avg += delta_n
+            m2 += delta * (delta - delta_n)
+        # n = 1 → null (spark.sql.legacy.statisticalAggregate=false)
+        if k < 2.0:
+            return None
+        return math.sqrt(m2 / (k - 1.0))
+
+
+class RollingMean:
+    """Mean over the last ``n`` values (None ignored).
+
+    The window is tiny (5), so the sum is taken over the ring buffer in
+    order; this keeps the result identical to Spark's ``avg`` over a frame.
+    """
+
+    def __init__(self, n: int):
+        self.buf: Deque[Optional[float]] = deque(maxlen=n)
+
+    def push(self, x: Optional[float]) -> Optional[float]:
+        self.buf.append(x)
+        s, k = 0.0, 0
+        for v in self.buf:
+            if v is not None:
+                s += v
+                k += 1
+        return s / k if k else None
+
+
+@dataclass
+class EntityState:
+    current: Optional[Bar] = None
+    last_bar_ts: Optional[datetime] = None
+    closes: Deque[Optional[float]] = field(default_factory=lambda: deque(maxlen=5))
+    ois: Deque[Optional[float]] = field(default_factory=lambda: deque(maxlen=5))
+    vol20: RollingStd = field(default_factory=lambda: RollingStd(20))
+    range5: RollingMean = field(default_factory=lambda: RollingMean(5))
+
+
+def _div_ret(c: Optional[float], c_lag: Optional[float]) -> Optional[float]:
+    # Spark(non-ANSI): null 피연산자 또는 0으로 나누기 → null
+    if c is None or c_lag is None or c_lag == 0:
+        return None
+    return c / c_lag - 1.0
+
+
+def _minute(ts: datetime) -> datetime:
+    return ts.replace(second=0, microsecond=0)
+
+
+def _tick_order(ts: datetime, tcnt: Optional[int]) -> Tuple[datetime, bool, int]:
+    # gold 의 struct(ts, tcnt) 정렬과 동일: 같은 ts 면 tcnt, null tcnt 가 가장 앞
+    return ts, tcnt is not None, tcnt or 0
+
+
+class OnlineFeatureEngine:
+    """Tick -> 1m bar -> feature row, incrementally per (ymcode, side, code, strike).
+
+    ``on_tick`` returns the feature rows of bars closed by that tick (a tick
+    in a later minute closes the entity's open bar). ``flush(now)`` closes
+    bars whose minute is before ``now``'s minute; ``flush()`` closes all.
+    Ticks for an already closed minute are counted in ``late_ticks`` and dropped.
+    """
+
+    def __init__(self):
+        self.state: Dict[EntityKey, EntityState] = {}
+        self.late_ticks = 0
+
+    def on_tick(self, tick: Dict[str, Any]) -> List[Dict[str, Any]]:
+        key: EntityKey = (tick["ymcode"], tick["side"], tick["code"], tick["strike"])
+        st = self.state.get(key)
+        if st is None:
+            st = self.state[key] = EntityState()
+
+        ts: datetime = tick["ts"]
+        m = _minute(ts)
+        out = []
+        bar = st.current
+        if (bar is not None and m < bar.bar_ts) or (st.last_bar_ts is not None and m <= st.last_bar_ts):
+            self.late_ticks += 1
+            return out
+        if bar is not None and m != bar.bar_ts:
+            out.append(self._close(key, st))
+            bar = None
+        if bar is None:
+            bar = st.current = Bar(bar_ts=m)
+
+        price, hi, lo, oi = tick.get("price"), tick.get("high"), tick.get("low"), tick.get("oi")
+        order = _tick_order(ts, tick.get("tcnt"))
+        if bar.first is None or order < bar.first:
+            bar.first, bar.o = order, tick.get("open")
+        if bar.last is None or order >= bar.last:
+            bar.last, bar.c, bar.oi_last = order, price, oi
+        if hi is not None and (bar.h is None or hi > bar.h):
+            bar.h = hi
+        if lo is not None and (bar.l is None or lo < bar.l):
+            bar.l = lo
+        bar.tick_count += 1
+        bar.v += int(tick.get("ccnt") or 0)
+        return out
+
+    def flush(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        cutoff = _minute(now) if now is not None else None
+        out = []
+        for key, st in self.state.items():
+            if st.current is not None and (cutoff is None or st.current.bar_ts < cutoff):
+                out.append(self._close(key, st))
+        return out
+
+    def _close(self, key: EntityKey, st: EntityState) -> Dict[str, Any]:
+        bar = st.current
+        st.current = None
+        st.last_bar_ts = bar.bar_ts
+
+        c_lag1 = st.closes[-1] if len(st.closes) >= 1 else None
+        c_lag5 = st.closes[-5] if len(st.closes) >= 5 else None
+        oi_lag5 = st.ois[-5] if len(st.ois) >= 5 else None
+        st.closes.append(bar.c)
+        st.ois.append(bar.oi_last)
+
+        ret_1 = _div_ret(bar.c, c_lag1)
+        ret_5 = _div_ret(bar.c, c_lag5)
+        range_1 = None
+        if bar.h is not None and bar.l is not None and bar.c:
+            range_1 = (bar.h - bar.l) / bar.c
+        oi_chg_5 = None
+        if oi_lag5 is not None and bar.oi_last is not None:
+            oi_chg_5 = bar.oi_last - oi_lag5
+
+        vol_20 = st.vol20.push(ret_1)
+        range_5 = st.range5.push(range_1)
+
+        ymcode, side, code, strike = key
+        return {
+            "ymcode": ymcode,
+            "side": side,
+            "code": code,
+            "strike": strike,
+            "asof_ts": bar.bar_ts,
+            "f_ret_1": ret_1,
+            "f_ret_5": ret_5,
+            "f_vol_20": vol_20,
+            "f_range_5": range_5,
+            "f_oi_chg_5": oi_chg_5,
+            "f_spread_proxy": range_5,
+            "f_iv_proxy": vol_20,
+            "trade_date": bar.bar_ts.date(),
+            "bar": {"o": bar.o, "h": bar.h, "l": bar.l, "c": bar.c,
+                    "tick_count": bar.tick_count, "v": bar.v, "oi_last": bar.oi_last},
+        }
+
+
+def feature_key(row: Dict[str, Any]) -> str:
+    # options:{ymcode}:{side}:{code}:{strike}:{asof_ts}  (agent_runtime 예시 키와 동일)
+    asof = row["asof_ts"].astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    return f"options:{row['ymcode']}:{row['side']}:{row['code']}:{row['strike']}:{asof}"
+
+
+def publish_features(r, codec, rows: Iterable[Dict[str, Any]], channel: Optional[str] = None,
+                     ttl_s: Optional[int] = None, n_shards: int = 0) -> int:
+    """Write feature rows to Redis with the binary codec (one pipeline round trip).
+
+    With ``channel`` set, also PUBLISHes each key for the async runtime's
+    channel source; with ``n_shards`` > 0 to the key's shard channel
+    ``{channel}:{shard}`` (sharded runtime, ``--dispatch direct``).
+    """
+    from runtime.feature_codec import write_features
+
+    if n_shards:
+        from runtime.sharded_runtime import shard_channel, shard_of
+
+    pipe = r.pipeline(transaction=False)
+    n = 0
+    for row in rows:
+        key = feature_key(row)
+        write_features(pipe, codec, key, row, row["asof_ts"], ttl_s)
+        if channel:
+            pipe.publish(shard_channel(channel, shard_of(key, n_shards)) if n_shards else channel, key)
+        n += 1
+    pipe.execute()
+    return n
+
+
+def compare_to_gold(rows: Iterable[Dict[str, Any]], gold: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    """Compare engine output with gold_features_1m rows on (entity, asof_ts).
+
+    Reports, per feature, exact-match count and max abs difference.
+    A null on one side and a value on the other counts as a mismatch.
+    """
+    def k(r):
+        return (r["ymcode"], r["side"], r["code"], int(r["strike"]), _as_utc(r["asof_ts"]))
+
+    gold_by_key = {k(g): g for g in gold}
+    report: Dict[str, Any] = {c: {"exact": 0, "null_mismatch": 0, "max_abs_diff": 0.0} for c in FEATURE_COLS}
+    matched = missing = 0
+    for r in rows:
+        g = gold_by_key.get(k(r))
+        if g is None:
+            missing += 1
+            continue
+        matched += 1
+        for c in FEATURE_COLS:
+            a, b = _null_if_nan(r[c]), _null_if_nan(g[c])
+            if a is None or b is None:
+                report[c]["exact" if a is None and b is None else "null_mismatch"] += 1
+                continue
+            if a == b:
+                report[c]["exact"] += 1
+            report[c]["max_abs_diff"] = max(report[c]["max_abs_diff"], abs(a - b))
+    return {"matched": matched, "missing_in_gold": missing, "features": report}
+
+
+def _null_if_nan(v: Optional[float]) -> Optional[float]:
+    return None if v is None or (isinstance(v, float) and math.isnan(v)) else v
+
+
+def _as_utc(ts: datetime) -> datetime:
+    return ts.replace(tzinfo=timezone.utc) if ts.tzinfo is None else ts.astimezone(timezone.utc)
+
+
+def main():
+    # 리플레이 검증: silver_ticks / gold_features_1m 의 Parquet export를 읽어 비교
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--silver-parquet", required=True)
+    ap.add_argument("--gold-parquet", required=True)
+    args = ap.parse_args()
+
+    import pyarrow.parquet as pq
+
+    cols = ["ymcode", "side", "code", "strike", "ts", "tcnt", "price", "open", "high", "low", "oi", "ccnt"]
+    ticks = pq.read_table(args.silver_parquet, columns=cols).sort_by("ts").to_pylist()
+
+    eng = OnlineFeatureEngine()
+    rows = []
+    for t in ticks:
+        t["ts"] = _as_utc(t["ts"])
+        rows.extend(eng.on_tick(t))
+    rows.extend(eng.flush())
+
+    gold = pq.read_table(args.gold_parquet).to_pylist()
+    out = compare_to_gold(rows, gold)
+    out["late_ticks"] = eng.late_ticks
+    print(json.dumps(out, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from runtime.agent_runtime import FEATURE_COLS, RuntimeConfig, TradingAgent
+from runtime.feature_codec import write_features
+from runtime.online_features import feature_key
+
+
+class InMemoryRedis:
+    """Minimal in-process stand-in for the redis-py calls the runtime makes.
+
+    Lets the replay measure agent overhead without network round trips
+    (``--store memory``); use ``--store redis`` to include them.
+    """
+
+    def __init__(self):
+        self._d: Dict[str, bytes] = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._d.get(key)
+
+    def mget(self, keys: Iterable[str]) -> List[Optional[bytes]]:
+        d = self._d
+        return [d.get(k) for k in keys]
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None) -> bool:
+        self._d[key] = value
+        return True
+
+    def publish(self, channel: str, message: str) -> int:
+        return 0
+
+    def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None):
+        prefix = (match or "").rstrip("*")
+        return (k.encode() for k in list(self._d) if k.startswith(prefix))
+
+    def pipeline(self, transaction: bool = False) -> "InMemoryRedis":
+        return self
+
+    def execute(self) -> List[Any]:
+        return []
+
+
+def load_gold_features(parquet: Optional[str], table: Optional[str],
+                       start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    """gold_features_1m rows in [start, end] (trade_date, inclusive), sorted by asof_ts."""
+    cols = ["ymcode", "side", "code", "strike", "asof_ts", "trade_date"] + FEATURE_COLS
+    if parquet:
+        import pyarrow.dataset as ds
+
+        filt = None
+        f = ds.field("trade_date")
+        if start:
+            filt = f >= pd.Timestamp(start).date()
+        if end:
+            filt = (f <= pd.Timestamp(end).date()) if filt is None else filt & (f <= pd.Timestamp(end).date())
+        pdf = ds.dataset(parquet, format="parquet").to_table(columns=cols, filter=filt).to_pandas()
+    else:
+        from pyspark.sql import functions as F
+        from spark_jobs.common_spark import build_spark
+
+        spark = build_spark("replay_gold_features")
+        df = spark.table(table).select(*cols)
+        if start:
+            df = df.where(F.col("trade_date") >= F.to_date(F.lit(start)))
+        if end:
+            df = df.where(F.col("trade_date") <= F.to_date(F.lit(end)))
+        pdf = df.toPandas()
+        spark.stop()
+    pdf["asof_ts"] = pd.to_datetime(pdf["asof_ts"], utc=True)
+    return pdf.sort_values("asof_ts", kind="stable").reset_index(drop=True)
+
+
+def _pct(xs: List[float], p: float) -> float:
+    if not xs:
+        return 0.0
+    return float(np.percentile(np.asarray(xs), p))
+
+
+def replay(agent: TradingAgent, pdf: pd.DataFrame, mode: str = "batch",
+           speed: float = 0.0) -> Dict[str, Any]:
+    """Load each minute's rows into the store and score them through the agent.
+
+    ``speed`` = 0 runs as fast as possible; N > 0 replays each minute at
+    ``(asof_ts - first asof_ts) / N`` after the start, so lunch breaks,
+    overnight and missing-minute gaps keep their real (scaled) length.
+    Returns throughput, latency percentiles and max |replay - batch predict|.
+    """
+    rows = pdf.to_dict("records")
+    minutes: "OrderedDict[Any, List[Dict[str, Any]]]" = OrderedDict()
+    for r in rows:
+        minutes.setdefault(r["asof_ts"], []).append(r)
+
+    preds = np.full(len(rows), np.nan)
+    lat_ms: List[float] = []
+    n_dec = 0
+    idx = 0
+    first_asof = next(iter(minutes), None)
+    t_start = time.perf_counter()
+    for asof, batch in minutes.items():
+        if speed > 0:
+            wait = t_start + (asof - first_asof).total_seconds() / speed - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+
+        pipe = agent.r.pipeline(transaction=False)
+        keys = []
+        for r in batch:
+            key = feature_key(r)
+            write_features(pipe, agent.codec, key, r, r["asof_ts"].to_pydatetime())
+            keys.append(key)
+        pipe.execute()
+
+        if mode == "batch":
+            t0 = time.perf_counter()
+            outs = agent.run_batch(keys)
+            lat_ms.append((time.perf_counter() - t0) * 1000.0)
+        else:
+            outs = []
+            for k in keys:
+                t0 = time.perf_counter()
+                outs.append(agent.run_once(k))
+                lat_ms.append((time.perf_counter() - t0) * 1000.0)
+
+        for o in outs:
+            if o["ok"]:
+                preds[idx] = o["pred"]
+                n_dec += 1
+            idx += 1
+    elapsed = time.perf_counter() - t_start
+
+    # 같은 모델의 오프라인 배치 예측 (pyfunc 1회 호출)
+    offline = np.asarray(agent.model.predict(pdf[FEATURE_COLS].astype("float64")), dtype=np.float64)
+    diff = np.abs(preds - offline)
+
+    return {
+        "rows": len(rows),
+        "minutes": len(minutes),
+        "decisions": n_dec,
+        "mode": mode,
+        "speed": speed,
+        "elapsed_s": elapsed,
+        "decisions_per_s": n_dec / max(elapsed, 1e-9),
+        "latency_unit": "per_minute_batch" if mode == "batch" else "per_key",
+        "latency_p50_ms": _pct(lat_ms, 50),
+        "latency_p95_ms": _pct(lat_ms, 95),
+        "latency_p99_ms": _pct(lat_ms, 99),
+        "latency_max_ms": max(lat_ms) if lat_ms else 0.0,
+        "max_abs_diff_vs_batch": float(np.nanmax(diff)) if n_dec else None,
+        "model_version": agent.active.version,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    src = ap.add_mutually_exclusive_group(required=True)
+    src.add_argument("--parquet", help="local Parquet export of gold_features_1m")
+    src.add_argument("--table", help="e.g. lakehouse.options.gold_features_1m")
+    ap.add_argument("--start", default=None, help="trade_date from (YYYY-MM-DD)")
+    ap.add_argument("--end", default=None, help="trade_date to (YYYY-MM-DD)")
+    ap.add_argument("--store", default="memory", choices=["memory", "redis"])
+    ap.add_argument("--mode", default="batch", choices=["batch", "once"])
+    ap.add_argument("--speed", type=float, default=0.0, help="0 = as fast as possible, N = N x wall clock")
+    ap.add_argument("--fast-predict", action="store_true")
+    ap.add_argument("--mlflow-uri", default=RuntimeConfig.mlflow_uri)
+    ap.add_argument("--redis-host", default=RuntimeConfig.redis_host)
+    ap.add_argument("--redis-port", type=int, default=RuntimeConfig.redis_port)
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    args = ap.parse_args()
+
+    pdf = load_gold_features(args.parquet, args.table, args.start, args.end)
+
+    agent = TradingAgent(RuntimeConfig(
+        mlflow_uri=args.mlflow_uri,
+        redis_host=args.redis_host,
+        redis_port=args.redis_port,
+        fast_predict=args.fast_predict,
+    ))
+    if args.store == "memory":
+        agent.r = InMemoryRedis()
+
+    report = replay(agent, pdf, mode=args.mode, speed=args.speed)
+    report.update(store=args.store, fast_predict=args.fast_predict)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import dataclasses
+import gc
+import json
+import multiprocessing as mp
+import os
+import signal
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from runtime.agent_runtime import RuntimeConfig, TradingAgent, add_cache_and_log_args
+from runtime.async_runtime import AsyncAgentRuntime, AsyncRuntimeConfig, notification_batches
+
+
+RELAY = -1  # stats 큐에서 relay 프로세스의 shard 번호
+
+
+def entity_of(key: str) -> str:
+    # options:{ymcode}:{side}:{code}:{strike}:{asof_ts} -> "ymcode:side:code:strike"
+    parts = key.split(":", 5)
+    return ":".join(parts[1:5])
+
+
+def shard_of(key: str, n_shards: int) -> int:
+    # 프로세스 간 안정적인 해시 (내장 hash()는 PYTHONHASHSEED에 따라 달라짐)
+    return zlib.crc32(entity_of(key).encode("utf-8")) % n_shards
+
+
+def shard_channel(channel: str, shard: int) -> str:
+    # 워커 idx 는 "{channel}:{idx}" 만 구독 (자기 샤드의 키만 수신·디코드)
+    return f"{channel}:{shard}"
+
+
+def _noop(_out: Dict[str, Any]) -> None:
+    pass
+
+
+class ShardRelay:
+    """Single subscriber that fans the notification stream out to per-shard channels.
+
+    Decodes every notification once (instead of once per worker) and
+    PUBLISHes the key to ``shard_channel(channel, shard_of(key))`` with one
+    pipeline per received batch.
+    """
+
+    def __init__(self, host: str, port: int, cfg: AsyncRuntimeConfig, n_shards: int):
+        self.cfg = cfg
+        self.n_shards = n_shards
+        self.r = aioredis.Redis(host=host, port=port, db=cfg.redis_db, decode_responses=False)
+        self._stop = asyncio.Event()
+        self.stats = {"relayed": 0, "relay_batches": 0}
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    async def run(self) -> Dict[str, int]:
+        channels = [shard_channel(self.cfg.channel, i) for i in range(self.n_shards)]
+        try:
+            async for keys in notification_batches(self.r, self.cfg, self._stop):
+                pipe = self.r.pipeline(transaction=False)
+                for key in keys:
+                    pipe.publish(channels[shard_of(key, self.n_shards)], key)
+                await pipe.execute()
+                self.stats["relayed"] += len(keys)
+                self.stats["relay_batches"] += 1
+        finally:
+            await self.r.aclose()
+        return self.stats
+
+
+async def _run_worker(rt, idx: int, stats_q, report_interval_s: float) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, rt.stop)
+
+    async def report():
+        while True:
+            await asyncio.sleep(report_interval_s)
+            stats_q.put((idx, os.getpid(), dict(rt.stats)))
+
+    reporter = asyncio.create_task(report())
+    try:
+        await rt.run()
+    finally:
+        reporter.cancel()
+        stats_q.put((idx, os.getpid(), dict(rt.stats)))
+
+
+def _worker_main(idx: int, agent: TradingAgent, acfg: AsyncRuntimeConfig,
+                 stats_q, report_interval_s: float, quiet: bool,
+                 decision_log_dir: Optional[str] = None) -> None:
+    # fork 직후: 모델은 부모와 copy-on-write 공유, Redis 연결 풀은 워커 전용으로 새로 생성
+    agent.r = redis.Redis(host=agent.cfg.redis_host, port=agent.cfg.redis_port, decode_responses=False)
+    # 결정 로그 writer 스레드도 fork 를 넘지 못하므로 워커마다 새로 (파일명에 shard)
+    if decision_log_dir:
+        agent.open_decision_log(decision_log_dir, name=f"decisions-shard{idx}")
+    # 전체 스트림이 아니라 자기 샤드 채널만 구독
+    wcfg = dataclasses.replace(acfg, source="channel", channel=shard_channel(acfg.channel, idx),
+                               configure_notify=False)
+    rt = AsyncAgentRuntime(agent, wcfg, on_decision=_noop if quiet else None)
+    try:
+        asyncio.run(_run_worker(rt, idx, stats_q, report_interval_s))
+    finally:
+        # 남은 결정을 flush 하고 .inprogress 파일을 닫음 (프로세스는 곧 os._exit)
+        agent.close()
+
+
+def _relay_main(n_shards: int, host: str, port: int, acfg: AsyncRuntimeConfig,
+                stats_q, report_interval_s: float) -> None:
+    asyncio.run(_run_worker(ShardRelay(host, port, acfg, n_shards), RELAY, stats_q, report_interval_s))
+
+
+class ShardSupervisor:
+    """Load the model once, fork N sharded workers and keep them alive.
+
+    Each worker subscribes only to its own channel ``{channel}:{shard}``,
+    so every entity (ymcode, side, code, strike) is always scored by the
+    same process and a worker decodes only its own notifications. With
+    ``dispatch="relay"`` one extra ``ShardRelay`` process reads the
+    configured source (keyspace events or ``channel``) once and fans keys
+    out to the shard channels; with ``dispatch="direct"`` writers publish
+    to the shard channels themselves (``publish_features(..., n_shards=N)``).
+    ``gc.freeze()`` before forking keeps the collector from touching (and
+    copying) the shared model pages. With ``decision_log_dir`` set, each
+    worker writes its own ``decisions-shard{i}-*.parquet`` files. Dead workers are re-forked from the
+    supervisor, which still holds the loaded model. Model updates need a
+    supervisor restart (background reload is disabled because threads do
+    not survive fork).
+    """
+
+    def __init__(self, cfg: RuntimeConfig, acfg: AsyncRuntimeConfig, n_workers: int,
+                 report_interval_s: float = 5.0, quiet: bool = False, dispatch: str = "relay"):
+        if dispatch not in ("relay", "direct"):
+            raise ValueError(f"dispatch must be 'relay' or 'direct', got {dispatch!r}")
+        cfg.reload_interval_s = 0.0
+        cfg.l1_cache_size = 0
+        # 부모에서는 writer 를 만들지 않고 워커가 fork 후 각자 생성
+        self.decision_log_dir, cfg.decision_log_dir = cfg.decision_log_dir, None
+        self.agent = TradingAgent(cfg)
+        self.acfg = acfg
+        self.n_workers = n_workers
+        self.report_interval_s = report_interval_s
+        self.quiet = quiet
+        self.dispatch = dispatch
+        self.ctx = mp.get_context("fork")
+        self.stats_q = self.ctx.Queue()
+        self.procs: List[Optional[mp.Process]] = [None] * n_workers
+        self.relay: Optional[mp.Process] = None
+        # (shard, pid)별 누적 카운터: 재시작된 워커의 이전 카운트도 합계에 남김
+        self.worker_stats: Dict[Tuple[int, int], Dict[str, int]] = {}
+        self.restarts = 0
+        self.done_at: Optional[float] = None  # stop_after 에 도달한 시각 (perf_counter)
+        self._stop = False
+
+    def _spawn(self, idx: int) -> None:
+        p = self.ctx.Process(
+            target=_worker_main,
+            args=(idx, self.agent, self.acfg, self.stats_q,
+                  self.report_interval_s, self.quiet, self.decision_log_dir),
+            name=f"agent-shard-{idx}",
+            daemon=False,
+        )
+        p.start()
+        self.procs[idx] = p
+
+    def _spawn_relay(self) -> None:
+        self.relay = self.ctx.Process(
+            target=_relay_main,
+            args=(self.n_workers, self.agent.cfg.redis_host, self.agent.cfg.redis_port, self.acfg,
+                  self.stats_q, self.report_interval_s),
+            name="agent-shard-relay",
+            daemon=False,
+        )
+        self.relay.start()
+
+    def _drain_stats(self) -> None:
+        while not self.stats_q.empty():
+            idx, pid, st = self.stats_q.get_nowait()
+            self.worker_stats[(idx, pid)] = st
+
+    def totals(self) -> Dict[str, int]:
+        out: Dict[str, int] = {}
+        for st in self.worker_stats.values():
+            for k, v in st.items():
+                out[k] = out.get(k, 0) + v
+        return out
+
+    def stop(self, *_args) -> None:
+        self._stop = True
+
+    def run(self, stop_after: Optional[int] = None) -> Dict[str, Any]:
+        """Supervise until SIGINT/SIGTERM, or until ``stop_after`` decisions were reported."""
+        gc.collect()
+        gc.freeze()
+        for i in range(self.n_workers):
+            self._spawn(i)
+        if self.dispatch == "relay":
+            self._spawn_relay()
+
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
+
+        t0 = last_t = time.perf_counter()
+        last_scored = 0
+        while not self._stop:
+            time.sleep(self.report_interval_s)
+            for i, p in enumerate(self.procs):
+                if p is not None and not p.is_alive() and not self._stop:
+                    print(json.dumps({"event": "worker_restart", "shard": i, "exitcode": p.exitcode}))
+                    self.restarts += 1
+                    self._spawn(i)
+            if self.relay is not None and not self.relay.is_alive() and not self._stop:
+                print(json.dumps({"event": "worker_restart", "shard": "relay", "exitcode": self.relay.exitcode}))
+                self.restarts += 1
+                self._spawn_relay()
+            self._drain_stats()
+            now = time.perf_counter()
+            tot = self.totals()
+            scored = tot.get("scored", 0) + tot.get("missing", 0)
+            print(json.dumps({
+                "event": "throughput",
+                "workers": self.n_workers,
+                "decisions_per_s": (scored - last_scored) / max(now - last_t, 1e-9),
+                **tot,
+            }))
+            last_t, last_scored = now, scored
+            if stop_after is not None and scored >= stop_after:
+                self.done_at = now
+                self._stop = True
+
+        # relay 를 먼저 멈춰 더 이상 키가 들어오지 않게 한 뒤 워커를 정리
+        if self.relay is not None:
+            if self.relay.is_alive():
+                self.relay.terminate()
+            self.relay.join()
+        for p in self.procs:
+            if p is not None and p.is_alive():
+                p.terminate()  # SIGTERM → 워커는 큐를 비우고 종료
+        for p in self.procs:
+            if p is not None:
+                p.join()
+        self._drain_stats()
+        elapsed = time.perf_counter() - t0
+        tot = self.totals()
+        scored = tot.get("scored", 0) + tot.get("missing", 0)
+        return dict(tot, restarts=self.restarts, elapsed_s=elapsed,
+                    decisions_per_s=scored / max(elapsed, 1e-9))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    ap.add_argument("--source", default="keyspace", choices=["keyspace", "channel"])
+    ap.add_argument("--channel", default=AsyncRuntimeConfig.channel)
+    ap.add_argument("--configure-notify", action="store_true")
+    ap.add_argument("--dispatch", default="relay", choices=["relay", "direct"],
+                    help="relay: one process fans the source out to {channel}:{shard}; "
+                         "direct: writers already publish to {channel}:{shard}")
+    ap.add_argument("--max-batch", type=int, default=AsyncRuntimeConfig.max_batch)
+    ap.add_argument("--fast-predict", action="store_true")
+    ap.add_argument("--model-cache-dir", default=None)
+    ap.add_argument("--report-interval-s", type=float, default=5.0)
+    ap.add_argument("--quiet", action="store_true", help="do not print per-key decisions")
+    add_cache_and_log_args(ap, l1=False)
+    args = ap.parse_args()
+
+    sup = ShardSupervisor(
+        RuntimeConfig(fast_predict=args.fast_predict, model_cache_dir=args.model_cache_dir,
+                      decision_log_dir=args.decision_log_dir, decision_log_on_full=args.decision_log_on_full),
+        AsyncRuntimeConfig(
+            source=args.source,
+            channel=args.channel,
+            configure_notify=args.configure_notify,
+            max_batch=args.max_batch,
+        ),
+        n_workers=args.workers,
+        report_interval_s=args.report_interval_s,
+        quiet=args.quiet,
+        dispatch=args.dispatch,
+    )
+    print(json.dumps(sup.run(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
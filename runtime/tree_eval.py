@@ -0,0 +1,190 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+import numpy as np
+
+
+# LightGBM missing_type / 0 판정 (include/LightGBM/tree.h 의 NumericalDecision과 동일)
+MISSING_NONE, MISSING_ZERO, MISSING_NAN = 0, 1, 2
+_MISSING = {"None": MISSING_NONE, "Zero": MISSING_ZERO, "NaN": MISSING_NAN}
+K_ZERO_THRESHOLD = 1e-35
+
+ARTIFACT_NAME = "flat_trees.npz"
+
+
+def flatten_booster(booster) -> Dict[str, np.ndarray]:
+    """Flatten every tree of a LightGBM Booster into contiguous arrays.
+
+    All trees share one node array space, nodes in pre-order (left child
+    first). Leaves point to themselves (left == right == own index).
+    Categorical splits (``is_cat``) keep their left-going categories in
+    ``cat_values[cat_start:cat_end]``.
+    """
+    dump = booster.dump_model()
+    # 출력 변환이 항등인 회귀 목적함수만 지원 (sqrt/poisson/분류 등은 변환이 붙음)
+    obj = dump.get("objective", "").split(" ")
+    if obj[0] not in ("regression", "regression_l1", "huber", "fair", "quantile") or "sqrt" in obj:
+        raise ValueError(f"unsupported objective for flat trees: {dump.get('objective')}")
+
+    feature, threshold, left, right, value, default_left, missing = [], [], [], [], [], [], []
+    is_cat, cat_start, cat_end, cat_values = [], [], [], []
+    roots, max_depth = [], 0
+
+    def add(node: Dict[str, Any], depth: int) -> int:
+        nonlocal max_depth
+        i = len(feature)
+        feature.append(0)
+        threshold.append(0.0)
+        left.append(i)
+        right.append(i)
+        value.append(0.0)
+        default_left.append(False)
+        missing.append(MISSING_NONE)
+        is_cat.append(False)
+        cat_start.append(0)
+        cat_end.append(0)
+        if "leaf_value" in node:
+            value[i] = float(node["leaf_value"])
+            max_depth = max(max_depth, depth)
+            return i
+        feature[i] = int(node["split_feature"])
+        if node["decision_type"] == "==":
+            # 범주형: threshold = "0||3||6" (왼쪽으로 가는 범주), NaN/음수는 항상 오른쪽
+            is_cat[i] = True
+            cat_start[i] = len(cat_values)
+            cat_values.extend(float(c) for c in str(node["threshold"]).split("||"))
+            cat_end[i] = len(cat_values)
+        elif node["decision_type"] == "<=":
+            threshold[i] = float(node["threshold"])
+            default_left[i] = bool(node["default_left"])
+            missing[i] = _MISSING[node["missing_type"]]
+        else:
+            raise ValueError(f"unsupported decision_type: {node['decision_type']}")
+        left[i] = add(node["left_child"], depth + 1)
+        right[i] = add(node["right_child"], depth + 1)
+        return i
+
+    for t in dump["tree_info"]:
+        if t.get("is_linear"):
+            raise ValueError("linear trees are not supported by the flat tree evaluator")
+        roots.append(add(t["tree_structure"], 0))
+
+    # 범주형 분기별 왼쪽 범주 비트셋 (평가 시 범주 값으로 바로 인덱싱)
+    cat_nodes = [i for i, c in enumerate(is_cat) if c]
+    n_cats = int(max(cat_values)) + 1 if cat_values else 0
+    cat_row = np.full(len(feature), -1, dtype=np.int32)
+    cat_bits = np.zeros((len(cat_nodes), n_cats), dtype=np.bool_)
+    for r, i in enumerate(cat_nodes):
+        cat_row[i] = r
+        cat_bits[r, np.asarray(cat_values[cat_start[i]:cat_end[i]], dtype=np.intp)] = True
+
+    return {
+        "feature": np.asarray(feature, dtype=np.int32),
+        "threshold": np.asarray(threshold, dtype=np.float64),
+        "left": np.asarray(left, dtype=np.int32),
+        "right": np.asarray(right, dtype=np.int32),
+        "value": np.asarray(value, dtype=np.float64),
+        "default_left": np.asarray(default_left, dtype=np.bool_),
+        "missing_type": np.asarray(missing, dtype=np.int8),
+        "cat_row": cat_row,
+        "cat_bits": cat_bits,
+        "roots": np.asarray(roots, dtype=np.int32),
+        "max_depth": np.asarray(max_depth, dtype=np.int32),
+        "num_features": np.asarray(dump["max_feature_idx"] + 1, dtype=np.int32),
+    }
+
+
+class FlatTrees:
+    """Vectorized evaluator over ``flatten_booster`` arrays.
+
+    All (row, tree) pairs descend together, one NumPy step per tree level,
+    and pairs that reached a leaf drop out of the active set, so the work is
+    the summed path length rather than every split of every tree. The
+    arrays are used as loaded (``flat_trees.npz``); nothing is rebuilt per
+    tree. Tree outputs are accumulated with ``cumsum`` (strictly sequential,
+    in tree order) like LightGBM, so results match ``Booster.predict``
+    exactly for regression objectives.
+    """
+
+    REQUIRED = ("feature", "threshold", "left", "right", "value", "default_left", "missing_type",
+                "cat_row", "cat_bits", "roots", "num_features")
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        missing = [k for k in self.REQUIRED if k not in arrays]
+        if missing:
+            raise ValueError(f"flat trees arrays missing {missing}; re-export with ml/export_lgbm_trees.py")
+        self.arrays = arrays
+        self.num_features = int(arrays["num_features"])
+        self.roots = arrays["roots"].astype(np.intp)
+        self.feature = arrays["feature"].astype(np.intp)
+        self.threshold = arrays["threshold"]
+        # child[2i] = 오른쪽, child[2i+1] = 왼쪽: go_left(bool) 로 바로 인덱싱
+        self.child = np.stack([arrays["right"], arrays["left"]], axis=1).astype(np.intp).reshape(-1)
+        self.value = arrays["value"]
+        self.default_left = arrays["default_left"]
+        self.is_leaf = arrays["left"] == np.arange(len(arrays["left"]))
+        self.missing_nan = arrays["missing_type"] == MISSING_NAN
+        self.missing_zero = arrays["missing_type"] == MISSING_ZERO
+        self.has_missing_zero = bool(self.missing_zero.any())
+        self.cat_row = arrays["cat_row"].astype(np.intp)
+        self.cat_bits = arrays["cat_bits"]
+        self.has_cat = bool(self.cat_bits.shape[0])
+
+    @property
+    def num_trees(self) -> int:
+        return int(self.roots.shape[0])
+
+    @classmethod
+    def load(cls, path: str) -> "FlatTrees":
+        with np.load(path) as z:
+            return cls({k: z[k] for k in z.files})
+
+    @classmethod
+    def from_booster(cls, booster) -> "FlatTrees":
+        return cls(flatten_booster(booster))
+
+    def save(self, path: str) -> None:
+        np.savez(path, **self.arrays)
+
+    def _go_left(self, nd: np.ndarray, v: np.ndarray, has_nan: bool) -> np.ndarray:
+        # LightGBM NumericalDecision / CategoricalDecision (include/LightGBM/tree.h)
+        go = v <= self.threshold[nd]
+        is_nan = np.isnan(v) if has_nan else False
+        if has_nan and is_nan.any():
+            # 결측 규칙이 NaN 이 아니면 NaN → 0.0 으로 비교
+            go = np.where(is_nan, np.where(self.missing_nan[nd], self.default_left[nd], 0.0 <= self.threshold[nd]),
+                          go)
+        if self.has_missing_zero:
+            zero = self.missing_zero[nd] & (is_nan | (np.abs(v) <= K_ZERO_THRESHOLD))
+            go = np.where(zero, self.default_left[nd], go)
+        if self.has_cat:
+            row = self.cat_row[nd]
+            cat = row >= 0
+            if cat.any():
+                # int 로 자른 값이 집합에 있으면 왼쪽, NaN/음수/범위 밖은 오른쪽
+                cv = np.trunc(v[cat])
+                ok = (cv >= 0) & (cv < self.cat_bits.shape[1])
+                hit = np.zeros(cv.shape, dtype=np.bool_)
+                hit[ok] = self.cat_bits[row[cat][ok], cv[ok].astype(np.intp)]
+                go[cat] = hit
+        return go
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """x: (n_rows, num_features) float64 -> (n_rows,) float64."""
+        x = np.asarray(x, dtype=np.float64)
+        if x.ndim == 1:
+            x = x.reshape(1, -1)
+        n, t = x.shape[0], self.num_trees
+        node = np.tile(self.roots, n)  # (row, tree) 순서로 펼친 현재 노드
+        flat_x = x.reshape(-1)
+        base = np.repeat(np.arange(n, dtype=np.intp) * x.shape[1], t)
+        has_nan = bool(np.isnan(flat_x).any())
+        active = np.flatnonzero(~self.is_leaf[node])
+        while active.size:
+            nd = node[active]
+            go = self._go_left(nd, flat_x[base[active] + self.feature[nd]], has_nan)
+            nxt = self.child[2 * nd + go]
+            node[active] = nxt
+            active = active[~self.is_leaf[nxt]]
+        return np.cumsum(self.value[node].reshape(n, t), axis=1)[:, -1]
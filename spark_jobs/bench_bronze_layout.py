@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import date, timedelta
+from typing import Any, Dict
+
+from pyspark.sql import functions as F
+
+from spark_jobs.bronze_tables import (
+    BRONZE_TICKS,
+    DEFAULT_TARGET_FILE_SIZE_MB,
+    TICKS_DDL,
+    ensure_bronze_tables,
+)
+from spark_jobs.common_spark import build_spark
+from spark_jobs.etl_bronze_to_silver import to_silver_ticks
+
+
+def planned_scan(spark, table: str, day: date) -> Dict[str, Any]:
+    """Files/bytes/records Iceberg plans for ``tdate`` within ``day`` (UTC), via the Java scan API.
+
+    Counts what a reader must open after partition and column-stats pruning.
+    """
+    jvm = spark._jvm
+    tbl = jvm.org.apache.iceberg.spark.Spark3Util.loadIcebergTable(spark._jsparkSession, table)
+    E = jvm.org.apache.iceberg.expressions.Expressions
+    start = f"{day.isoformat()}T00:00:00+00:00"
+    end = f"{(day + timedelta(days=1)).isoformat()}T00:00:00+00:00"
+    expr = getattr(E, "and")(E.greaterThanOrEqual("tdate", start), E.lessThan("tdate", end))
+    files = bytes_ = records = 0
+    it = tbl.newScan().filter(expr).planFiles().iterator()
+    while it.hasNext():
+        f = it.next().file()
+        files += 1
+        bytes_ += f.fileSizeInBytes()
+        records += f.recordCount()
+    it.close()
+    return {"files": files, "bytes": bytes_, "records": records}
+
+
+def table_totals(spark, table: str) -> Dict[str, Any]:
+    r = spark.sql(
+        f"SELECT count(*) AS files, sum(file_size_in_bytes) AS bytes, sum(record_count) AS records "
+        f"FROM {table}.files"
+    ).collect()[0]
+    return {"files": r["files"], "bytes": r["bytes"], "records": r["records"]}
+
+
+def silver_rebuild_s(spark, table: str, day: date) -> float:
+    # 하루치 silver 변환을 끝까지 실행 (noop 싱크: 쓰기 비용 제외, 읽기/변환만)
+    # to_date(tdate) 비교는 소스로 푸시다운되지 않으므로 tdate 범위 조건으로 필터
+    start = F.to_timestamp(F.lit(f"{day.isoformat()} 00:00:00"))
+    end = F.to_timestamp(F.lit(f"{(day + timedelta(days=1)).isoformat()} 00:00:00"))
+    b = spark.table(table).where((F.col("tdate") >= start) & (F.col("tdate") < end))
+    t0 = time.perf_counter()
+    to_silver_ticks(b).write.format("noop").mode("overwrite").save()
+    return time.perf_counter() - t0
+
+
+def build_copies(spark, source: str, baseline: str, optimized: str, target_file_size_mb: int) -> None:
+    src = spark.table(source)
+    spark.sql(f"DROP TABLE IF EXISTS {baseline}")
+    spark.sql(f"DROP TABLE IF EXISTS {optimized}")
+    # 기존 레이아웃: days(tdate), side 파티션 + 정렬/분배 없는 append
+    spark.sql(TICKS_DDL.format(table=baseline, partitioning="days(tdate), side"))
+    spark.sql(f"ALTER TABLE {baseline} SET TBLPROPERTIES ('write.distribution-mode'='none')")
+    src.writeTo(baseline).append()
+    ensure_bronze_tables(spark, target_file_size_mb, ticks_table=optimized, codes_table=None)
+    src.writeTo(optimized).append()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", default=BRONZE_TICKS, help="bronze_ticks data to copy into both layouts")
+    ap.add_argument("--day", required=True, help="trade date to rebuild (YYYY-MM-DD, UTC)")
+    ap.add_argument("--namespace", default="lakehouse.bench")
+    ap.add_argument("--target-file-size-mb", type=int, default=DEFAULT_TARGET_FILE_SIZE_MB)
+    ap.add_argument("--reuse", action="store_true", help="skip rebuilding the two table copies")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    args = ap.parse_args()
+
+    spark = build_spark("bench_bronze_layout")
+    spark.sql(f"CREATE NAMESPACE IF NOT EXISTS {args.namespace}")
+    baseline = f"{args.namespace}.bronze_ticks_baseline"
+    optimized = f"{args.namespace}.bronze_ticks_layout"
+    if not args.reuse:
+        build_copies(spark, args.source, baseline, optimized, args.target_file_size_mb)
+
+    day = date.fromisoformat(args.day)
+    report: Dict[str, Any] = {"day": args.day, "source": args.source,
+                              "target_file_size_mb": args.target_file_size_mb}
+    for name, table in (("baseline", baseline), ("optimized", optimized)):
+        report[name] = {
+            "table": table,
+            "total": table_totals(spark, table),
+            "scan": planned_scan(spark, table, day),
+            "silver_rebuild_s": min(silver_rebuild_s(spark, table, day) for _ in range(args.repeat)),
+        }
+    b, o = report["baseline"]["scan"], report["optimized"]["scan"]
+    report["files_scanned_reduction"] = 1.0 - o["files"] / max(b["files"], 1)
+    report["bytes_scanned_reduction"] = 1.0 - o["bytes"] / max(b["bytes"], 1)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
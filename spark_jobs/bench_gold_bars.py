@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from pyspark.sql import SparkSession, Window, functions as F
+
+from spark_jobs.etl_bronze_to_silver import to_silver_ticks
+from spark_jobs.features_silver_to_gold import build_bars
+from spark_jobs.spark_metrics import plan_operators, stage_metrics
+
+
+def build_bars_windowed(s):
+    """Previous bar builder (row_number asc/desc windows + first(when)), kept as the parity reference.
+
+    Same (ts, tcnt) ordering as ``build_bars``; the original ordered by ts only,
+    which left ties between same-timestamp ticks to chance.
+    """
+    w_bar = Window.partitionBy("ymcode", "side", "code", "strike", "minute_ts")
+    return (
+        s.withColumn("rn_asc", F.row_number().over(w_bar.orderBy(F.col("ts").asc(), F.col("tcnt").asc())))
+         .withColumn("rn_desc", F.row_number().over(w_bar.orderBy(F.col("ts").desc(), F.col("tcnt").desc())))
+         .groupBy("ymcode", "side", "code", "strike", F.col("minute_ts").alias("bar_ts"), "trade_date")
+         .agg(
+             F.first(F.when(F.col("rn_asc") == 1, F.col("open")), ignorenulls=True).alias("o"),
+             F.max("high").alias("h"),
+             F.min("low").alias("l"),
+             F.first(F.when(F.col("rn_desc") == 1, F.col("price")), ignorenulls=True).alias("c"),
+             F.count("*").alias("tick_count"),
+             F.sum(F.col("ccnt").cast("long")).alias("v"),
+             F.first(F.when(F.col("rn_desc") == 1, F.col("oi")), ignorenulls=True).alias("oi_last"),
+         )
+    )
+
+
+IMPLS = {"windowed": build_bars_windowed, "single_pass": build_bars}
+
+
+def synth_silver(spark, work_dir: str, ticks_per_contract: int, days: int, strikes: int, workers: int):
+    """Synthetic XML (synth_xml) → Parquet staging (xml_stream) → silver-shaped DataFrame; no catalog needed."""
+    from spark_jobs.ingest_xml_to_bronze import expand_inputs, stage_inputs
+    from spark_jobs.synth_xml import generate
+
+    xml_dir, staging = os.path.join(work_dir, "xml"), os.path.join(work_dir, "staging")
+    stats = generate(xml_dir, strikes=strikes, ticks_per_contract=ticks_per_contract, days=days)
+    staged = stage_inputs(expand_inputs([xml_dir]), staging, datetime.now(timezone.utc), workers=workers)
+    b = spark.read.parquet(*[f"file://{os.path.abspath(p)}" for p in staged["tick"]])
+    return to_silver_ticks(b), stats["tick_rows"]
+
+
+def run_impl(spark, name: str, s) -> Dict[str, Any]:
+    bars = IMPLS[name](s)
+    spark.sparkContext.setJobGroup(f"bars-{name}", f"gold bars ({name})")
+    t0 = time.perf_counter()
+    # noop 싱크: 바 계산 전체를 실행하되 쓰기 비용은 제외
+    bars.write.format("noop").mode("overwrite").save()
+    elapsed = time.perf_counter() - t0
+    return {"elapsed_s": elapsed, "plan": plan_operators(bars)}
+
+
+def parity(s) -> Dict[str, Any]:
+    """Row-for-row equality of the two builders (exceptAll both ways)."""
+    a, b = build_bars_windowed(s).cache(), build_bars(s).cache()
+    only_old, only_new = a.exceptAll(b).count(), b.exceptAll(a).count()
+    res = {"bars": a.count(), "only_windowed": only_old, "only_single_pass": only_new,
+           "equal": only_old == 0 and only_new == 0}
+    a.unpersist()
+    b.unpersist()
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", default=None,
+                    help="silver_ticks table to read (build_spark catalog); default: synthetic data")
+    ap.add_argument("--ticks-per-contract", type=int, default=2000)
+    ap.add_argument("--days", type=int, default=2)
+    ap.add_argument("--strikes", type=int, default=20)
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--master", default=os.environ.get("SPARK_MASTER", "local[*]"))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    args = ap.parse_args()
+
+    work_dir = None
+    if args.source:
+        from spark_jobs.common_spark import build_spark
+
+        spark = build_spark("bench_gold_bars")
+        s, rows = spark.table(args.source), None
+    else:
+        spark = (
+            SparkSession.builder.master(args.master).appName("bench_gold_bars")
+            .config("spark.sql.session.timeZone", "UTC")
+            .getOrCreate()
+        )
+        work_dir = tempfile.mkdtemp(prefix="bench-gold-bars-")
+        s, rows = synth_silver(spark, work_dir, args.ticks_per_contract, args.days, args.strikes, args.workers)
+
+    report: Dict[str, Any] = {"source": args.source or "synthetic", "tick_rows": rows}
+    report["parity"] = parity(s)
+    for name in IMPLS:
+        runs = [run_impl(spark, name, s) for _ in range(args.repeat)]
+        report[name] = {"elapsed_s_min": min(r["elapsed_s"] for r in runs), "plan": runs[-1]["plan"]}
+    # REST 의 stage 집계는 job 종료 후 비동기로 반영됨
+    time.sleep(1.0)
+    for name in IMPLS:
+        m = stage_metrics(spark, f"bars-{name}")
+        # 반복 실행 합계 → 1회 평균
+        report[name]["stage_metrics_per_run"] = {k: v / args.repeat for k, v in m.items()}
+    report["speedup"] = report["windowed"]["elapsed_s_min"] / max(report["single_pass"]["elapsed_s_min"], 1e-9)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    spark.stop()
+    if work_dir:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    if not report["parity"]["equal"]:
+        raise SystemExit("parity check failed: single-pass bars differ from the windowed reference")
+
+
+if __name__ == "__main__":
+    main()
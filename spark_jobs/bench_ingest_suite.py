@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import time
+from typing import Any, Dict, List
+
+from spark_jobs.bench_xml_ingest import run_measured
+from spark_jobs.synth_xml import generate
+
+STAGED_RE = re.compile(r"^staged (\d+) rows:", re.M)
+
+
+def _dir_mb(path: str) -> float:
+    total = 0
+    for d, _, files in os.walk(path):
+        total += sum(os.path.getsize(os.path.join(d, f)) for f in files)
+    return total / 2**20
+
+
+def run_scale(scale: int, base: Dict[str, int], scale_by: str, work_dir: str, workers: int,
+              reader: str, keep: bool) -> Dict[str, Any]:
+    """Generate ``scale`` x base data, ingest it into a fresh local warehouse, report throughput/memory."""
+    gen_args = dict(base)
+    gen_args[scale_by] = base[scale_by] * scale
+    root = os.path.join(work_dir, f"x{scale}")
+    xml_dir, warehouse = os.path.join(root, "xml"), os.path.join(root, "warehouse")
+    shutil.rmtree(root, ignore_errors=True)
+
+    t0 = time.perf_counter()
+    stats = generate(xml_dir, **gen_args)
+    res: Dict[str, Any] = {
+        "scale": scale, "gen_args": gen_args, "gen_s": time.perf_counter() - t0,
+        "files": stats["files"], "xml_mb": stats["bytes"] / 2**20,
+        "rows": stats["tick_rows"] + stats["code_rows"],
+    }
+
+    # 스케일마다 빈 웨어하우스: 매니페스트 스킵 없이 매번 전량 적재
+    cmd = [sys.executable, "-m", "spark_jobs.ingest_xml_to_bronze", "--inputs", xml_dir,
+           "--workers", str(workers), "--reader", reader,
+           "--staging-dir", os.path.join(root, "staging")]
+    r = run_measured(cmd, env={"LAKEHOUSE_LOCAL_WAREHOUSE": warehouse})
+    res.update(ingest_wall_s=r["wall_s"], peak_rss_mb=r["peak_rss_mb"])
+    if r["returncode"] != 0:
+        lines = r["stderr"].strip().splitlines()
+        res["error"] = lines[-1] if lines else f"exit code {r['returncode']}"
+    else:
+        staged = [int(n) for n in STAGED_RE.findall(r["stdout"])]
+        if staged:
+            res["staged_rows"] = sum(staged)
+        res["rows_per_s"] = res["rows"] / r["wall_s"]
+        res["xml_mb_per_s"] = res["xml_mb"] / r["wall_s"]
+        res["warehouse_mb"] = _dir_mb(warehouse)
+    if not keep:
+        shutil.rmtree(root, ignore_errors=True)
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scales", default="1,10,100", help="comma-separated multipliers of the base dataset")
+    ap.add_argument("--scale-by", default="ticks_per_contract", choices=["ticks_per_contract", "days", "strikes"])
+    ap.add_argument("--ymcodes", type=int, default=2)
+    ap.add_argument("--strikes", type=int, default=20)
+    ap.add_argument("--ticks-per-contract", type=int, default=500)
+    ap.add_argument("--days", type=int, default=1)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--work-dir", default="/tmp/bench_ingest_suite")
+    ap.add_argument("--workers", type=int, default=4)
+    ap.add_argument("--reader", default="stream", choices=["stream", "spark-xml"])
+    ap.add_argument("--keep", action="store_true", help="keep generated XML and warehouses")
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    args = ap.parse_args()
+
+    base = {"ymcodes": args.ymcodes, "strikes": args.strikes,
+            "ticks_per_contract": args.ticks_per_contract, "days": args.days, "seed": args.seed}
+    results: List[Dict[str, Any]] = []
+    for scale in [int(s) for s in args.scales.split(",") if s]:
+        res = run_scale(scale, base, args.scale_by, args.work_dir, args.workers, args.reader, args.keep)
+        results.append(res)
+        # 스케일별 진행 상황은 stderr, 최종 리포트는 stdout
+        print(json.dumps({k: v for k, v in res.items() if k != "gen_args"}), file=sys.stderr)
+
+    report = {"reader": args.reader, "workers": args.workers, "scale_by": args.scale_by, "results": results}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
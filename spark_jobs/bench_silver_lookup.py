@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import time
+from typing import Any, Dict, List
+
+from pyspark.sql import functions as F
+
+from spark_jobs.common_spark import build_spark
+from spark_jobs.silver_tables import SILVER_TICKS, ensure_silver_ticks, rewrite_sorted
+from spark_jobs.spark_metrics import stage_metrics
+
+
+def planned_files(spark, table: str, day: str, code: str) -> Dict[str, Any]:
+    """Files/bytes Iceberg plans for ``trade_date = day AND code = code`` (partition + file min/max pruning)."""
+    jvm = spark._jvm
+    tbl = jvm.org.apache.iceberg.spark.Spark3Util.loadIcebergTable(spark._jsparkSession, table)
+    E = jvm.org.apache.iceberg.expressions.Expressions
+    expr = getattr(E, "and")(E.equal("trade_date", day), E.equal("code", code))
+    files = bytes_ = 0
+    it = tbl.newScan().filter(expr).planFiles().iterator()
+    while it.hasNext():
+        f = it.next().file()
+        files += 1
+        bytes_ += f.fileSizeInBytes()
+    it.close()
+    return {"files": files, "bytes": bytes_}
+
+
+def lookup(spark, table: str, day: str, code: str, group: str) -> Dict[str, Any]:
+    spark.sparkContext.setJobGroup(group, f"lookup {code} {day} on {table}")
+    t0 = time.perf_counter()
+    rows = (
+        spark.table(table)
+        .where((F.col("trade_date") == F.lit(day).cast("date")) & (F.col("code") == code))
+        .select("ts", "tcnt", "price", "oi")
+        .collect()
+    )
+    return {"rows": len(rows), "latency_s": time.perf_counter() - t0}
+
+
+def bench_table(spark, table: str, day: str, codes: List[str], tag: str) -> Dict[str, Any]:
+    lat, read, plans = [], [], []
+    for i, code in enumerate(codes):
+        group = f"{tag}-{i}"
+        r = lookup(spark, table, day, code, group)
+        lat.append(r["latency_s"])
+        plans.append(planned_files(spark, table, day, code))
+    # REST 집계는 모든 job 종료 후 한 번에 (상태 반영 지연 방지)
+    time.sleep(1.0)
+    for i in range(len(codes)):
+        read.append(stage_metrics(spark, f"{tag}-{i}")["inputBytes"])
+    return {
+        "table": table,
+        "latency_p50_s": statistics.median(lat),
+        "latency_max_s": max(lat),
+        "planned_files_avg": statistics.mean(p["files"] for p in plans),
+        "planned_bytes_avg": statistics.mean(p["bytes"] for p in plans),
+        "input_bytes_avg": statistics.mean(read),
+    }
+
+
+def build_copies(spark, source: str, day: str, baseline: str, optimized: str, zorder: bool) -> None:
+    src = spark.table(source).where(F.col("trade_date") == F.lit(day).cast("date"))
+    for t in (baseline, optimized):
+        spark.sql(f"DROP TABLE IF EXISTS {t}")
+    # 기존 레이아웃: 정렬/bloom filter 없음
+    ensure_silver_ticks(spark, baseline, layout=False)
+    spark.sql(f"ALTER TABLE {baseline} SET TBLPROPERTIES ('write.distribution-mode'='none')")
+    src.writeTo(baseline).append()
+    ensure_silver_ticks(spark, optimized)
+    src.writeTo(optimized).append()
+    if zorder:
+        rewrite_sorted(spark, optimized, zorder=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", default=SILVER_TICKS)
+    ap.add_argument("--day", required=True, help="trade_date to look up (YYYY-MM-DD)")
+    ap.add_argument("--lookups", type=int, default=20, help="random contracts to look up")
+    ap.add_argument("--namespace", default="lakehouse.bench")
+    ap.add_argument("--zorder", action="store_true", help="Z-order (code, ts) instead of a linear sort")
+    ap.add_argument("--reuse", action="store_true", help="skip rebuilding the two table copies")
+    ap.add_argument("--seed", type=int, default=11)
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    args = ap.parse_args()
+
+    spark = build_spark("bench_silver_lookup")
+    spark.sql(f"CREATE NAMESPACE IF NOT EXISTS {args.namespace}")
+    baseline = f"{args.namespace}.silver_ticks_baseline"
+    optimized = f"{args.namespace}.silver_ticks_sorted"
+    if not args.reuse:
+        build_copies(spark, args.source, args.day, baseline, optimized, args.zorder)
+
+    codes = [r["code"] for r in spark.table(baseline).select("code").distinct().collect()]
+    codes = random.Random(args.seed).sample(sorted(codes), min(args.lookups, len(codes)))
+    # 첫 조회의 메타데이터 로딩/JIT 비용을 양쪽 모두에서 제외
+    for t in (baseline, optimized):
+        lookup(spark, t, args.day, codes[0], "warmup")
+
+    report: Dict[str, Any] = {"day": args.day, "lookups": len(codes), "zorder": args.zorder,
+                              "baseline": bench_table(spark, baseline, args.day, codes, "baseline"),
+                              "optimized": bench_table(spark, optimized, args.day, codes, "optimized")}
+    b, o = report["baseline"], report["optimized"]
+    report["latency_speedup"] = b["latency_p50_s"] / max(o["latency_p50_s"], 1e-9)
+    report["input_bytes_reduction"] = 1.0 - o["input_bytes_avg"] / max(b["input_bytes_avg"], 1)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
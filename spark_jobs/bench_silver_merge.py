@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict
+
+from pyspark.sql import functions as F
+
+from spark_jobs.common_spark import build_spark
+from spark_jobs.etl_bronze_to_silver import dedup_ticks, merge_into_silver
+from spark_jobs.silver_tables import SILVER_TICKS, ensure_silver_ticks
+
+VARIANTS = ("merge-on-read", "copy-on-write", "overwrite")
+
+# 스냅샷 summary 에서 뽑는 쓰기 비용 지표
+SUMMARY_KEYS = (
+    "added-data-files", "deleted-data-files", "added-delete-files",
+    "added-records", "deleted-records", "added-position-deletes",
+    "added-files-size", "removed-files-size",
+)
+
+
+def late_batch(base, fraction: float, correct_share: float, seed: int):
+    """``fraction`` of the day's ticks re-delivered late: ``correct_share`` price corrections, the rest new ticks."""
+    late = base.sample(fraction=fraction, seed=seed).withColumn("_u", F.rand(seed + 1))
+    fix = F.col("_u") < correct_share
+    return (
+        late.withColumn("price", F.when(fix, F.col("price") + 0.05).otherwise(F.col("price")))
+        # 새 틱: 원래 틱과 키가 겹치지 않도록 tcnt 를 크게 이동
+        .withColumn("tcnt", F.when(fix, F.col("tcnt")).otherwise(F.col("tcnt") + 10_000_000))
+        # 고정 시각: 캐시가 재계산돼도 변형마다 같은 배치
+        .withColumn("ingest_ts", F.to_timestamp(F.lit(datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))))
+        .drop("_u")
+    )
+
+
+def last_commit(spark, table: str) -> Dict[str, Any]:
+    r = spark.sql(f"SELECT operation, summary FROM {table}.snapshots ORDER BY committed_at DESC LIMIT 1").collect()[0]
+    out: Dict[str, Any] = {"operation": r["operation"]}
+    for k in SUMMARY_KEYS:
+        out[k] = int(r["summary"].get(k, 0) or 0)
+    return out
+
+
+def apply_variant(spark, variant: str, table: str, late, day: str) -> float:
+    t0 = time.perf_counter()
+    if variant == "overwrite":
+        # 기존 방식: 영향받은 (trade_date, side) 파티션 전체를 다시 만들어 교체
+        cur = spark.table(table).where(F.col("trade_date") == F.lit(day).cast("date"))
+        dedup_ticks(cur.unionByName(late)).writeTo(table).overwritePartitions()
+    else:
+        merge_into_silver(spark, late, table)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--source", default=SILVER_TICKS, help="silver_ticks data to copy for the benchmark")
+    ap.add_argument("--day", required=True, help="trade_date of the late batch (YYYY-MM-DD)")
+    ap.add_argument("--late-fraction", type=float, default=0.01)
+    ap.add_argument("--correct-share", type=float, default=0.5, help="share of late rows that correct existing ticks")
+    ap.add_argument("--variants", default=",".join(VARIANTS))
+    ap.add_argument("--namespace", default="lakehouse.bench")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    args = ap.parse_args()
+
+    spark = build_spark("bench_silver_merge")
+    spark.sql(f"CREATE NAMESPACE IF NOT EXISTS {args.namespace}")
+    base = spark.table(args.source).where(F.col("trade_date") == F.lit(args.day).cast("date")).cache()
+    late = late_batch(base, args.late_fraction, args.correct_share, args.seed).cache()
+    report: Dict[str, Any] = {"day": args.day, "source": args.source, "base_rows": base.count(),
+                              "late_rows": late.count(), "late_fraction": args.late_fraction}
+
+    results = {}
+    for variant in [v for v in args.variants.split(",") if v]:
+        table = f"{args.namespace}.silver_merge_{variant.replace('-', '_')}"
+        spark.sql(f"DROP TABLE IF EXISTS {table}")
+        ensure_silver_ticks(spark, table, merge_mode="copy-on-write" if variant == "overwrite" else variant)
+        base.writeTo(table).append()
+        elapsed = apply_variant(spark, variant, table, late, args.day)
+        report[variant] = dict(elapsed_s=elapsed, table=table, **last_commit(spark, table))
+        results[variant] = spark.table(table)
+
+    # 모든 방식의 결과 테이블이 같은지 (행 단위 차집합 양방향)
+    names = list(results)
+    report["parity"] = all(
+        results[names[0]].exceptAll(results[n]).isEmpty() and results[n].exceptAll(results[names[0]]).isEmpty()
+        for n in names[1:]
+    )
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODES = ("stream", "spark-xml", "etree-detect")
+SPARK_XML_PACKAGE = "com.databricks:spark-xml_2.12:0.17.0"
+
+
+def _tree_rss_kb(pid: int) -> int:
+    # pid 와 모든 자손 프로세스의 VmRSS 합 (Spark 드라이버 JVM 포함). Linux /proc 전용
+    children: Dict[int, List[int]] = {}
+    for d in os.listdir("/proc"):
+        if not d.isdigit():
+            continue
+        try:
+            with open(f"/proc/{d}/stat", "r") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(d))
+    total, todo = 0, [pid]
+    while todo:
+        p = todo.pop()
+        todo.extend(children.get(p, []))
+        try:
+            with open(f"/proc/{p}/status", "r") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1])
+                        break
+        except OSError:
+            pass
+    return total
+
+
+def run_measured(cmd: List[str], env: Optional[Dict[str, str]] = None,
+                 interval_s: float = 0.05) -> Dict[str, Any]:
+    """Run ``cmd`` and sample the summed RSS of its process tree until it exits.
+
+    Returns returncode, stdout, stderr, wall_s and peak_rss_mb.
+    """
+    full_env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    full_env.update(env or {})
+    t0 = time.perf_counter()
+    p = subprocess.Popen(cmd, cwd=ROOT, env=full_env, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    peak = [0]
+
+    def sample():
+        while p.poll() is None:
+            peak[0] = max(peak[0], _tree_rss_kb(p.pid))
+            time.sleep(interval_s)
+
+    th = threading.Thread(target=sample, daemon=True)
+    th.start()
+    out, err = p.communicate()
+    th.join()
+    return {"returncode": p.returncode, "stdout": out, "stderr": err,
+            "wall_s": time.perf_counter() - t0, "peak_rss_mb": peak[0] / 1024.0}
+
+
+def _measure(cmd: List[str]) -> Dict[str, Any]:
+    r = run_measured(cmd)
+    if r["returncode"] != 0:
+        lines = r["stderr"].strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {r['returncode']}", "elapsed_s": r["wall_s"]}
+    res = json.loads(r["stdout"].strip().splitlines()[-1])
+    res.update(wall_s=r["wall_s"], peak_rss_mb=r["peak_rss_mb"])
+    return res
+
+
+def _run_stream(xml_path: str, kind: str, out_dir: str) -> Dict[str, Any]:
+    from spark_jobs.xml_stream import stage_to_parquet
+
+    t0 = time.perf_counter()
+    rows = stage_to_parquet(xml_path, os.path.join(out_dir, "stream.parquet"), kind, "CALL",
+                            datetime.now(timezone.utc))
+    return {"rows": rows, "elapsed_s": time.perf_counter() - t0}
+
+
+def _run_spark_xml(xml_path: str, kind: str, out_dir: str, master: str) -> Dict[str, Any]:
+    from pyspark.sql import SparkSession, functions as F
+
+    from spark_jobs.ingest_xml_to_bronze import CODE_SCHEMA, TICK_SCHEMA, read_xml_rows
+    from spark_jobs.xml_stream import detect_row_tag
+
+    spark = (
+        SparkSession.builder.master(master).appName("bench_xml_ingest")
+        .config("spark.jars.packages", SPARK_XML_PACKAGE)
+        .config("spark.sql.session.timeZone", "UTC")
+        .getOrCreate()
+    )
+    t0 = time.perf_counter()
+    df = read_xml_rows(spark, xml_path, detect_row_tag(xml_path), TICK_SCHEMA if kind == "tick" else CODE_SCHEMA)
+    df = df.withColumn("src_file", F.lit(os.path.basename(xml_path)))
+    # 스테이징 경로와 같은 조건으로 비교: Parquet 로 쓰기까지
+    df.write.mode("overwrite").parquet(f"file://{os.path.join(out_dir, 'spark_xml')}")
+    elapsed = time.perf_counter() - t0
+    rows = spark.read.parquet(f"file://{os.path.join(out_dir, 'spark_xml')}").count()
+    spark.stop()
+    return {"rows": rows, "elapsed_s": elapsed}
+
+
+def _run_etree_detect(xml_path: str) -> Dict[str, Any]:
+    # 기존 detect_row_tag (ET.parse 로 파일 전체를 트리로 로드) 의 비용만 측정
+    import xml.etree.ElementTree as ET
+
+    t0 = time.perf_counter()
+    root = ET.parse(xml_path).getroot()
+    tag = list(root)[0].tag
+    return {"rows": len(root), "row_tag": tag, "elapsed_s": time.perf_counter() - t0}
+
+
+def bench(xml_path: str, kind: str, modes: List[str], master: str) -> Dict[str, Any]:
+    out: Dict[str, Any] = {"xml": xml_path, "kind": kind, "xml_mb": os.path.getsize(xml_path) / 2**20}
+    with tempfile.TemporaryDirectory(prefix="bench-xml-") as tmp:
+        for mode in modes:
+            cmd = [sys.executable, "-m", "spark_jobs.bench_xml_ingest", "--xml", xml_path,
+                   "--kind", kind, "--master", master, "--_child", mode, "--_out-dir", tmp]
+            r = _measure(cmd)
+            if "rows" in r and r.get("elapsed_s"):
+                r["rows_per_s"] = r["rows"] / r["elapsed_s"]
+            out[mode] = r
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--xml", required=True, help="TICK or CODE XML file")
+    ap.add_argument("--kind", default="tick", choices=["tick", "code"])
+    ap.add_argument("--modes", default="stream,spark-xml",
+                    help=f"comma-separated subset of {','.join(MODES)}")
+    ap.add_argument("--master", default=os.environ.get("SPARK_MASTER", "local[*]"))
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    ap.add_argument("--_child", default=None, help=argparse.SUPPRESS)
+    ap.add_argument("--_out-dir", default=None, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args._child:
+        # 측정 대상 서브프로세스: 결과 JSON 한 줄만 출력
+        if args._child == "stream":
+            res = _run_stream(args.xml, args.kind, args._out_dir)
+        elif args._child == "spark-xml":
+            res = _run_spark_xml(args.xml, args.kind, args._out_dir, args.master)
+        else:
+            res = _run_etree_detect(args.xml)
+        print(json.dumps(res))
+        return
+
+    modes = [m for m in args.modes.split(",") if m]
+    unknown = set(modes) - set(MODES)
+    if unknown:
+        raise SystemExit(f"unknown modes: {sorted(unknown)}")
+    report = bench(args.xml, args.kind, modes, args.master)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+
+BRONZE_TICKS = "lakehouse.options.bronze_ticks"
+BRONZE_CODES = "lakehouse.options.bronze_codes"
+
+# 하루치 silver 재빌드/조회가 해당 일자 파티션만 읽도록 일자 + 월물로 파티션
+TICKS_PARTITIONING = ["days(tdate)", "ymcode"]
+# 파티션 안에서 (side, code, tdate) 정렬 → code/side 조건의 파일 min/max 프루닝이 잘 됨
+TICKS_SORT_ORDER = ["side", "code", "tdate"]
+
+DEFAULT_TARGET_FILE_SIZE_MB = 256
+
+TICKS_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+  src_file STRING,
+  side STRING,
+  ymcode STRING,
+  code STRING,
+  strike INT,
+  idate INT,
+  itime INT,
+  tdate TIMESTAMP,
+  tcnt BIGINT,
+  c DOUBLE,
+  o DOUBLE,
+  h DOUBLE,
+  l DOUBLE,
+  oi DOUBLE,
+  ccnt BIGINT,
+  ingest_ts TIMESTAMP
+) USING iceberg
+PARTITIONED BY ({partitioning})
+"""
+
+CODES_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+  src_file STRING,
+  side STRING,
+  ymcode STRING,
+  code STRING,
+  lastday INT,
+  ingest_ts TIMESTAMP
+) USING iceberg
+PARTITIONED BY (side, ymcode)
+"""
+
+
+def current_partitioning(spark, table: str) -> List[str]:
+    """Partition transforms of the table's current spec, e.g. ["days(tdate)", "side"]."""
+    out = []
+    for r in spark.sql(f"DESCRIBE TABLE {table}").collect():
+        # "# Partitioning" 섹션: col_name="Part 0", data_type="days(tdate)"
+        if re.fullmatch(r"Part \d+", r["col_name"] or ""):
+            out.append(r["data_type"].replace(" ", ""))
+    return out
+
+
+def ensure_bronze_tables(spark, target_file_size_mb: int = DEFAULT_TARGET_FILE_SIZE_MB,
+                         ticks_table: str = BRONZE_TICKS, codes_table: Optional[str] = BRONZE_CODES) -> None:
+    """Create bronze tables if missing and bring bronze_ticks to the intended layout.
+
+    Existing tables with the old ``days(tdate), side`` spec are evolved in
+    place (Iceberg partition evolution: only newly written files use the
+    new spec; run rewrite_data_files to re-lay old files). Sort order,
+    distribution and target file size are table properties, so every
+    writer (ingest, compaction) follows them.
+    """
+    spark.sql(TICKS_DDL.format(table=ticks_table, partitioning=", ".join(TICKS_PARTITIONING)))
+    if codes_table:
+        spark.sql(CODES_DDL.format(table=codes_table))
+
+    current = current_partitioning(spark, ticks_table)
+    if current != TICKS_PARTITIONING:
+        for field in current:
+            if field not in TICKS_PARTITIONING:
+                spark.sql(f"ALTER TABLE {ticks_table} DROP PARTITION FIELD {field}")
+        for field in TICKS_PARTITIONING:
+            if field not in current:
+                spark.sql(f"ALTER TABLE {ticks_table} ADD PARTITION FIELD {field}")
+
+    # 파티션 단위로 task 를 모아(hash) 파티션당 파일 수를 줄이고, task 안에서 정렬
+    spark.sql(
+        f"ALTER TABLE {ticks_table} WRITE DISTRIBUTED BY PARTITION "
+        f"LOCALLY ORDERED BY {', '.join(TICKS_SORT_ORDER)}"
+    )
+    size = int(target_file_size_mb) << 20
+    spark.sql(
+        f"ALTER TABLE {ticks_table} SET TBLPROPERTIES ("
+        f"'write.target-file-size-bytes'='{size}', "
+        f"'write.spark.advisory-partition-size-bytes'='{size}', "
+        f"'write.parquet.compression-codec'='zstd')"
+    )
@@ -3,6 +3,30 @@ from __future__ import annotations
 import os
 from pyspark.sql import SparkSession
 
+# LAKEHOUSE_LOCAL_WAREHOUSE 설정 시: Nessie/MinIO 대신 로컬 파일시스템 Hadoop 카탈로그 (벤치마크/오프라인 테스트용)
+LOCAL_ICEBERG_PACKAGE = "org.apache.iceberg:iceberg-spark-runtime-3.5_2.12:1.5.2"
+
+
+def build_local_spark(app_name: str, warehouse: str) -> SparkSession:
+    """SparkSession with ``lakehouse`` as an Iceberg Hadoop catalog under a local directory."""
+    os.makedirs(warehouse, exist_ok=True)
+    builder = (
+        SparkSession.builder
+        .appName(app_name)
+        .master(os.environ.get("SPARK_MASTER", "local[*]"))
+        .config("spark.sql.extensions", "org.apache.iceberg.spark.extensions.IcebergSparkSessionExtensions")
+        .config("spark.sql.catalog.lakehouse", "org.apache.iceberg.spark.SparkCatalog")
+        .config("spark.sql.catalog.lakehouse.type", "hadoop")
+        .config("spark.sql.catalog.lakehouse.warehouse", f"file://{os.path.abspath(warehouse)}")
+        .config("spark.sql.session.timeZone", "UTC")
+    )
+    packages = os.environ.get("LAKEHOUSE_SPARK_PACKAGES", LOCAL_ICEBERG_PACKAGE)
+    if packages:
+        builder = builder.config("spark.jars.packages", packages)
+    if os.environ.get("SPARK_DRIVER_MEMORY"):
+        builder = builder.config("spark.driver.memory", os.environ["SPARK_DRIVER_MEMORY"])
+    return builder.getOrCreate()
+
 
 def build_spark(app_name: str) -> SparkSession:
     """Build SparkSession configured for Iceberg + Nessie + MinIO.
@@ -10,7 +34,14 @@ def build_spark(app_name: str) -> SparkSession:
     This expects docker-compose services to be running:
     - Nessie: http://localhost:19120/api/v2
     - MinIO:  http://localhost:9000
+
+    With ``LAKEHOUSE_LOCAL_WAREHOUSE`` set, returns ``build_local_spark``
+    instead (same ``lakehouse`` catalog name, no services needed).
     """
+    local_warehouse = os.environ.get("LAKEHOUSE_LOCAL_WAREHOUSE")
+    if local_warehouse:
+        return build_local_spark(app_name, local_warehouse)
+
     spark = (
         SparkSession.builder
         .appName(app_name)
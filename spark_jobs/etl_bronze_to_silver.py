@@ -1,18 +1,46 @@
 from __future__ import annotations
 
-from pyspark.sql import functions as F
+import argparse
+from datetime import datetime, timezone
 
-from spark_jobs.common_spark import build_spark
+from pyspark.sql import Window, functions as F
 
+from spark_jobs.bronze_tables import BRONZE_CODES, BRONZE_TICKS
+from spark_jobs.common_spark import build_spark
+from spark_jobs.etl_watermark import (
+    IncrementPlan,
+    changed_days,
+    day_range_filter,
+    ensure_watermarks,
+    plan_increment,
+    read_appended,
+    read_snapshot,
+    record_watermark,
+    watermark_candidates,
+    write_options,
+)
+from spark_jobs.silver_tables import (
+    DIM_ATTRS,
+    DIM_CONTRACT,
+    DIM_KEY,
+    MIN_DATE,
+    OPEN_END,
+    SILVER_TICKS,
+    TICK_KEY,
+    TICK_VALUES,
+    ensure_dim_contract,
+    ensure_silver_ticks,
+    merge_ticks_sql,
+    scd2_merge_sql,
+)
 
-def main():
-    spark = build_spark("etl_bronze_to_silver")
-    spark.sql("CREATE NAMESPACE IF NOT EXISTS lakehouse.options")
+JOB = "bronze_to_silver_ticks"
+DIM_JOB = "bronze_codes_to_dim_contract"
 
-    # Bronze -> Silver ticks
-    b = spark.table("lakehouse.options.bronze_ticks")
 
-    s = (
+def to_silver_ticks(b):
+    """bronze_ticks rows -> silver_ticks columns (ts/trade_date/minute_ts 표준화)."""
+    return (
         b.select(
             "ymcode",
             "side",
@@ -32,30 +60,179 @@ def main():
         )
     )
 
-    # Write silver ticks
-    s.writeTo("lakehouse.options.silver_ticks").overwritePartitions()
 
-    # dim_contract from codes + inferred strike from code? (샘플 코드 테이블에 strike가 없음)
-    # 현재는 codes와 ticks에서 strike를 보조로 붙입니다.
-    c = spark.table("lakehouse.options.bronze_codes")
-    strike_map = (
-        spark.table("lakehouse.options.silver_ticks")
-        .select("ymcode", "side", "code", "strike")
-        .dropDuplicates(["ymcode", "side", "code"])
-    )
+def dedup_ticks(s):
+    """One row per tick key: latest ``ingest_ts`` wins, ties broken by the values (deterministic)."""
+    order = [F.col("ingest_ts").desc_nulls_last()] + [F.col(c).desc_nulls_last() for c in TICK_VALUES]
+    w = Window.partitionBy(*TICK_KEY).orderBy(*order)
+    return s.withColumn("_rn", F.row_number().over(w)).where(F.col("_rn") == 1).drop("_rn")
+
+
+def merge_into_silver(spark, batch, table: str = SILVER_TICKS) -> int:
+    """MERGE a silver-shaped tick batch into ``table``; returns the number of partitions touched."""
+    batch = dedup_ticks(batch).cache()
+    parts = batch.select("trade_date", "side").distinct().collect()
+    if parts:
+        batch.createOrReplaceTempView("_silver_ticks_batch")
+        # ts/side 가 NULL 인 틱은 파티션 값도 NULL → 정렬 시 None 을 맨 앞으로
+        spark.sql(merge_ticks_sql(table, "_silver_ticks_batch",
+                                  sorted({r["trade_date"] for r in parts}, key=lambda v: (v is not None, v)),
+                                  sorted({r["side"] for r in parts}, key=lambda v: (v is not None, v))))
+    batch.unpersist()
+    return len(parts)
 
-    dim = (
-        c.join(strike_map, on=["ymcode", "side", "code"], how="left")
-         .select(
-             "ymcode", "side", "code",
-             F.coalesce("strike", F.lit(-1)).alias("strike"),
-             "lastday",
-             F.to_date(F.lit("1900-01-01")).alias("effective_from"),
-             F.to_date(F.lit("2999-12-31")).alias("effective_to"),
-         )
+
+def update_silver_ticks(spark, plan: IncrementPlan):
+    """Apply the bronze snapshot range in ``plan`` to silver_ticks in one commit.
+
+    append → key MERGE; days/full → deduplicated partition overwrite with the
+    watermark stamped on the commit. Returns the silver-shaped batch that was
+    applied (None if nothing changed).
+    """
+    if plan.mode == "noop":
+        return None
+    opts = write_options(JOB, plan)
+    if plan.mode == "append":
+        # 워터마크 이후 append 스냅샷이 추가한 파일만 읽어 키 기준 MERGE
+        # (재전송 중복은 무시, 정정 틱은 해당 행이 있는 파일만 갱신). MERGE 는 SQL 이라 커밋에
+        # 워터마크를 못 남기지만 같은 배치를 다시 MERGE 해도 no-op 이므로 중단 후 재실행이 안전
+        s = to_silver_ticks(read_appended(spark, BRONZE_TICKS, plan))
+        n = merge_into_silver(spark, s)
+        print(f"silver_ticks: merged into {n} (trade_date, side) partition(s)")
+        return s
+    b = read_snapshot(spark, BRONZE_TICKS, plan.end)
+    if plan.mode == "days":
+        # 삭제/교체가 섞인 구간: 영향받은 일자만 bronze 에서 다시 만들어 그 일자 파티션만 교체
+        days = changed_days(spark, BRONZE_TICKS, plan.snapshots)
+        print(f"silver_ticks: rebuilding {len(days)} day(s): {[d.isoformat() for d in days]}")
+        if not days:
+            return None
+        s = dedup_ticks(to_silver_ticks(b.where(day_range_filter("tdate", days))))
+        # overwrite(조건): 행이 모두 삭제된 일자도 비워짐 (overwritePartitions 는 결과에 있는 파티션만 교체)
+        s.writeTo(SILVER_TICKS).options(**opts).overwrite(F.col("trade_date").isin(days))
+    else:
+        s = dedup_ticks(to_silver_ticks(b))
+        s.writeTo(SILVER_TICKS).options(**opts).overwrite(F.lit(True))
+    return s
+
+
+def read_codes_batch(spark, plan: IncrementPlan):
+    """bronze_codes rows to apply: appended files only, or the whole (small) table after deletes/expiry."""
+    if plan.mode == "noop":
+        return None
+    if plan.mode == "append":
+        return read_appended(spark, BRONZE_CODES, plan)
+    return read_snapshot(spark, BRONZE_CODES, plan.end)
+
+
+def dim_changes(spark, codes, ticks, effective_from: str, table: str = DIM_CONTRACT):
+    """New/changed dim_contract versions from this run's code rows and tick batch.
+
+    lastday comes from the code rows, strike from the tick batch (no extra
+    silver scan); attributes missing from the batch keep their current
+    value. Only contracts whose (strike, lastday) differ from the current
+    version — or that have no version yet — are returned, with
+    ``merge_*`` keys set for the ones that need their current version closed.
+    """
+    parts = []
+    if codes is not None:
+        parts.append(
+            codes.groupBy(*DIM_KEY).agg(F.max_by("lastday", "ingest_ts").alias("lastday"))
+            .withColumn("strike", F.lit(None).cast("int"))
+        )
+    if ticks is not None:
+        parts.append(
+            ticks.where(F.col("strike").isNotNull()).groupBy(*DIM_KEY).agg(F.max("strike").alias("strike"))
+            .withColumn("lastday", F.lit(None).cast("int"))
+        )
+    if not parts:
+        return None
+    batch = parts[0] if len(parts) == 1 else parts[0].unionByName(parts[1])
+    batch = batch.groupBy(*DIM_KEY).agg(*[F.max(c).alias(f"b_{c}") for c in DIM_ATTRS])
+
+    cur = (
+        spark.table(table).where(F.col("effective_to") == F.lit(OPEN_END).cast("date"))
+        .select(*DIM_KEY, *[F.col(c).alias(f"c_{c}") for c in DIM_ATTRS],
+                F.col("effective_from").alias("c_from"), F.lit(True).alias("c_exists"))
+    )
+    j = batch.join(cur, on=DIM_KEY, how="left")
+    is_new = F.col("c_exists").isNull()
+    cand = j.select(
+        *DIM_KEY,
+        F.coalesce("b_strike", "c_strike", F.lit(-1)).alias("strike"),
+        F.coalesce("b_lastday", "c_lastday").alias("lastday"),
+        is_new.alias("is_new"),
+        "c_strike", "c_lastday", "c_from",
+    )
+    # 코드 행이 없는 계약(lastday 미상)은 기존처럼 차원에 넣지 않음
+    changed = cand.where(
+        F.col("lastday").isNotNull()
+        & (F.col("is_new") | ~F.col("strike").eqNullSafe(F.col("c_strike"))
+           | ~F.col("lastday").eqNullSafe(F.col("c_lastday")))
     )
+    # 새 계약: MIN_DATE 부터. strike 미상(-1)을 채우는 것은 변경이 아닌 보정 → 현재 버전의 시작일을 이어받음
+    # (닫힌 -1 버전은 빈 구간 [from, from) 이 됨). 그 외 변경: 이번 실행 일자부터
+    new_from = (
+        F.when(F.col("is_new"), F.lit(MIN_DATE).cast("date"))
+        .when(F.col("c_strike") == -1, F.col("c_from"))
+        .otherwise(F.lit(effective_from).cast("date"))
+    )
+    rows = changed.select(*DIM_KEY, *DIM_ATTRS, new_from.alias("effective_from"), "is_new")
+    insert = rows.select("*", *[F.lit(None).cast("string").alias(f"merge_{k}") for k in DIM_KEY])
+    close = rows.where(~F.col("is_new")).select("*", *[F.col(k).alias(f"merge_{k}") for k in DIM_KEY])
+    return insert.unionByName(close).drop("is_new")
+
+
+def update_dim_contract(spark, codes, ticks, effective_from: str, table: str = DIM_CONTRACT) -> int:
+    """SCD2-apply this run's changes; unchanged contracts are not touched. Returns versions inserted."""
+    staged = dim_changes(spark, codes, ticks, effective_from, table)
+    if staged is None:
+        return 0
+    staged = staged.cache()
+    n = staged.where(F.col("merge_code").isNull()).count()
+    if n:
+        staged.createOrReplaceTempView("_dim_contract_changes")
+        spark.sql(scd2_merge_sql(table, "_dim_contract_changes"))
+    staged.unpersist()
+    return n
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--full-refresh", action="store_true", help="ignore the watermarks: rebuild silver_ticks and re-check every code row")
+    ap.add_argument("--watermark-table", default="lakehouse.options.etl_watermarks")
+    ap.add_argument("--merge-mode", default="merge-on-read", choices=["merge-on-read", "copy-on-write"],
+                    help="silver_ticks write.merge.mode for incremental MERGE")
+    args = ap.parse_args()
+
+    spark = build_spark("etl_bronze_to_silver")
+    spark.sql("CREATE NAMESPACE IF NOT EXISTS lakehouse.options")
+    ensure_watermarks(spark, args.watermark_table)
+    ensure_silver_ticks(spark, merge_mode=args.merge_mode)
+    ensure_dim_contract(spark)
+    run_ts = datetime.now(timezone.utc)
+
+    # Bronze -> Silver ticks: 마지막으로 반영한 bronze 스냅샷 이후 변경분만 처리
+    candidates = [] if args.full_refresh else watermark_candidates(
+        spark, args.watermark_table, JOB, BRONZE_TICKS, SILVER_TICKS)
+    plan = plan_increment(spark, BRONZE_TICKS, candidates)
+    print(f"silver_ticks: mode={plan.mode} bronze snapshots {plan.start} -> {plan.end} "
+          f"ops={plan.operations} {plan.reason}".rstrip())
+    ticks = update_silver_ticks(spark, plan)
+
+    # dim_contract (SCD2): 이번 실행의 code 행 + 틱 배치의 strike 만으로 변경분 계산
+    # (샘플 코드 테이블에 strike가 없어 틱에서 보조로 붙임)
+    code_candidates = [] if args.full_refresh else watermark_candidates(
+        spark, args.watermark_table, DIM_JOB, BRONZE_CODES, DIM_CONTRACT)
+    code_plan = plan_increment(spark, BRONZE_CODES, code_candidates)
+    print(f"dim_contract: codes mode={code_plan.mode} bronze snapshots {code_plan.start} -> {code_plan.end} "
+          f"{code_plan.reason}".rstrip())
+    n = update_dim_contract(spark, read_codes_batch(spark, code_plan), ticks, run_ts.date().isoformat())
+    print(f"dim_contract: {n} new version(s)")
 
-    dim.writeTo("lakehouse.options.dim_contract").overwritePartitions()
+    # 두 MERGE 모두 재실행해도 no-op 이므로 워터마크는 데이터 반영 후 마지막에 기록
+    record_watermark(spark, args.watermark_table, JOB, BRONZE_TICKS, SILVER_TICKS, plan, run_ts)
+    record_watermark(spark, args.watermark_table, DIM_JOB, BRONZE_CODES, DIM_CONTRACT, code_plan, run_ts)
 
     print("OK: silver_ticks + dim_contract")
     spark.stop()
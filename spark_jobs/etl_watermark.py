@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from pyspark.sql import functions as F
+
+
+DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+  job STRING,
+  source_table STRING,
+  source_snapshot_id BIGINT,  -- 여기까지의 소스 스냅샷을 반영함
+  target_table STRING,
+  mode STRING,                -- full | append | days | noop
+  run_ts TIMESTAMP
+) USING iceberg
+"""
+
+# 대상 테이블 커밋의 snapshot summary 에 남기는 워터마크 (snapshot-property.<key> 쓰기 옵션)
+# 데이터 커밋과 원자적이므로, 워터마크 테이블 기록 전에 중단돼도 다음 실행이 이 값을 이어받음
+JOB_PROPERTY = "etl-job"
+SOURCE_SNAPSHOT_PROPERTY = "etl-source-snapshot-id"
+
+# 데이터 내용이 바뀌지 않는 연산 (rewrite_data_files / rewrite_manifests)
+NO_CHANGE_OPS = {"replace"}
+
+
+@dataclass
+class IncrementPlan:
+    mode: str                                    # full | append | days | noop
+    start: Optional[int]                         # 워터마크 (exclusive)
+    end: Optional[int]                           # 소스 현재 스냅샷 (inclusive)
+    snapshots: List[int] = field(default_factory=list)
+    operations: Dict[str, int] = field(default_factory=dict)
+    reason: str = ""
+
+
+def ensure_watermarks(spark, table: str) -> None:
+    spark.sql(DDL.format(table=table))
+
+
+def load_watermark(spark, table: str, job: str, source: str) -> Optional[int]:
+    rows = (
+        spark.table(table)
+        .where((F.col("job") == job) & (F.col("source_table") == source))
+        .orderBy(F.col("run_ts").desc())
+        .limit(1)
+        .collect()
+    )
+    return rows[0]["source_snapshot_id"] if rows else None
+
+
+def committed_watermark(spark, target: str, job: str) -> Optional[int]:
+    """Source snapshot id stamped on the latest ``job`` commit of ``target`` (None if expired/absent)."""
+    rows = spark.sql(
+        f"SELECT summary['{SOURCE_SNAPSHOT_PROPERTY}'] AS sid FROM {target}.snapshots "
+        f"WHERE summary['{JOB_PROPERTY}'] = '{job}' ORDER BY committed_at DESC LIMIT 1"
+    ).collect()
+    return int(rows[0]["sid"]) if rows and rows[0]["sid"] is not None else None
+
+
+def watermark_candidates(spark, table: str, job: str, source: str, target: str) -> List[int]:
+    # 대상 커밋 summary (데이터와 원자적) + 워터마크 테이블 (대상 스냅샷이 만료돼도 남음)
+    found = [committed_watermark(spark, target, job), load_watermark(spark, table, job, source)]
+    return [s for s in found if s is not None]
+
+
+def record_watermark(spark, table: str, job: str, source: str, target: str, plan: IncrementPlan,
+                     run_ts: datetime) -> None:
+    if plan.end is None:
+        return
+    row = {"job": job, "source_table": source, "source_snapshot_id": plan.end, "target_table": target,
+           "mode": plan.mode, "run_ts": run_ts}
+    spark.createDataFrame([row], schema=spark.table(table).schema).writeTo(table).append()
+
+
+def write_options(job: str, plan: IncrementPlan) -> Dict[str, str]:
+    """Options for ``writeTo(...).options(**...)`` stamping the watermark on the data commit."""
+    return {
+        f"snapshot-property.{JOB_PROPERTY}": job,
+        f"snapshot-property.{SOURCE_SNAPSHOT_PROPERTY}": str(plan.end),
+    }
+
+
+def current_lineage(spark, table: str) -> List[Dict]:
+    """Snapshots of the current branch, oldest first: [{snapshot_id, operation}]."""
+    rows = spark.sql(
+        f"SELECT h.snapshot_id, s.operation FROM {table}.history h "
+        f"JOIN {table}.snapshots s ON h.snapshot_id = s.snapshot_id "
+        f"WHERE h.is_current_ancestor ORDER BY h.made_current_at"
+    ).collect()
+    return [{"snapshot_id": r["snapshot_id"], "operation": r["operation"]} for r in rows]
+
+
+def plan_increment(spark, source: str, candidates: Sequence[int]) -> IncrementPlan:
+    """Decide how to bring a target up to the source's current snapshot.
+
+    The watermark is the newest of ``candidates`` still in the source's
+    current history.
+
+    - ``full``: no watermark, or it is no longer an ancestor of the current
+      snapshot (expired by expire_snapshots, or the table was rolled back).
+    - ``append``: only appends (and data-preserving rewrites) since the
+      watermark → read just the appended files (Iceberg incremental scan).
+    - ``days``: deletes/overwrites happened (e.g. ``--force`` re-ingest) →
+      rebuild the partitions those snapshots touched.
+    - ``noop``: nothing new.
+    """
+    lineage = current_lineage(spark, source)
+    if not lineage:
+        return IncrementPlan("noop", None, None, reason="source has no snapshots")
+    end = lineage[-1]["snapshot_id"]
+    if not candidates:
+        return IncrementPlan("full", None, end, reason="no watermark")
+    ids = [s["snapshot_id"] for s in lineage]
+    known = [c for c in candidates if c in ids]
+    if not known:
+        return IncrementPlan("full", None, end,
+                             reason=f"watermark snapshot(s) {list(candidates)} not in current history")
+    since = max(known, key=ids.index)
+    newer = lineage[ids.index(since) + 1:]
+    ops: Dict[str, int] = {}
+    for s in newer:
+        ops[s["operation"]] = ops.get(s["operation"], 0) + 1
+    plan = IncrementPlan("noop", since, end, [s["snapshot_id"] for s in newer], ops)
+    changing = {op for op in ops if op not in NO_CHANGE_OPS}
+    if not changing:
+        plan.reason = "no new data"
+    elif changing == {"append"}:
+        plan.mode = "append"
+    else:
+        plan.mode = "days"
+        plan.reason = f"non-append operations: {sorted(changing - {'append'})}"
+    return plan
+
+
+def _as_date(v) -> date:
+    # days() 파티션 값: 메타데이터 테이블에서 DATE 로 보이지만 버전에 따라 epoch 일수(int)
+    return v if isinstance(v, date) else date(1970, 1, 1) + timedelta(days=int(v))
+
+
+def changed_days(spark, table: str, snapshot_ids: Sequence[int], partition_field: str = "tdate_day") -> List[date]:
+    """Partition days of data/delete files added or removed by ``snapshot_ids`` (manifest metadata only)."""
+    if not snapshot_ids:
+        return []
+    ids = ", ".join(str(int(s)) for s in snapshot_ids)
+    rows = spark.sql(
+        f"SELECT DISTINCT data_file.partition.{partition_field} AS d FROM {table}.all_entries "
+        f"WHERE status IN (1, 2) AND snapshot_id IN ({ids})"
+    ).collect()
+    return sorted({_as_date(r["d"]) for r in rows if r["d"] is not None})
+
+
+def read_snapshot(spark, table: str, snapshot_id: int):
+    return spark.read.format("iceberg").option("snapshot-id", snapshot_id).load(table)
+
+
+def read_appended(spark, table: str, plan: IncrementPlan):
+    """Rows appended in (plan.start, plan.end] — only the files those append snapshots added."""
+    return (
+        spark.read.format("iceberg")
+        .option("start-snapshot-id", plan.start)
+        .option("end-snapshot-id", plan.end)
+        .load(table)
+    )
+
+
+def day_range_filter(col: str, days: Sequence[date]):
+    # to_date(col) 는 소스로 푸시다운되지 않으므로 [day, day+1) 타임스탬프 범위의 OR
+    cond = None
+    for d in days:
+        start = F.to_timestamp(F.lit(f"{d.isoformat()} 00:00:00"))
+        end = F.to_timestamp(F.lit(f"{(d + timedelta(days=1)).isoformat()} 00:00:00"))
+        c = (F.col(col) >= start) & (F.col(col) < end)
+        cond = c if cond is None else (cond | c)
+    return cond
@@ -6,6 +6,28 @@ from pyspark.sql import functions as F, Window
 from spark_jobs.common_spark import build_spark
 
 
+def build_bars(s):
+    """silver_ticks -> 1m OHLC bars in a single aggregation (one shuffle, no window sorts).
+
+    o / c / oi_last are the open / price / oi of the first / last tick of
+    the bar, ordered by (ts, tcnt): tcnt breaks ties between ticks with the
+    same timestamp so the result is deterministic.
+    """
+    order = F.struct("ts", "tcnt")
+    return (
+        s.groupBy("ymcode", "side", "code", "strike", F.col("minute_ts").alias("bar_ts"), "trade_date")
+         .agg(
+             F.min_by("open", order).alias("o"),
+             F.max("high").alias("h"),
+             F.min("low").alias("l"),
+             F.max_by("price", order).alias("c"),
+             F.count("*").alias("tick_count"),
+             F.sum(F.col("ccnt").cast("long")).alias("v"),
+             F.max_by("oi", order).alias("oi_last"),
+         )
+    )
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--bar-interval", default="1m", choices=["1m"])
@@ -16,22 +38,7 @@ def main():
     s = spark.table("lakehouse.options.silver_ticks")
 
     # 1m bars
-    w_bar = Window.partitionBy("ymcode", "side", "code", "strike", "minute_ts").orderBy(F.col("ts").asc())
-
-    bars = (
-        s.withColumn("rn_asc", F.row_number().over(w_bar))
-         .withColumn("rn_desc", F.row_number().over(w_bar.orderBy(F.col("ts").desc())))
-         .groupBy("ymcode", "side", "code", "strike", F.col("minute_ts").alias("bar_ts"), "trade_date")
-         .agg(
-             F.first(F.when(F.col("rn_asc") == 1, F.col("open")), ignorenulls=True).alias("o"),
-             F.max("high").alias("h"),
-             F.min("low").alias("l"),
-             F.first(F.when(F.col("rn_desc") == 1, F.col("price")), ignorenulls=True).alias("c"),
-             F.count("*").alias("tick_count"),
-             F.sum(F.col("ccnt").cast("long")).alias("v"),
-             F.first(F.when(F.col("rn_desc") == 1, F.col("oi")), ignorenulls=True).alias("oi_last"),
-         )
-    )
+    bars = build_bars(s)
 
     bars.writeTo("lakehouse.options.gold_bars_1m").overwritePartitions()
 
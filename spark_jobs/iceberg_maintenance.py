@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from spark_jobs.bronze_tables import BRONZE_CODES, BRONZE_TICKS
+from spark_jobs.common_spark import build_spark
+from spark_jobs.silver_tables import DIM_CONTRACT, SILVER_TICKS
+
+ACTIONS = ("rewrite_data_files", "rewrite_manifests", "expire_snapshots", "remove_orphan_files")
+WATERMARK_TABLE = "lakehouse.options.etl_watermarks"
+
+
+@dataclass
+class TablePolicy:
+    table: str
+    strategy: Optional[str] = "binpack"        # binpack | sort | None (컴팩션 안 함)
+    sort_order: Optional[str] = None           # None + sort → 테이블 sort order 사용
+    rewrite_days: Optional[int] = None         # 최근 N일 파티션만 컴팩션 (partition_col 기준)
+    partition_col: Optional[str] = None
+    target_file_size_mb: int = 256
+    min_input_files: int = 5
+    delete_file_threshold: Optional[int] = None  # merge-on-read 테이블: delete 파일이 붙은 데이터 파일 재작성
+    rewrite_manifests: bool = True
+    expire_days: int = 7
+    retain_last: int = 20
+    orphan_days: int = 3                       # 진행 중인 쓰기의 파일을 지우지 않도록 충분히 길게
+    watermark_source: bool = False             # 증분 ETL 워터마크 스냅샷은 만료하지 않음
+
+
+POLICIES: Dict[str, TablePolicy] = {
+    # 적재마다 작은 append → 최근 파티션만 테이블 sort order(side, code, tdate)로 재작성
+    "bronze_ticks": TablePolicy(BRONZE_TICKS, strategy="sort", rewrite_days=3, partition_col="tdate",
+                                watermark_source=True),
+    "bronze_codes": TablePolicy(BRONZE_CODES, target_file_size_mb=64, watermark_source=True),
+    "ingest_manifest": TablePolicy("lakehouse.options.ingest_manifest", target_file_size_mb=32, expire_days=30),
+    "etl_watermarks": TablePolicy(WATERMARK_TABLE, target_file_size_mb=32, expire_days=30),
+    # MERGE(merge-on-read) position delete 를 접어 넣으면서 (code, ts) 정렬 유지
+    "silver_ticks": TablePolicy(SILVER_TICKS, strategy="sort", rewrite_days=3, partition_col="trade_date",
+                                delete_file_threshold=1),
+    "dim_contract": TablePolicy(DIM_CONTRACT, target_file_size_mb=32, min_input_files=2, delete_file_threshold=1),
+    "gold_bars_1m": TablePolicy("lakehouse.options.gold_bars_1m", rewrite_days=7, partition_col="trade_date"),
+    "gold_features_1m": TablePolicy("lakehouse.options.gold_features_1m", rewrite_days=7,
+                                    partition_col="trade_date"),
+    "gold_labels_1m": TablePolicy("lakehouse.options.gold_labels_1m", rewrite_days=7, partition_col="trade_date"),
+}
+
+
+def _ts(dt: datetime) -> str:
+    # 세션 타임존 UTC 기준 TIMESTAMP 리터럴
+    return f"TIMESTAMP '{dt.astimezone(timezone.utc):%Y-%m-%d %H:%M:%S}'"
+
+
+def _split(table: str):
+    catalog, ident = table.split(".", 1)
+    return catalog, ident
+
+
+def table_stats(spark, table: str) -> Dict[str, Any]:
+    """File/manifest/snapshot counts and Iceberg scan planning time of a full-table scan."""
+    r = spark.sql(
+        f"SELECT sum(CASE WHEN content = 0 THEN 1 ELSE 0 END) AS data_files, "
+        f"sum(CASE WHEN content > 0 THEN 1 ELSE 0 END) AS delete_files, "
+        f"sum(file_size_in_bytes) AS bytes, sum(CASE WHEN content = 0 THEN record_count ELSE 0 END) AS records "
+        f"FROM {table}.files"
+    ).collect()[0]
+    data_files = r["data_files"] or 0
+    out = {
+        "data_files": data_files,
+        "delete_files": r["delete_files"] or 0,
+        "bytes": r["bytes"] or 0,
+        "records": r["records"] or 0,
+        "avg_file_mb": (r["bytes"] or 0) / max(data_files, 1) / 2**20,
+        "manifests": spark.sql(f"SELECT count(*) AS n FROM {table}.manifests").collect()[0]["n"],
+        "snapshots": spark.sql(f"SELECT count(*) AS n FROM {table}.snapshots").collect()[0]["n"],
+    }
+    # 매번 테이블 메타데이터를 새로 읽어 planFiles 전체 소요 (매니페스트 수/크기에 비례)
+    jvm = spark._jvm
+    t0 = time.perf_counter()
+    tbl = jvm.org.apache.iceberg.spark.Spark3Util.loadIcebergTable(spark._jsparkSession, table)
+    it = tbl.newScan().planFiles().iterator()
+    while it.hasNext():
+        it.next()
+    it.close()
+    out["planning_ms"] = (time.perf_counter() - t0) * 1000.0
+    return out
+
+
+def watermark_floor(spark, table: str) -> Optional[datetime]:
+    """commit time of the oldest snapshot an incremental ETL still resumes from (None if none)."""
+    if not spark.catalog.tableExists(WATERMARK_TABLE):
+        return None
+    rows = spark.sql(
+        f"SELECT date_format(min(s.committed_at), 'yyyy-MM-dd HH:mm:ss') AS t FROM ("
+        f"  SELECT job, max_by(source_snapshot_id, run_ts) AS sid FROM {WATERMARK_TABLE} "
+        f"  WHERE source_table = '{table}' GROUP BY job) w "
+        f"JOIN {table}.snapshots s ON s.snapshot_id = w.sid"
+    ).collect()
+    # 세션 타임존(UTC) 문자열로 받아 파싱: collect() 의 naive datetime 은 드라이버 로컬 타임존 기준
+    if not rows or rows[0]["t"] is None:
+        return None
+    return datetime.strptime(rows[0]["t"], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+def rewrite_data_files_sql(p: TablePolicy, now: datetime) -> Optional[str]:
+    if p.strategy is None:
+        return None
+    catalog, ident = _split(p.table)
+    opts = {
+        "target-file-size-bytes": str(p.target_file_size_mb << 20),
+        "min-input-files": str(p.min_input_files),
+        "partial-progress.enabled": "true",
+    }
+    if p.delete_file_threshold is not None:
+        opts["delete-file-threshold"] = str(p.delete_file_threshold)
+    args = [f"table => '{ident}'", f"strategy => '{p.strategy}'"]
+    if p.strategy == "sort" and p.sort_order:
+        args.append(f"sort_order => '{p.sort_order}'")
+    if p.rewrite_days is not None and p.partition_col:
+        since = (now - timedelta(days=p.rewrite_days)).date().isoformat()
+        args.append(f"where => '{p.partition_col} >= \\'{since}\\''")
+    args.append("options => map(" + ", ".join(f"'{k}', '{v}'" for k, v in opts.items()) + ")")
+    return f"CALL {catalog}.system.rewrite_data_files({', '.join(args)})"
+
+
+def maintain(spark, name: str, p: TablePolicy, actions: List[str], dry_run: bool = False) -> Dict[str, Any]:
+    """Run the policy's actions on one table; before/after stats and per-action results/timings."""
+    now = datetime.now(timezone.utc)
+    catalog, ident = _split(p.table)
+    res: Dict[str, Any] = {"name": name, "table": p.table, "policy": asdict(p), "actions": {}}
+    if not spark.catalog.tableExists(p.table):
+        res["skipped"] = "table does not exist"
+        return res
+    res["before"] = table_stats(spark, p.table)
+
+    def call(action: str, sql: Optional[str]) -> None:
+        if sql is None:
+            return
+        t0 = time.perf_counter()
+        rows = [] if dry_run and action != "remove_orphan_files" else spark.sql(sql).collect()
+        out: Dict[str, Any] = {"sql": sql, "elapsed_s": time.perf_counter() - t0}
+        if action == "remove_orphan_files":
+            out["orphan_files"] = len(rows)
+        elif rows:
+            out.update({k: v for k, v in rows[0].asDict().items()})
+        res["actions"][action] = out
+
+    if "rewrite_data_files" in actions:
+        call("rewrite_data_files", rewrite_data_files_sql(p, now))
+    if "rewrite_manifests" in actions and p.rewrite_manifests:
+        call("rewrite_manifests", f"CALL {catalog}.system.rewrite_manifests(table => '{ident}')")
+    if "expire_snapshots" in actions:
+        older_than = now - timedelta(days=p.expire_days)
+        if p.watermark_source:
+            floor = watermark_floor(spark, p.table)
+            if floor is not None:
+                # 워터마크 스냅샷이 만료되면 증분 ETL 이 전체 재빌드로 떨어지므로 그 이전까지만 만료
+                older_than = min(older_than, floor)
+        call("expire_snapshots",
+             f"CALL {catalog}.system.expire_snapshots(table => '{ident}', "
+             f"older_than => {_ts(older_than)}, retain_last => {p.retain_last})")
+    if "remove_orphan_files" in actions:
+        call("remove_orphan_files",
+             f"CALL {catalog}.system.remove_orphan_files(table => '{ident}', "
+             f"older_than => {_ts(now - timedelta(days=p.orphan_days))}"
+             f"{', dry_run => true' if dry_run else ''})")
+
+    res["after"] = table_stats(spark, p.table)
+    b, a = res["before"], res["after"]
+    res["delta"] = {k: a[k] - b[k] for k in ("data_files", "delete_files", "manifests", "snapshots", "planning_ms")}
+    return res
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tables", default=",".join(POLICIES), help=f"comma-separated subset of {','.join(POLICIES)}")
+    ap.add_argument("--actions", default=",".join(ACTIONS), help=f"comma-separated subset of {','.join(ACTIONS)}")
+    ap.add_argument("--dry-run", action="store_true",
+                    help="stats only; remove_orphan_files runs with dry_run => true")
+    ap.add_argument("--out", default=None, help="write the JSON report to this path")
+    args = ap.parse_args()
+
+    names = [t for t in args.tables.split(",") if t]
+    actions = [a for a in args.actions.split(",") if a]
+    unknown = (set(names) - set(POLICIES)) | (set(actions) - set(ACTIONS))
+    if unknown:
+        raise SystemExit(f"unknown tables/actions: {sorted(unknown)}")
+
+    spark = build_spark("iceberg_maintenance")
+    report = []
+    failed = []
+    for name in names:
+        try:
+            res = maintain(spark, name, POLICIES[name], actions, args.dry_run)
+        except Exception as e:  # 한 테이블 실패가 나머지 테이블 유지보수를 막지 않도록
+            res = {"name": name, "table": POLICIES[name].table, "error": f"{type(e).__name__}: {e}"}
+            failed.append(name)
+        report.append(res)
+        # 테이블별 한 줄 로그 (Airflow 태스크 로그에서 before/after 확인)
+        summary = {k: res.get(k) for k in ("name", "skipped", "error", "delta")}
+        if "before" in res:
+            summary.update(before_files=res["before"]["data_files"], after_files=res["after"]["data_files"],
+                           before_planning_ms=res["before"]["planning_ms"],
+                           after_planning_ms=res["after"]["planning_ms"])
+        print(json.dumps({k: v for k, v in summary.items() if v is not None}, default=str))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    spark.stop()
+    if failed:
+        raise SystemExit(f"maintenance failed for: {failed}")
+
+
+if __name__ == "__main__":
+    main()
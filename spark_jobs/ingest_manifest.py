@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import fnmatch
+import hashlib
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from pyspark.sql import functions as F
+
+
+DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+  src_file STRING,
+  content_sha256 STRING,
+  kind STRING,               -- tick | code
+  side STRING,               -- CALL | PUT
+  target_table STRING,
+  row_count BIGINT,
+  snapshot_id BIGINT,        -- target_table 에 행을 추가한 Iceberg 스냅샷
+  run_id STRING,
+  ingest_ts TIMESTAMP,
+  status STRING              -- pending | done (NULL: 이전 형식, done 과 같음)
+) USING iceberg
+"""
+
+# 대상 테이블 스냅샷 summary 에 남기는 실행 ID (snapshot-property.<key> 쓰기 옵션)
+RUN_PROPERTY = "ingest-run-id"
+
+# 데이터 커밋(DELETE/append) 전에 기록하는 상태. 최신 항목이 pending 인 파일은 이전 실행이 중간에 끝난 것
+PENDING, DONE = "pending", "done"
+
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(4 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def hash_files(paths: Sequence[str], workers: int = 4) -> Dict[str, str]:
+    # hashlib 은 큰 버퍼에서 GIL 을 놓으므로 스레드로 충분
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return dict(zip(paths, pool.map(file_sha256, paths)))
+
+
+def ensure_manifest(spark, table: str) -> None:
+    spark.sql(DDL.format(table=table))
+    if "status" not in spark.table(table).columns:
+        spark.sql(f"ALTER TABLE {table} ADD COLUMNS (status STRING)")
+
+
+def load_manifest(spark, table: str) -> Dict[str, str]:
+    """src_file -> content_sha256 of the latest manifest entry per file, or ``PENDING``.
+
+    ``PENDING`` means the latest entry was written before the data commits
+    of a run that never recorded the file as done.
+    """
+    # 같은 실행의 pending/done 은 ingest_ts 가 같으므로 done 을 뒤로
+    done = F.coalesce(F.col("status") != F.lit(PENDING), F.lit(True))
+    latest = F.max_by(F.struct("content_sha256", done.alias("done")), F.struct("ingest_ts", done))
+    rows = spark.table(table).groupBy("src_file").agg(latest.alias("e")).collect()
+    return {r["src_file"]: r["e"]["content_sha256"] if r["e"]["done"] else PENDING for r in rows}
+
+
+@dataclass
+class IngestPlan:
+    load: List[Tuple[str, str, str]] = field(default_factory=list)      # (path, kind, side) to ingest
+    replace: List[str] = field(default_factory=list)                    # src_file 기존 행 교체 대상
+    skipped: List[str] = field(default_factory=list)                    # 같은 내용으로 이미 적재됨
+    changed: List[str] = field(default_factory=list)                    # 이름은 같고 내용이 다름 (--force 필요)
+    pending: List[str] = field(default_factory=list)                    # 이전 실행이 중간에 끝남 → 교체 재적재
+    hashes: Dict[str, str] = field(default_factory=dict)                # path -> sha256
+
+
+def plan_ingest(inputs: Sequence[Tuple[str, str, str]], manifest: Dict[str, str],
+                force: Sequence[str] = (), hash_workers: int = 4) -> IngestPlan:
+    """Decide per input file: skip (same name + hash in manifest), load, or replace.
+
+    ``force`` holds src_file names or glob patterns; matching files are
+    always re-ingested and their existing rows replaced. A file whose name
+    is in the manifest with a different hash is reported as ``changed`` and
+    not loaded unless forced. A ``PENDING`` file (interrupted run: its rows
+    may be deleted, appended or both) is reloaded and replaced.
+    """
+    names = [os.path.basename(path) for path, _, _ in inputs]
+    dup = sorted({n for n in names if names.count(n) > 1})
+    if dup:
+        # src_file(파일명)이 매니페스트 키이므로 같은 이름의 두 파일은 구분할 수 없음
+        raise ValueError(f"duplicate src_file names in inputs: {dup}")
+    p = IngestPlan(hashes=hash_files([path for path, _, _ in inputs], hash_workers))
+    for path, kind, side in inputs:
+        name = os.path.basename(path)
+        forced = any(fnmatch.fnmatch(name, pat) for pat in force)
+        prev = manifest.get(name)
+        if forced or prev == PENDING:
+            p.load.append((path, kind, side))
+            p.replace.append(name)
+            if not forced:
+                p.pending.append(name)
+        elif prev is None:
+            p.load.append((path, kind, side))
+        elif prev == p.hashes[path]:
+            p.skipped.append(name)
+        else:
+            p.changed.append(name)
+    return p
+
+
+def snapshot_for_run(spark, table: str, run_id: str) -> Optional[int]:
+    rows = spark.sql(
+        f"SELECT snapshot_id FROM {table}.snapshots "
+        f"WHERE summary['{RUN_PROPERTY}'] = '{run_id}' ORDER BY committed_at DESC LIMIT 1"
+    ).collect()
+    return rows[0]["snapshot_id"] if rows else None
+
+
+def record_pending(spark, table: str, inputs: Sequence[Tuple[str, str, str]], hashes: Dict[str, str],
+                   target_tables: Dict[str, str], run_id: str, ingest_ts: datetime) -> None:
+    """Mark ``inputs`` pending (single commit) before their rows are deleted or appended.
+
+    If the run dies before ``record_ingest``, the next run sees ``PENDING``
+    and reloads the files instead of skipping them.
+    """
+    entries = [
+        {"src_file": os.path.basename(path), "content_sha256": hashes.get(path), "kind": kind, "side": side,
+         "target_table": target_tables[kind], "row_count": None, "snapshot_id": None}
+        for path, kind, side in inputs
+    ]
+    record_ingest(spark, table, entries, run_id, ingest_ts, status=PENDING)
+
+
+def record_ingest(spark, table: str, entries: List[Dict], run_id: str, ingest_ts: datetime,
+                  status: str = DONE) -> None:
+    """Append one manifest row per ingested file (single commit)."""
+    if not entries:
+        return
+    rows = [dict(e, run_id=run_id, ingest_ts=ingest_ts, status=status) for e in entries]
+    df = spark.createDataFrame(rows, schema=spark.table(table).schema)
+    df.writeTo(table).append()
+
+
+def delete_files(spark, table: str, names: Sequence[str]) -> None:
+    """Row-level delete of everything previously ingested from ``names``."""
+    if not names:
+        return
+    # Spark SQL 문자열 리터럴은 백슬래시 이스케이프
+    quoted = ", ".join("'" + n.replace("\\", "\\\\").replace("'", "\\'") + "'" for n in names)
+    spark.sql(f"DELETE FROM {table} WHERE src_file IN ({quoted})")
@@ -1,13 +1,32 @@
 from __future__ import annotations
 
 import argparse
+import glob
 import os
-import xml.etree.ElementTree as ET
+import re
+import shutil
+import tempfile
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from functools import reduce
+from typing import Dict, List, Sequence, Tuple
 
 from pyspark.sql import functions as F, types as T
 
+from spark_jobs.bronze_tables import BRONZE_CODES, BRONZE_TICKS, DEFAULT_TARGET_FILE_SIZE_MB, ensure_bronze_tables
 from spark_jobs.common_spark import build_spark
+from spark_jobs.ingest_manifest import (
+    RUN_PROPERTY,
+    delete_files,
+    ensure_manifest,
+    load_manifest,
+    plan_ingest,
+    record_ingest,
+    record_pending,
+    snapshot_for_run,
+)
+from spark_jobs.xml_stream import detect_row_tag, stage_to_parquet
 
 
 TICK_SCHEMA = T.StructType([
@@ -33,17 +52,11 @@ CODE_SCHEMA = T.StructType([
 ])
 
 
-def detect_row_tag(xml_path: str) -> str:
-    root = ET.parse(xml_path).getroot()
-    # first child tag is the row tag (dataset element)
-    return list(root)[0].tag
-
-
 def read_xml_rows(spark, xml_path: str, row_tag: str, schema: T.StructType):
     # Requires spark-xml package in your Spark runtime:
     # com.databricks:spark-xml_2.12:0.17.0 (or compatible)
     #
-    # If spark-xml is not available in your environment, convert XML to JSON/Parquet via Python first.
+    # --reader stream (기본) 은 spark-xml 없이 spark_jobs/xml_stream.py 로 Parquet 스테이징 후 적재합니다.
     return (
         spark.read.format("xml")
         .option("rowTag", row_tag)
@@ -52,55 +65,200 @@ def read_xml_rows(spark, xml_path: str, row_tag: str, schema: T.StructType):
     )
 
 
+def read_spark_xml(spark, xml_path: str, kind: str, side: str, ingest_ts: str):
+    schema = TICK_SCHEMA if kind == "tick" else CODE_SCHEMA
+    return read_xml_rows(spark, xml_path, detect_row_tag(xml_path), schema) \
+        .withColumn("src_file", F.lit(os.path.basename(xml_path))) \
+        .withColumn("side", F.lit(side)) \
+        .withColumn("ingest_ts", F.to_timestamp(F.lit(ingest_ts)))
+
+
+TABLES = {"tick": BRONZE_TICKS, "code": BRONZE_CODES}
+
+# 파일명에서 종류/옵션 구분 추론: 202601_20251201_TICK_CALL.xml, 202601_20251219CODE_PUT.xml 등
+_NAME_RE = re.compile(r"(TICK|CODE)_?(CALL|PUT)", re.IGNORECASE)
+
+
+def classify_file(path: str) -> Tuple[str, str]:
+    """(kind, side) from a file name, e.g. ("tick", "CALL"); ValueError if it does not match."""
+    m = _NAME_RE.search(os.path.basename(path))
+    if m is None:
+        raise ValueError(f"cannot infer TICK/CODE and CALL/PUT from file name: {path}")
+    return m.group(1).lower(), m.group(2).upper()
+
+
+def expand_inputs(patterns: Sequence[str]) -> List[Tuple[str, str, str]]:
+    """Directories (all *.xml inside) and globs -> sorted, de-duplicated (path, kind, side)."""
+    paths = set()
+    for pat in patterns:
+        if os.path.isdir(pat):
+            paths.update(glob.glob(os.path.join(pat, "*.xml")) + glob.glob(os.path.join(pat, "*.XML")))
+        else:
+            matched = glob.glob(pat)
+            if not matched:
+                raise SystemExit(f"no files match {pat}")
+            paths.update(matched)
+    return [(p, *classify_file(p)) for p in sorted(os.path.abspath(p) for p in paths)]
+
+
+def _stage_one(args: Tuple[int, str, str, str, str, datetime]) -> Tuple[str, str, str, int]:
+    i, xml_path, kind, side, staging_dir, ingest_ts = args
+    # 같은 파일명이 다른 디렉터리에 있어도 충돌하지 않도록 순번 접두사
+    dst = os.path.join(staging_dir, f"{i:05d}-{kind}-{side}-{os.path.basename(xml_path)}.parquet")
+    return xml_path, kind, dst, stage_to_parquet(xml_path, dst, kind, side, ingest_ts)
+
+
+def stage_inputs(inputs: List[Tuple[str, str, str]], staging_dir: str,
+                 ingest_ts: datetime, workers: int = 1) -> Dict[str, List[str]]:
+    """Stream each (xml_path, kind, side) to a Parquet staging file; returns paths per kind.
+
+    With ``workers`` > 1 files are parsed concurrently in a process pool
+    (XML parsing is CPU-bound and holds the GIL).
+    """
+    os.makedirs(staging_dir, exist_ok=True)
+    out: Dict[str, List[str]] = {"tick": [], "code": []}
+    jobs = [(i, path, kind, side, staging_dir, ingest_ts) for i, (path, kind, side) in enumerate(inputs)]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_stage_one, jobs))
+    else:
+        results = [_stage_one(j) for j in jobs]
+    for xml_path, kind, dst, rows in results:
+        print(f"staged {rows} rows: {xml_path} -> {dst}")
+        if rows:
+            out[kind].append(dst)
+    return out
+
+
 def main():
     ap = argparse.ArgumentParser()
-    ap.add_argument("--tick-call", required=True)
-    ap.add_argument("--tick-put", required=True)
-    ap.add_argument("--code-call", required=True)
-    ap.add_argument("--code-put", required=True)
+    ap.add_argument("--tick-call", default=None)
+    ap.add_argument("--tick-put", default=None)
+    ap.add_argument("--code-call", default=None)
+    ap.add_argument("--code-put", default=None)
+    ap.add_argument("--inputs", nargs="+", default=None,
+                    help="directories and/or globs; TICK/CODE and CALL/PUT are inferred from file names")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                    help="parallel file parsers for --reader stream")
+    ap.add_argument("--reader", default="stream", choices=["stream", "spark-xml"],
+                    help="stream: iterparse -> Parquet staging (no spark-xml); spark-xml: legacy reader")
+    ap.add_argument("--staging-dir", default=None,
+                    help="Parquet staging dir for --reader stream (must be readable by Spark executors; "
+                         "default: temp dir, removed after append)")
+    ap.add_argument("--staging-only", action="store_true",
+                    help="write Parquet staging files and exit without Spark (requires --staging-dir)")
+    ap.add_argument("--target-file-size-mb", type=int, default=DEFAULT_TARGET_FILE_SIZE_MB,
+                    help="bronze_ticks write.target-file-size-bytes")
+    ap.add_argument("--manifest-table", default="lakehouse.options.ingest_manifest")
+    ap.add_argument("--no-manifest", action="store_true", help="append every input (legacy behavior)")
+    ap.add_argument("--force", nargs="+", default=[],
+                    help="src_file names/globs to re-ingest; their existing rows are replaced")
     args = ap.parse_args()
 
-    spark = build_spark("ingest_xml_to_bronze")
+    four = [args.tick_call, args.tick_put, args.code_call, args.code_put]
+    if args.inputs:
+        if any(four):
+            raise SystemExit("use either --inputs or the four --tick-*/--code-* paths, not both")
+        inputs = expand_inputs(args.inputs)
+    elif all(four):
+        inputs = [
+            (args.tick_call, "tick", "CALL"),
+            (args.tick_put, "tick", "PUT"),
+            (args.code_call, "code", "CALL"),
+            (args.code_put, "code", "PUT"),
+        ]
+    else:
+        raise SystemExit("either --inputs or all of --tick-call/--tick-put/--code-call/--code-put is required")
+    print(f"inputs: {len(inputs)} files "
+          f"({sum(k == 'tick' for _, k, _ in inputs)} tick, {sum(k == 'code' for _, k, _ in inputs)} code)")
+    ingest_dt = datetime.now(timezone.utc)
 
-    spark.sql("CREATE NAMESPACE IF NOT EXISTS lakehouse.options")
+    if args.staging_only:
+        if not args.staging_dir:
+            raise SystemExit("--staging-only requires --staging-dir")
+        stage_inputs(inputs, args.staging_dir, ingest_dt, workers=args.workers)
+        print(f"OK: staged Parquet under {args.staging_dir}")
+        return
 
-    ingest_ts = datetime.now(timezone.utc).isoformat()
+    spark = build_spark("ingest_xml_to_bronze")
 
-    # Tick CALL
-    tick_call_tag = detect_row_tag(args.tick_call)
-    df_tc = read_xml_rows(spark, args.tick_call, tick_call_tag, TICK_SCHEMA) \
-        .withColumn("src_file", F.lit(os.path.basename(args.tick_call))) \
-        .withColumn("side", F.lit("CALL")) \
-        .withColumn("ingest_ts", F.to_timestamp(F.lit(ingest_ts)))
+    spark.sql("CREATE NAMESPACE IF NOT EXISTS lakehouse.options")
+    # bronze_ticks: days(tdate), ymcode 파티션 + (side, code, tdate) 정렬 + 목표 파일 크기
+    ensure_bronze_tables(spark, args.target_file_size_mb)
 
-    # Tick PUT
-    tick_put_tag = detect_row_tag(args.tick_put)
-    df_tp = read_xml_rows(spark, args.tick_put, tick_put_tag, TICK_SCHEMA) \
-        .withColumn("src_file", F.lit(os.path.basename(args.tick_put))) \
-        .withColumn("side", F.lit("PUT")) \
-        .withColumn("ingest_ts", F.to_timestamp(F.lit(ingest_ts)))
+    # 매니페스트: 같은 src_file + 같은 내용(sha256)은 건너뜀 → 재실행/Airflow 재시도는 해시 계산만 하는 no-op
+    replace: Dict[str, List[str]] = {"tick": [], "code": []}
+    hashes: Dict[str, str] = {}
+    if not args.no_manifest:
+        ensure_manifest(spark, args.manifest_table)
+        plan = plan_ingest(inputs, load_manifest(spark, args.manifest_table), args.force,
+                           hash_workers=args.workers)
+        print(f"manifest: load={len(plan.load)} skip={len(plan.skipped)} "
+              f"replace={len(plan.replace)} changed={len(plan.changed)} pending={len(plan.pending)}")
+        for name in plan.changed:
+            print(f"WARN: {name} was ingested with different content; skipped (use --force {name} to replace)")
+        for name in plan.pending:
+            print(f"WARN: {name} is pending from an interrupted run; replacing")
+        inputs, hashes = plan.load, plan.hashes
+        if not inputs:
+            print("OK: nothing to ingest (all inputs already in manifest)")
+            spark.stop()
+            return
+        for kind in TABLES:
+            replace[kind] = [os.path.basename(p) for p, k, _ in inputs
+                             if k == kind and os.path.basename(p) in plan.replace]
 
-    # Code CALL
-    code_call_tag = detect_row_tag(args.code_call)
-    df_cc = read_xml_rows(spark, args.code_call, code_call_tag, CODE_SCHEMA) \
-        .withColumn("src_file", F.lit(os.path.basename(args.code_call))) \
-        .withColumn("side", F.lit("CALL")) \
-        .withColumn("ingest_ts", F.to_timestamp(F.lit(ingest_ts)))
+    # Write to Iceberg: 입력 파일 수와 무관하게 테이블당 append 1회 (= Iceberg 스냅샷 1개)
+    # (교체 대상이 있으면 그 파일 행의 DELETE 커밋이 먼저 1회 추가됨)
+    tmp_dir = None
+    if args.reader == "stream":
+        if args.staging_dir is None:
+            tmp_dir = tempfile.mkdtemp(prefix="bronze-staging-")
+        staged = stage_inputs(inputs, args.staging_dir or tmp_dir, ingest_dt, workers=args.workers)
+        frames = {
+            kind: spark.read.parquet(*[f"file://{os.path.abspath(p)}" for p in paths]) if paths else None
+            for kind, paths in staged.items()
+        }
+    else:
+        # spark-xml: 파일별 DataFrame 을 union → Spark 가 파일들을 task 로 병렬 파싱
+        ingest_ts = ingest_dt.isoformat()
+        frames = {}
+        for kind in ("tick", "code"):
+            dfs = [read_spark_xml(spark, path, k, side, ingest_ts) for path, k, side in inputs if k == kind]
+            frames[kind] = reduce(lambda a, b: a.unionByName(b), dfs) if dfs else None
 
-    # Code PUT
-    code_put_tag = detect_row_tag(args.code_put)
-    df_cp = read_xml_rows(spark, args.code_put, code_put_tag, CODE_SCHEMA) \
-        .withColumn("src_file", F.lit(os.path.basename(args.code_put))) \
-        .withColumn("side", F.lit("PUT")) \
-        .withColumn("ingest_ts", F.to_timestamp(F.lit(ingest_ts)))
+    run_id = uuid.uuid4().hex
+    if not args.no_manifest:
+        # DELETE/append 커밋 전에 pending 기록: 그 사이에 중단되면 다음 실행이 이 파일들을 다시 적재/교체
+        record_pending(spark, args.manifest_table, inputs, hashes, TABLES, run_id, ingest_dt)
+    entries = []
+    for kind, table in TABLES.items():
+        delete_files(spark, table, replace[kind])
+        df = frames[kind]
+        counts, snapshot_id = {}, None
+        if df is not None:
+            counts = {r["src_file"]: r["count"] for r in df.groupBy("src_file").count().collect()}
+            df.writeTo(table).option(f"snapshot-property.{RUN_PROPERTY}", run_id).append()
+            snapshot_id = snapshot_for_run(spark, table, run_id)
+        for path, k, side in inputs:
+            if k != kind:
+                continue
+            name = os.path.basename(path)
+            entries.append({
+                "src_file": name,
+                "content_sha256": hashes.get(path),
+                "kind": kind,
+                "side": side,
+                "target_table": table,
+                "row_count": counts.get(name, 0),
+                "snapshot_id": snapshot_id if counts.get(name) else None,
+            })
 
-    # Write to Iceberg
-    # Note: bronze_ticks/bronze_codes tables must exist (see docs/10_offline_mainline_A_build_run.md)
-    df_ticks = df_tc.unionByName(df_tp)
-    df_codes = df_cc.unionByName(df_cp)
+    if not args.no_manifest:
+        record_ingest(spark, args.manifest_table, entries, run_id, ingest_dt)
 
-    df_ticks.writeTo("lakehouse.options.bronze_ticks").append()
-    df_codes.writeTo("lakehouse.options.bronze_codes").append()
+    if tmp_dir is not None:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
 
     print("OK: ingested to lakehouse.options.bronze_ticks / bronze_codes")
 
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+
+from spark_jobs.common_spark import build_spark
+
+
+DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+  logged_at TIMESTAMP,
+  key STRING,
+  ok BOOLEAN,
+  pred DOUBLE,
+  decision STRING,
+  reason STRING,
+  model_version STRING
+) USING iceberg
+PARTITIONED BY (days(logged_at))
+"""
+
+
+def main():
+    # runtime/decision_log.py 가 롤오버한(완료된) Parquet 파일을 Iceberg에 1회 커밋으로 적재
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--log-dir", required=True)
+    ap.add_argument("--table", default="lakehouse.options.runtime_decisions")
+    args = ap.parse_args()
+
+    # *.parquet.inprogress 는 아직 쓰는 중이므로 제외
+    paths = sorted(glob.glob(os.path.join(args.log_dir, "decisions-*.parquet")))
+    if not paths:
+        print("OK: no closed decision log files")
+        return
+
+    spark = build_spark("load_decision_logs")
+    spark.sql("CREATE NAMESPACE IF NOT EXISTS lakehouse.options")
+    spark.sql(DDL.format(table=args.table))
+
+    df = spark.read.parquet(*[f"file://{os.path.abspath(p)}" for p in paths])
+    df.writeTo(args.table).append()
+
+    # 커밋된 파일은 committed/ 로 이동 (재실행 시 중복 적재 방지)
+    done_dir = os.path.join(args.log_dir, "committed")
+    os.makedirs(done_dir, exist_ok=True)
+    for p in paths:
+        os.replace(p, os.path.join(done_dir, os.path.basename(p)))
+
+    print(f"OK: appended {len(paths)} decision log files to {args.table}")
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from typing import Optional, Sequence
+
+
+SILVER_TICKS = "lakehouse.options.silver_ticks"
+
+# 틱 식별 키: 같은 키의 행은 같은 틱 (파일 재전송/정정본)
+TICK_KEY = ["ymcode", "side", "code", "ts", "tcnt"]
+# 키가 같고 이 값들이 같으면 동일 틱 → MERGE 가 갱신하지 않음
+TICK_VALUES = ["strike", "price", "open", "high", "low", "oi", "ccnt"]
+
+# 파티션(trade_date, side) 안에서 (code, ts) 정렬: 한 계약·하루 조회가 파일/row group 의 code min/max 로 대부분 건너뜀
+TICKS_SORT_ORDER = ["code", "ts"]
+# code 는 row group 하나에 여러 값이 섞이는 경계 구간이 있으므로 bloom filter 로 한 번 더 거름 (Spark/Trino 모두 사용)
+TICKS_BLOOM_COLUMNS = ["code"]
+
+SILVER_TICKS_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+  ymcode STRING,
+  side STRING,
+  code STRING,
+  strike INT,
+  ts TIMESTAMP,
+  tcnt BIGINT,
+  price DOUBLE,
+  open DOUBLE,
+  high DOUBLE,
+  low DOUBLE,
+  oi DOUBLE,
+  ccnt BIGINT,
+  trade_date DATE,
+  minute_ts TIMESTAMP,
+  ingest_ts TIMESTAMP
+) USING iceberg
+PARTITIONED BY (trade_date, side)
+TBLPROPERTIES ('format-version'='2')
+"""
+
+
+def ensure_silver_ticks(spark, table: str = SILVER_TICKS, merge_mode: str = "merge-on-read",
+                        layout: bool = True) -> None:
+    """Create silver_ticks if missing and set its row-level write modes and layout.
+
+    ``merge-on-read``: MERGE/DELETE/UPDATE write position-delete files
+    instead of rewriting every data file that holds a matched row
+    (compaction folds them back in). ``copy-on-write`` rewrites those files.
+
+    ``layout``: table sort order (code, ts) and Parquet bloom filters on
+    code. Both live in table metadata, so every writer (this ETL, MERGE,
+    rewrite_data_files, Trino) produces files that point lookups can skip.
+    Files written before are re-laid by ``rewrite_sorted``.
+    """
+    spark.sql(SILVER_TICKS_DDL.format(table=table))
+    props = {
+        "format-version": "2",
+        "write.merge.mode": merge_mode,
+        "write.update.mode": merge_mode,
+        "write.delete.mode": merge_mode,
+    }
+    if layout:
+        spark.sql(
+            f"ALTER TABLE {table} WRITE DISTRIBUTED BY PARTITION LOCALLY ORDERED BY {', '.join(TICKS_SORT_ORDER)}"
+        )
+        for c in TICKS_BLOOM_COLUMNS:
+            props[f"write.parquet.bloom-filter-enabled.column.{c}"] = "true"
+    spark.sql(
+        f"ALTER TABLE {table} SET TBLPROPERTIES ("
+        + ", ".join(f"'{k}'='{v}'" for k, v in props.items()) + ")"
+    )
+
+
+def rewrite_sorted(spark, table: str = SILVER_TICKS, where: Optional[str] = None, zorder: bool = False):
+    """Rewrite data files in the table sort order (or Z-order on code, ts); returns the procedure result row.
+
+    ``where`` limits the rewrite, e.g. ``"trade_date = '2025-12-01'"``.
+    Z-order keeps ts-range scans without a code filter somewhat selective at
+    the cost of weaker single-code pruning.
+    """
+    catalog, ident = table.split(".", 1)
+    sort = f"zorder({', '.join(TICKS_SORT_ORDER)})" if zorder else ", ".join(f"{c} ASC" for c in TICKS_SORT_ORDER)
+    args = [f"table => '{ident}'", "strategy => 'sort'", f"sort_order => '{sort}'",
+            "options => map('rewrite-all', 'true')"]
+    if where:
+        args.append("where => '" + where.replace("'", "\\'") + "'")
+    return spark.sql(f"CALL {catalog}.system.rewrite_data_files({', '.join(args)})").collect()[0]
+
+
+def _sql_list(values: Sequence) -> str:
+    return ", ".join(f"'{v}'" for v in values)
+
+
+def _in_or_null(col: str, values: Sequence) -> str:
+    # 배치에 NULL 파티션 값이 있으면 IN 만으로는 그 파티션이 빠지므로 IS NULL 을 더함
+    known = [v for v in values if v is not None]
+    preds = [f"{col} IN ({_sql_list(known)})"] if known else []
+    if len(known) < len(values):
+        preds.append(f"{col} IS NULL")
+    return "(" + " OR ".join(preds) + ")"
+
+
+def merge_ticks_sql(table: str, source_view: str, trade_dates: Sequence, sides: Sequence[str]) -> str:
+    """MERGE of a deduplicated tick batch into silver_ticks.
+
+    - new key → INSERT
+    - same key, newer ``ingest_ts`` and different values → UPDATE (정정 틱)
+    - same key and same values (재전송) or older → untouched
+
+    Literal ``trade_date``/``side`` predicates on the target prune the scan
+    to the partitions the batch touches. Keys are compared null-safe
+    (``<=>``): a tick with a null ``ts``/``tcnt`` matches its earlier copy
+    instead of being inserted again on every re-delivery. Re-running the
+    same batch is a no-op.
+    """
+    on = " AND ".join(f"t.{k} <=> s.{k}" for k in TICK_KEY)
+    differs = " OR ".join(f"NOT (t.{c} <=> s.{c})" for c in TICK_VALUES)
+    return (
+        f"MERGE INTO {table} t USING {source_view} s "
+        f"ON {on} AND t.trade_date <=> s.trade_date "
+        f"AND {_in_or_null('t.trade_date', trade_dates)} AND {_in_or_null('t.side', sides)} "
+        f"WHEN MATCHED AND s.ingest_ts > t.ingest_ts AND ({differs}) THEN UPDATE SET * "
+        f"WHEN NOT MATCHED THEN INSERT *"
+    )
+
+
+DIM_CONTRACT = "lakehouse.options.dim_contract"
+DIM_KEY = ["ymcode", "side", "code"]
+DIM_ATTRS = ["strike", "lastday"]
+
+# SCD2 유효 구간 [effective_from, effective_to): 현재 버전은 OPEN_END, 최초 버전은 MIN_DATE 부터
+# (처음 보는 계약도 과거 틱과 조인되도록)
+MIN_DATE = "1900-01-01"
+OPEN_END = "2999-12-31"
+
+DIM_CONTRACT_DDL = """
+CREATE TABLE IF NOT EXISTS {table} (
+  ymcode STRING,
+  side STRING,
+  code STRING,
+  strike INT,
+  lastday INT,
+  effective_from DATE,
+  effective_to DATE
+) USING iceberg
+PARTITIONED BY (ymcode, side)
+TBLPROPERTIES ('format-version'='2')
+"""
+
+
+def ensure_dim_contract(spark, table: str = DIM_CONTRACT) -> None:
+    # merge-on-read: 버전을 닫는 UPDATE 가 같은 파일의 변경 없는 계약까지 다시 쓰지 않도록
+    spark.sql(DIM_CONTRACT_DDL.format(table=table))
+    spark.sql(
+        f"ALTER TABLE {table} SET TBLPROPERTIES ("
+        f"'format-version'='2', 'write.merge.mode'='merge-on-read', 'write.update.mode'='merge-on-read')"
+    )
+
+
+def scd2_merge_sql(table: str, staged_view: str) -> str:
+    """SCD2 MERGE of staged changes into dim_contract.
+
+    ``staged_view`` has the dim columns plus ``merge_ymcode/merge_side/
+    merge_code``: changed contracts appear twice — with merge keys (closes
+    the current version at the new ``effective_from``) and with NULL merge
+    keys (inserts the new version); new contracts appear once with NULL keys.
+    """
+    on = " AND ".join(f"t.{k} = s.merge_{k}" for k in DIM_KEY)
+    cols = DIM_KEY + DIM_ATTRS + ["effective_from"]
+    return (
+        f"MERGE INTO {table} t USING {staged_view} s "
+        f"ON {on} AND t.effective_to = DATE'{OPEN_END}' "
+        f"WHEN MATCHED THEN UPDATE SET effective_to = s.effective_from "
+        f"WHEN NOT MATCHED THEN INSERT ({', '.join(cols)}, effective_to) "
+        f"VALUES ({', '.join('s.' + c for c in cols)}, DATE'{OPEN_END}')"
+    )
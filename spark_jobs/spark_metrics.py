@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+import urllib.request
+from typing import Any, Dict
+
+
+def stage_metrics(spark, job_group: str) -> Dict[str, Any]:
+    """Summed stage metrics of the jobs in ``job_group`` (``sc.setJobGroup``), via the Spark UI REST API.
+
+    Call after the jobs finished; the listener updates the REST view asynchronously,
+    so callers usually wait a moment first.
+    """
+    sc = spark.sparkContext
+    base = f"{sc.uiWebUrl}/api/v1/applications/{sc.applicationId}"
+    with urllib.request.urlopen(f"{base}/jobs") as r:
+        jobs = json.load(r)
+    stage_ids = {s for j in jobs if j.get("jobGroup") == job_group for s in j["stageIds"]}
+    with urllib.request.urlopen(f"{base}/stages") as r:
+        stages = [s for s in json.load(r) if s["stageId"] in stage_ids and s.get("status") == "COMPLETE"]
+    keys = ("inputBytes", "shuffleReadBytes", "shuffleWriteBytes", "memoryBytesSpilled", "diskBytesSpilled",
+            "executorRunTime", "numCompleteTasks")
+    out: Dict[str, Any] = {"jobs": sum(1 for j in jobs if j.get("jobGroup") == job_group), "stages": len(stages)}
+    for k in keys:
+        out[k] = sum(s.get(k, 0) for s in stages)
+    return out
+
+
+def plan_operators(df) -> Dict[str, int]:
+    """Shuffle/sort/window operator counts in the executed physical plan (AQE final plan when available)."""
+    plan = df._jdf.queryExecution().executedPlan().toString()
+    return {
+        "exchanges": plan.count("Exchange "),
+        "sorts": plan.count("Sort ["),
+        "windows": plan.count("Window ["),
+    }
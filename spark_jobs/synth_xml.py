@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+import math
+import os
+import random
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+
+KST = timezone(timedelta(hours=9))
+SESSION_START_S = 9 * 3600            # 09:00 KST
+SESSION_END_S = 15 * 3600 + 45 * 60   # 15:45 KST
+STRIKE_STEP = 5
+
+
+def xml_name(s: str) -> str:
+    # .NET XmlConvert.EncodeName: 숫자로 시작하는 이름의 첫 글자를 _xHHHH_ 로 인코딩 (예: 202601_... -> _x0032_02601_...)
+    return f"_x{ord(s[0]):04X}_{s[1:]}" if s[:1].isdigit() else s
+
+
+def business_days(start: date, n: int) -> List[date]:
+    out, d = [], start
+    while len(out) < n:
+        if d.weekday() < 5:
+            out.append(d)
+        d += timedelta(days=1)
+    return out
+
+
+def add_months(ym: str, k: int) -> str:
+    y, m = int(ym[:4]), int(ym[4:])
+    y, m = divmod(y * 12 + m - 1 + k, 12)
+    return f"{y:04d}{m + 1:02d}"
+
+
+def last_trading_day(ymcode: str) -> date:
+    # 월물 만기: 해당 월 두 번째 목요일
+    d = date(int(ymcode[:4]), int(ymcode[4:]), 1)
+    first_thu = d + timedelta(days=(3 - d.weekday()) % 7)
+    return first_thu + timedelta(days=7)
+
+
+def contract_code(ymcode: str, side: str, strike: int) -> str:
+    # runtime/bench_runtime.synth_chain_keys 와 같은 코드 체계
+    return f"B{'0' if side == 'CALL' else '1'}16{ymcode[-2:]}{strike:03d}"
+
+
+def _norm_cdf(x: float) -> float:
+    return 0.5 * (1.0 + math.erf(x / math.sqrt(2.0)))
+
+
+def bs_price(side: str, s: float, k: float, t: float, vol: float, r: float = 0.03) -> float:
+    if t <= 0:
+        return max(s - k, 0.0) if side == "CALL" else max(k - s, 0.0)
+    sq = vol * math.sqrt(t)
+    d1 = (math.log(s / k) + (r + 0.5 * vol * vol) * t) / sq
+    d2 = d1 - sq
+    if side == "CALL":
+        return s * _norm_cdf(d1) - k * math.exp(-r * t) * _norm_cdf(d2)
+    return k * math.exp(-r * t) * _norm_cdf(-d2) - s * _norm_cdf(-d1)
+
+
+def tick_round(p: float) -> float:
+    # 옵션 호가 단위: 10 미만 0.01, 이상 0.05 (최소 0.01)
+    step = 0.01 if p < 10 else 0.05
+    return max(0.01, round(round(p / step) * step, 2))
+
+
+def underlying_path(rng: random.Random, s0: float, annual_vol: float) -> List[float]:
+    """Per-second KOSPI200-like path over one session (GBM)."""
+    n = SESSION_END_S - SESSION_START_S + 1
+    sig = annual_vol / math.sqrt(252 * n)
+    out, s = [], s0
+    for _ in range(n):
+        out.append(s)
+        s *= math.exp(rng.gauss(0.0, sig) - 0.5 * sig * sig)
+    return out
+
+
+def _row(tag: str, fields: List[tuple]) -> str:
+    inner = "".join(f"    <{k}>{v}</{k}>\n" for k, v in fields)
+    return f"  <{tag}>\n{inner}  </{tag}>\n"
+
+
+def write_tick_file(path: str, rng: random.Random, ymcode: str, side: str, day: date, strikes: List[int],
+                    ticks_per_contract: int, path_s: List[float], vol: float) -> int:
+    """One TICK_{side} file for ``ymcode`` on ``day``; contracts written one after another (time-ordered)."""
+    tag = xml_name(f"{ymcode}_{day:%Y%m%d}_TICK_{side}")
+    t_years = max((last_trading_day(ymcode) - day).days, 0) / 365.0
+    idate = int(f"{day:%Y%m%d}")
+    midnight = datetime(day.year, day.month, day.day, tzinfo=KST)
+    rows = 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" standalone="yes"?>\n<DocumentElement>\n')
+        for strike in strikes:
+            code = contract_code(ymcode, side, strike)
+            moneyness = abs(path_s[0] - strike) / path_s[0]
+            oi = int(rng.uniform(2_000, 40_000) * math.exp(-8 * moneyness))
+            secs = sorted(rng.uniform(SESSION_START_S, SESSION_END_S) for _ in range(ticks_per_contract))
+            o = h = l = None
+            buf = []
+            for tcnt, sec in enumerate(secs, start=1):
+                s = path_s[int(sec) - SESSION_START_S]
+                # 변동성 스마일 + 틱 단위 미시구조 노이즈
+                iv = vol * (1.0 + 0.8 * (math.log(strike / s)) ** 2)
+                c = tick_round(bs_price(side, s, strike, t_years + 1e-4, iv) * (1.0 + rng.gauss(0.0, 0.002)))
+                o = c if o is None else o
+                h = c if h is None else max(h, c)
+                l = c if l is None else min(l, c)
+                oi = max(0, oi + int(rng.gauss(0.0, 3.0)))
+                ts = midnight + timedelta(seconds=sec)
+                buf.append(_row(tag, [
+                    ("ymcode", ymcode), ("code", code), ("strike", strike), ("idate", idate),
+                    ("itime", int(ts.strftime("%H%M%S"))),
+                    ("tdate", ts.isoformat(timespec="milliseconds")),
+                    ("tcnt", tcnt), ("c", f"{c:.2f}"), ("o", f"{o:.2f}"), ("h", f"{h:.2f}"), ("l", f"{l:.2f}"),
+                    ("oi", oi), ("ccnt", max(1, int(rng.expovariate(1 / 8.0)))),
+                ]))
+                if len(buf) >= 10_000:
+                    f.write("".join(buf))
+                    buf.clear()
+            f.write("".join(buf))
+            rows += len(secs)
+        f.write("</DocumentElement>\n")
+    return rows
+
+
+def write_code_file(path: str, ymcode: str, side: str, file_day: date, strikes: List[int]) -> int:
+    tag = xml_name(f"{ymcode}_{file_day:%Y%m%d}CODE_{side}")
+    lastday = int(f"{last_trading_day(ymcode):%Y%m%d}")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" standalone="yes"?>\n<DocumentElement>\n')
+        for strike in strikes:
+            f.write(_row(tag, [("ymcode", ymcode), ("code", contract_code(ymcode, side, strike)),
+                               ("lastday", lastday)]))
+        f.write("</DocumentElement>\n")
+    return len(strikes)
+
+
+def generate(out_dir: str, ymcodes: int = 2, strikes: int = 20, ticks_per_contract: int = 500,
+             days: int = 1, start_date: str = "2025-12-01", start_ym: str = "202601",
+             spot: float = 350.0, vol: float = 0.2, seed: int = 42) -> Dict[str, Any]:
+    """Write TICK/CODE XML files in the layout ingest_xml_to_bronze.py expects.
+
+    Files: ``{ymcode}_{yyyymmdd}_TICK_{CALL|PUT}.xml`` per trading day and
+    ``{ymcode}_{yyyymmdd}_CODE_{CALL|PUT}.xml`` once per ymcode. All
+    contracts of a day share one underlying path, so prices are coherent
+    across strikes, sides and months. Returns row/file/byte counts.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rng = random.Random(seed)
+    day_list = business_days(date.fromisoformat(start_date), days)
+    yms = [add_months(start_ym, k) for k in range(ymcodes)]
+    stats = {"tick_rows": 0, "code_rows": 0, "files": 0, "bytes": 0, "days": len(day_list), "ymcodes": yms}
+
+    s = spot
+    for day in day_list:
+        path_s = underlying_path(rng, s, vol)
+        s = path_s[-1]
+        atm = int(round(path_s[0] / STRIKE_STEP) * STRIKE_STEP)
+        chain = [atm + STRIKE_STEP * (i - strikes // 2) for i in range(strikes)]
+        for ym in yms:
+            if last_trading_day(ym) < day:
+                continue
+            for side in ("CALL", "PUT"):
+                p = os.path.join(out_dir, f"{ym}_{day:%Y%m%d}_TICK_{side}.xml")
+                stats["tick_rows"] += write_tick_file(p, rng, ym, side, day, chain, ticks_per_contract, path_s, vol)
+                stats["files"] += 1
+                stats["bytes"] += os.path.getsize(p)
+
+    atm0 = int(round(spot / STRIKE_STEP) * STRIKE_STEP)
+    code_strikes = [atm0 + STRIKE_STEP * i for i in range(-strikes, strikes + 1)]
+    for ym in yms:
+        for side in ("CALL", "PUT"):
+            p = os.path.join(out_dir, f"{ym}_{day_list[0]:%Y%m%d}_CODE_{side}.xml")
+            stats["code_rows"] += write_code_file(p, ym, side, day_list[0], code_strikes)
+            stats["files"] += 1
+            stats["bytes"] += os.path.getsize(p)
+    return stats
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--out-dir", required=True)
+    ap.add_argument("--ymcodes", type=int, default=2)
+    ap.add_argument("--strikes", type=int, default=20)
+    ap.add_argument("--ticks-per-contract", type=int, default=500, help="per contract per day")
+    ap.add_argument("--days", type=int, default=1)
+    ap.add_argument("--start-date", default="2025-12-01")
+    ap.add_argument("--start-ym", default="202601")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    stats = generate(args.out_dir, args.ymcodes, args.strikes, args.ticks_per_contract, args.days,
+                     args.start_date, args.start_ym, seed=args.seed)
+    print(f"OK: {stats['tick_rows']} tick rows, {stats['code_rows']} code rows, "
+          f"{stats['files']} files, {stats['bytes'] / 2**20:.1f} MB -> {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
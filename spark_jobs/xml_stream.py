@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import argparse
+import os
+import time
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterator, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+# ingest_xml_to_bronze.TICK_SCHEMA / CODE_SCHEMA 와 같은 컬럼/타입 (Spark 없이 쓰기 위해 Arrow로 따로 정의)
+TICK_ARROW_SCHEMA = pa.schema([
+    pa.field("ymcode", pa.string()),
+    pa.field("code", pa.string()),
+    pa.field("strike", pa.int32()),
+    pa.field("idate", pa.int32()),
+    pa.field("itime", pa.int32()),
+    pa.field("tdate", pa.timestamp("us", tz="UTC")),
+    pa.field("tcnt", pa.int64()),
+    pa.field("c", pa.float64()),
+    pa.field("o", pa.float64()),
+    pa.field("h", pa.float64()),
+    pa.field("l", pa.float64()),
+    pa.field("oi", pa.float64()),
+    pa.field("ccnt", pa.int64()),
+])
+
+CODE_ARROW_SCHEMA = pa.schema([
+    pa.field("ymcode", pa.string()),
+    pa.field("code", pa.string()),
+    pa.field("lastday", pa.int32()),
+])
+
+SCHEMAS = {"tick": TICK_ARROW_SCHEMA, "code": CODE_ARROW_SCHEMA}
+
+# .NET DataSet.WriteXml(WriteSchema) 가 앞에 붙이는 인라인 XSD 는 행이 아님
+_XSD_NS = "{http://www.w3.org/2001/XMLSchema}"
+
+
+def detect_row_tag(xml_path: str) -> str:
+    """Tag of the first row element (first child of the root), reading only the file head."""
+    depth = 0
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2 and not elem.tag.startswith(_XSD_NS):
+                return elem.tag
+        else:
+            depth -= 1
+    raise ValueError(f"no row elements in {xml_path}")
+
+
+def _parse_int(s: str) -> Optional[int]:
+    try:
+        return int(s)
+    except ValueError:
+        return None
+
+
+def _parse_float(s: str) -> Optional[float]:
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _parse_ts(s: str) -> Optional[datetime]:
+    # tdate 는 KST 오프셋(+09:00) 포함 ISO 8601 → UTC 로 저장. 오프셋이 없으면 UTC 로 간주 (spark.sql.session.timeZone=UTC)
+    try:
+        dt = datetime.fromisoformat(s)
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _converter(t: pa.DataType) -> Callable[[str], object]:
+    if pa.types.is_integer(t):
+        return _parse_int
+    if pa.types.is_floating(t):
+        return _parse_float
+    if pa.types.is_timestamp(t):
+        return _parse_ts
+    return lambda s: s
+
+
+def _to_array(raw: List[Optional[str]], t: pa.DataType) -> pa.Array:
+    # 배치 단위 Arrow cast (C++) 가 빠른 경로; 빈 값/형식 오류/오프셋 없는 시각이 섞이면 값별 변환
+    arr = pa.array(raw, type=pa.string())
+    if pa.types.is_string(t):
+        return arr
+    try:
+        return arr.cast(t)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        conv = _converter(t)
+        return pa.array([None if s is None or not s.strip() else conv(s.strip()) for s in raw], type=t)
+
+
+def iter_record_batches(xml_path: str, schema: pa.Schema, row_tag: Optional[str] = None,
+                        batch_size: int = 65_536) -> Iterator[pa.RecordBatch]:
+    """Stream rows of a DataSet-style XML file as typed Arrow record batches.
+
+    One ``iterparse`` pass; each row element is converted and then dropped
+    from the tree (``root.clear()``), so memory stays bounded by
+    ``batch_size`` rows regardless of file size. Row fields are child
+    elements (or attributes) named like the schema columns; unknown fields
+    are ignored, missing or unparsable values become null (like spark-xml's
+    PERMISSIVE mode).
+    """
+    names = schema.names
+    index: Dict[str, int] = {n: i for i, n in enumerate(names)}
+    cols: List[List[Optional[str]]] = [[] for _ in names]
+    n = 0
+
+    def flush() -> pa.RecordBatch:
+        arrays = [_to_array(col, f.type) for col, f in zip(cols, schema)]
+        for col in cols:
+            col.clear()
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    depth = 0
+    root = None
+    for event, elem in ET.iterparse(xml_path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if root is None:
+                root = elem
+            elif depth == 2 and row_tag is None and not elem.tag.startswith(_XSD_NS):
+                row_tag = elem.tag
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        if elem.tag == row_tag:
+            row: List[Optional[str]] = [None] * len(names)
+            for k, v in elem.attrib.items():
+                i = index.get(k)
+                if i is not None:
+                    row[i] = v
+            for child in elem:
+                i = index.get(child.tag)
+                if i is not None:
+                    row[i] = child.text
+            for col, v in zip(cols, row):
+                col.append(v)
+            n += 1
+            if n == batch_size:
+                yield flush()
+                n = 0
+        # 처리한 행(과 XSD 등)은 트리에서 제거 → 메모리 일정
+        root.clear()
+    if n:
+        yield flush()
+
+
+def with_constants(batch: pa.RecordBatch, **consts) -> pa.RecordBatch:
+    """Append constant columns (src_file, side, ingest_ts, ...) to a batch."""
+    arrays = list(batch.columns)
+    fields = list(batch.schema)
+    for name, value in consts.items():
+        arr = pa.array([value] * batch.num_rows)
+        arrays.append(arr)
+        fields.append(pa.field(name, arr.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def stage_to_parquet(xml_path: str, out_path: str, kind: str, side: str, ingest_ts: datetime,
+                     batch_size: int = 65_536) -> int:
+    """Write one XML file as a Parquet staging file with bronze columns; returns row count."""
+    consts = {
+        "src_file": os.path.basename(xml_path),
+        "side": side,
+        "ingest_ts": ingest_ts,
+    }
+    rows = 0
+    writer = None
+    try:
+        for batch in iter_record_batches(xml_path, SCHEMAS[kind], batch_size=batch_size):
+            batch = with_constants(batch, **consts)
+            if writer is None:
+                writer = pq.ParquetWriter(out_path, batch.schema, compression="zstd")
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--xml", required=True)
+    ap.add_argument("--kind", required=True, choices=sorted(SCHEMAS))
+    ap.add_argument("--side", required=True, choices=["CALL", "PUT"])
+    ap.add_argument("--out", required=True, help="Parquet staging file")
+    ap.add_argument("--batch-size", type=int, default=65_536)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    rows = stage_to_parquet(args.xml, args.out, args.kind, args.side,
+                            datetime.now(timezone.utc), batch_size=args.batch_size)
+    dt = time.perf_counter() - t0
+    print(f"OK: {rows} rows -> {args.out} ({rows / max(dt, 1e-9):,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import glob
+import os
+
+import pyarrow.parquet as pq
+
+from runtime import decision_log
+from runtime.decision_log import DecisionLogWriter
+
+
+def _out(i):
+    return {"key": f"k{i}", "ok": True, "pred": 0.1 * i, "decision": "HOLD", "reason": None}
+
+
+def test_writer_keeps_draining_after_write_error(tmp_path, monkeypatch):
+    real = decision_log.pq.ParquetWriter
+    calls = {"n": 0}
+
+    class FlakyWriter(real):
+        def write_table(self, table, *args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] == 1:
+                raise OSError("disk full")
+            return super().write_table(table, *args, **kwargs)
+
+    monkeypatch.setattr(decision_log.pq, "ParquetWriter", FlakyWriter)
+    w = DecisionLogWriter(str(tmp_path), batch_size=3, flush_interval_s=1.0, on_full="block")
+    for i in range(3):
+        assert w.log(_out(i), "1")
+    # 첫 배치 실패 후에도 쓰기 스레드가 살아서 다음 기록을 처리
+    while w.stats["write_errors"] == 0:
+        assert w._thread.is_alive()
+        w._thread.join(0.01)
+    for i in range(3, 8):
+        assert w.log(_out(i), "1")
+    w.close()
+
+    assert w.stats["write_errors"] == 1 and w.stats["failed"] == 3
+    assert w.stats["written"] == 5
+    files = glob.glob(os.path.join(str(tmp_path), "decisions-*.parquet"))
+    assert sum(pq.read_table(f).num_rows for f in files) == 5
+    assert sorted(k for f in files for k in pq.read_table(f).column("key").to_pylist()) == [
+        f"k{i}" for i in range(3, 8)
+    ]
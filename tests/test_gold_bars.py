@@ -0,0 +1,110 @@
+from datetime import date, datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("pyspark")
+
+from pyspark.sql import SparkSession, functions as F, types as T  # noqa: E402
+
+from spark_jobs.bench_gold_bars import build_bars_windowed  # noqa: E402
+from spark_jobs.features_silver_to_gold import build_bars  # noqa: E402
+
+SILVER_SCHEMA = T.StructType([
+    T.StructField("ymcode", T.StringType()),
+    T.StructField("side", T.StringType()),
+    T.StructField("code", T.StringType()),
+    T.StructField("strike", T.IntegerType()),
+    T.StructField("ts", T.TimestampType()),
+    T.StructField("tcnt", T.LongType()),
+    T.StructField("price", T.DoubleType()),
+    T.StructField("open", T.DoubleType()),
+    T.StructField("high", T.DoubleType()),
+    T.StructField("low", T.DoubleType()),
+    T.StructField("oi", T.DoubleType()),
+    T.StructField("ccnt", T.LongType()),
+    T.StructField("trade_date", T.DateType()),
+    T.StructField("minute_ts", T.TimestampType()),
+])
+
+T0 = datetime(2025, 12, 1, 9, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture(scope="module")
+def spark():
+    s = (
+        SparkSession.builder.master("local[2]").appName("test_gold_bars")
+        .config("spark.sql.session.timeZone", "UTC")
+        .config("spark.sql.shuffle.partitions", "4")
+        .config("spark.ui.enabled", "false")
+        .getOrCreate()
+    )
+    yield s
+    s.stop()
+
+
+def _tick(code, minute, second, tcnt, price, open_=None, oi=None, strike=400):
+    ts = T0 + timedelta(minutes=minute, seconds=second)
+    high, low = (None, None) if price is None else (price + 0.01, price - 0.01)
+    return ("202601", "CALL", code, strike, ts, tcnt, price, open_, high, low,
+            oi, 1, date(2025, 12, 1), ts.replace(second=0))
+
+
+def _ticks():
+    rows = [
+        # A: 같은 ts 의 틱 3개가 tcnt 로만 구분됨, tcnt 역순으로 들어옴
+        _tick("A", 0, 5, 3, 1.3, open_=1.3, oi=13.0),
+        _tick("A", 0, 5, 1, 1.1, open_=1.1, oi=11.0),
+        _tick("A", 0, 5, 2, 1.2, open_=1.2, oi=12.0),
+        # B: 첫 틱의 open 이 NULL → o 는 NULL (다음 틱의 open 으로 채우지 않음)
+        _tick("B", 0, 1, 1, 2.0, open_=None, oi=20.0),
+        _tick("B", 0, 9, 2, 2.1, open_=2.1, oi=21.0),
+        # C: 틱 하나짜리 바
+        _tick("C", 0, 30, 7, 3.0, open_=3.0, oi=30.0),
+        # D: 마지막 틱의 price/oi 가 NULL → c/oi_last 도 NULL
+        _tick("D", 0, 10, 1, 4.0, open_=4.0, oi=40.0),
+        _tick("D", 0, 50, 2, None, open_=4.2, oi=None),
+    ]
+    # 분이 여러 개인 계약: 같은 ts 동률과 단일 틱 바가 섞임
+    for minute in range(1, 6):
+        for k in range(minute):
+            rows.append(_tick("E", minute, 0 if k < 2 else 40, 10 * minute + (minute - k), 5.0 + 0.1 * k,
+                              open_=5.0 + 0.1 * k, oi=float(k)))
+    return rows
+
+
+def _frame(spark, rows):
+    return spark.createDataFrame(rows, schema=SILVER_SCHEMA)
+
+
+def _collect(df):
+    # (code, "HH:mm") 키: collect 가 돌려주는 naive datetime 은 드라이버 로컬 TZ 기준이라 키로 쓰지 않음
+    df = df.withColumn("hm", F.date_format("bar_ts", "HH:mm"))
+    return {(r["code"], r["hm"]): r.asDict() for r in df.collect()}
+
+
+def test_single_pass_matches_windowed_reference(spark):
+    s = _frame(spark, _ticks())
+    new, old = build_bars(s), build_bars_windowed(s)
+    assert new.schema == old.schema
+    assert new.exceptAll(old).count() == 0 and old.exceptAll(new).count() == 0
+    assert _collect(new) == _collect(old)
+
+
+def test_bar_edge_cases(spark):
+    bars = _collect(build_bars(_frame(spark, _ticks())))
+    bar0 = "09:00"
+
+    a = bars[("A", bar0)]
+    assert (a["o"], a["c"], a["oi_last"], a["tick_count"]) == (1.1, 1.3, 13.0, 3)
+
+    b = bars[("B", bar0)]
+    assert b["o"] is None and (b["c"], b["oi_last"]) == (2.1, 21.0)
+
+    c = bars[("C", bar0)]
+    assert (c["o"], c["h"], c["l"], c["c"], c["oi_last"], c["tick_count"]) == (3.0, 3.01, 2.99, 3.0, 30.0, 1)
+
+    d = bars[("D", bar0)]
+    assert d["o"] == 4.0 and d["c"] is None and d["oi_last"] is None
+
+    e1 = bars[("E", "09:01")]
+    assert e1["tick_count"] == 1 and e1["o"] == e1["c"] == 5.0
@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip("pyspark")
+
+from spark_jobs.ingest_manifest import PENDING, file_sha256, plan_ingest  # noqa: E402
+
+
+def _inputs(tmp_path, names):
+    out = []
+    for n in names:
+        p = tmp_path / n
+        p.write_text(f"<rows>{n}</rows>")
+        out.append((str(p), "tick", "CALL"))
+    return out
+
+
+def test_pending_files_are_reloaded_and_replaced(tmp_path):
+    inputs = _inputs(tmp_path, ["a.xml", "b.xml", "c.xml", "d.xml"])
+    manifest = {
+        "a.xml": file_sha256(inputs[0][0]),   # 적재 완료 → skip
+        "b.xml": PENDING,                     # DELETE/append 도중 중단 → 교체 재적재
+        "c.xml": "0" * 64,                    # 내용 변경 → --force 필요
+    }
+    plan = plan_ingest(inputs, manifest, hash_workers=1)
+    assert plan.skipped == ["a.xml"]
+    assert plan.changed == ["c.xml"]
+    assert plan.pending == ["b.xml"] and plan.replace == ["b.xml"]
+    assert [p for p, _, _ in plan.load] == [inputs[1][0], inputs[3][0]]
+
+
+def test_forced_pending_file_is_not_reported_twice(tmp_path):
+    inputs = _inputs(tmp_path, ["a.xml"])
+    plan = plan_ingest(inputs, {"a.xml": PENDING}, force=["a.*"], hash_workers=1)
+    assert plan.replace == ["a.xml"] and plan.pending == []
@@ -0,0 +1,131 @@
+import math
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+from runtime.agent_runtime import FEATURE_COLS
+from runtime.online_features import OnlineFeatureEngine
+
+ENTITY = ["ymcode", "side", "code", "strike"]
+
+
+def _spark_stddev_samp(w: np.ndarray) -> float:
+    # Spark CentralMomentAgg 갱신식, 행 순서대로 (null 건너뜀)
+    n = avg = m2 = 0.0
+    for x in w:
+        if math.isnan(x):
+            continue
+        n += 1.0
+        delta = x - avg
+        delta_n = delta / n
+        avg += delta_n
+        m2 += delta * (delta - delta_n)
+    return math.sqrt(m2 / (n - 1.0)) if n >= 2.0 else np.nan
+
+
+def _spark_avg(w: np.ndarray) -> float:
+    v = [x for x in w if not math.isnan(x)]
+    s = 0.0
+    for x in v:
+        s += x
+    return s / len(v) if v else np.nan
+
+
+def _div(a: pd.Series, b: pd.Series) -> pd.Series:
+    # Spark(non-ANSI): 0으로 나누기 → null
+    return (a / b.where(b != 0)).astype("float64")
+
+
+def spark_reference(ticks: pd.DataFrame) -> pd.DataFrame:
+    """pandas transcription of features_silver_to_gold (build_bars + feature windows)."""
+    t = ticks.assign(minute_ts=ticks["ts"].dt.floor("min"))
+    t = t.sort_values(ENTITY + ["minute_ts", "ts", "tcnt"], na_position="first", kind="stable")
+    g = t.groupby(ENTITY + ["minute_ts"], sort=True)
+    bars = pd.DataFrame({
+        "o": g["open"].nth(0).to_numpy(),
+        "h": g["high"].max().to_numpy(),
+        "l": g["low"].min().to_numpy(),
+        "c": g["price"].nth(-1).to_numpy(),
+        "oi_last": g["oi"].nth(-1).to_numpy(),
+    }, index=g.size().index).reset_index()
+
+    e = bars.groupby(ENTITY, sort=False)
+    c_lag1, c_lag5 = e["c"].shift(1), e["c"].shift(5)
+    bars["f_ret_1"] = _div(bars["c"], c_lag1) - 1.0
+    bars["f_ret_5"] = _div(bars["c"], c_lag5) - 1.0
+    bars["f_oi_chg_5"] = bars["oi_last"] - e["oi_last"].shift(5)
+    bars["range_1"] = _div(bars["h"] - bars["l"], bars["c"])
+    e = bars.groupby(ENTITY, sort=False)
+    bars["f_vol_20"] = e["f_ret_1"].transform(
+        lambda s: s.rolling(20, min_periods=1).apply(_spark_stddev_samp, raw=True))
+    bars["f_range_5"] = e["range_1"].transform(
+        lambda s: s.rolling(5, min_periods=1).apply(_spark_avg, raw=True))
+    bars["f_spread_proxy"] = bars["f_range_5"]
+    bars["f_iv_proxy"] = bars["f_vol_20"]
+    return bars.rename(columns={"minute_ts": "asof_ts"})
+
+
+def synth_ticks(seed: int = 3) -> list:
+    rng = random.Random(seed)
+    t0 = datetime(2025, 12, 1, 9, 0, tzinfo=timezone.utc)
+    ticks = []
+    for strike in (400, 405, 410):
+        price, oi, tcnt = 1.0 + strike / 1000.0, 1000, 0
+        for minute in range(60):
+            if rng.random() < 0.15:  # 틱 없는 분 (gap)
+                continue
+            base = t0 + timedelta(minutes=minute)
+            for _ in range(rng.randint(1, 6)):
+                ts = base + timedelta(seconds=rng.choice([0, 7, 7, 30, 59]))
+                price = round(max(0.0, price + rng.gauss(0.0, 0.02)), 2)
+                oi += rng.randint(-3, 5)
+                tcnt += 1
+                ticks.append({
+                    "ymcode": "202601", "side": "CALL", "code": f"B016{strike}", "strike": strike,
+                    "ts": ts, "tcnt": tcnt,
+                    "price": 0.0 if rng.random() < 0.03 else price,
+                    "open": None if rng.random() < 0.1 else price,
+                    "high": None if rng.random() < 0.05 else price + 0.01,
+                    "low": price - 0.01, "oi": oi, "ccnt": rng.randint(1, 20),
+                })
+    # ts 순서로 도착, 같은 ts 안에서는 tcnt 역순 (도착 순서와 tcnt 순서가 다름)
+    ticks.sort(key=lambda r: (r["ts"], -r["tcnt"]))
+    return ticks
+
+
+def _val(v):
+    return None if v is None or (isinstance(v, float) and math.isnan(v)) else v
+
+
+def test_engine_matches_spark_reference_exactly():
+    ticks = synth_ticks()
+    eng = OnlineFeatureEngine()
+    rows = []
+    for t in ticks:
+        rows.extend(eng.on_tick(dict(t)))
+    rows.extend(eng.flush())
+    assert eng.late_ticks == 0
+
+    ref = spark_reference(pd.DataFrame(ticks))
+    assert len(rows) == len(ref)
+    by_key = {(r["code"], r["asof_ts"]): r for r in rows}
+    for g in ref.to_dict("records"):
+        r = by_key[(g["code"], g["asof_ts"].to_pydatetime())]
+        for c in ("o", "h", "l", "c", "oi_last"):
+            assert _val(r["bar"][c]) == _val(g[c]), (c, g["asof_ts"])
+        for c in FEATURE_COLS:
+            assert _val(r[c]) == _val(g[c]), (c, g["code"], g["asof_ts"])
+
+
+def test_same_timestamp_ticks_ordered_by_tcnt():
+    ts = datetime(2025, 12, 1, 9, 0, 5, tzinfo=timezone.utc)
+    tick = {"ymcode": "202601", "side": "PUT", "code": "B116", "strike": 400, "ts": ts,
+            "high": 2.0, "low": 1.0, "ccnt": 1}
+    eng = OnlineFeatureEngine()
+    # tcnt 3 → 1 → 2 순서로 도착: open 은 tcnt 1, close/oi 는 tcnt 3
+    for tcnt in (3, 1, 2):
+        eng.on_tick(dict(tick, tcnt=tcnt, open=float(tcnt), price=float(tcnt), oi=tcnt))
+    (row,) = eng.flush()
+    assert (row["bar"]["o"], row["bar"]["c"], row["bar"]["oi_last"]) == (1.0, 3.0, 3)
@@ -0,0 +1,78 @@
+import glob
+import os
+import threading
+
+import lightgbm as lgb
+import numpy as np
+import pyarrow.parquet as pq
+import pytest
+
+from runtime.agent_runtime import FEATURE_COLS, LoadedModel, RuntimeConfig, TradingAgent
+from runtime.feature_codec import FeatureCodec
+
+sharded_runtime = pytest.importorskip("runtime.sharded_runtime")
+
+
+def _stub_agent(cfg: RuntimeConfig) -> TradingAgent:
+    # MLflow/Redis 없이 score_batch 가 도는 최소 에이전트 (네이티브 Booster)
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=(200, len(FEATURE_COLS)))
+    booster = lgb.train({"objective": "regression", "verbose": -1}, lgb.Dataset(x, x[:, 0]), 3)
+    agent = TradingAgent.__new__(TradingAgent)
+    agent.cfg = cfg
+    agent.codec = FeatureCodec(FEATURE_COLS)
+    agent.l1 = None
+    agent.active = LoadedModel(version="7", model=None, booster=booster)
+    agent.decision_log = None
+    agent._reload_thread = None
+    agent._stop_reload = threading.Event()
+    if cfg.decision_log_dir:  # TradingAgent.__init__ 과 동일
+        agent.open_decision_log(cfg.decision_log_dir)
+    return agent
+
+
+class _FakeRuntime:
+    # AsyncAgentRuntime 대신: 구독 없이 키 몇 개를 바로 스코어링하고 종료
+    def __init__(self, agent, cfg, on_decision=None):
+        self.agent = agent
+        self.cfg = cfg
+        self.stats = {"scored": 0}
+
+    def stop(self):
+        pass
+
+    async def run(self):
+        keys = [f"options:202601:CALL:B016{i}:{400 + i}:2025-12-01T10:05:00Z" for i in range(5)]
+        feats = [{c: 0.01 * i for c in FEATURE_COLS} for i in range(5)]
+        self.stats["scored"] += len(self.agent.score_batch(keys, feats))
+        return self.stats
+
+
+def test_forked_worker_writes_its_own_decision_log(tmp_path, monkeypatch):
+    monkeypatch.setattr(sharded_runtime, "TradingAgent", _stub_agent)
+    monkeypatch.setattr(sharded_runtime, "AsyncAgentRuntime", _FakeRuntime)
+    log_dir = str(tmp_path / "decisions")
+    threading_before = threading.active_count()
+
+    sup = sharded_runtime.ShardSupervisor(
+        RuntimeConfig(decision_log_dir=log_dir, decision_log_on_full="block"),
+        sharded_runtime.AsyncRuntimeConfig(source="channel"),
+        n_workers=2,
+        report_interval_s=60.0,
+        quiet=True,
+    )
+    # 부모(supervisor)에는 writer 스레드가 없어야 함
+    assert sup.agent.decision_log is None
+    assert threading.active_count() == threading_before
+
+    sup._spawn(1)
+    sup.procs[1].join(timeout=60)
+    assert sup.procs[1].exitcode == 0
+
+    files = glob.glob(os.path.join(log_dir, "decisions-shard1-*.parquet"))
+    assert len(files) == 1
+    assert not glob.glob(os.path.join(log_dir, "*.inprogress"))
+    t = pq.read_table(files[0])
+    assert t.num_rows == 5
+    assert set(t.column("model_version").to_pylist()) == {"7"}
+    assert all(t.column("ok").to_pylist())
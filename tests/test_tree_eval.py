@@ -0,0 +1,138 @@
+import lightgbm as lgb
+import numpy as np
+import pytest
+
+from runtime.tree_eval import FlatTrees
+
+N_FEATURES = 5
+
+
+def _data(seed: int = 0, n: int = 3000):
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 1.0, size=(n, N_FEATURES))
+    x[:, 4] = rng.integers(0, 12, size=n)  # 범주형으로 쓸 열
+    y = x[:, 0] - 0.5 * x[:, 1] + np.where(np.isin(x[:, 4], [1, 4, 7]), 1.0, -0.3) + rng.normal(0, 0.1, n)
+    return x, y
+
+
+def _probe_rows(seed: int = 1, n: int = 2000) -> np.ndarray:
+    # 결측·0·범주 경계값을 고르게 섞은 평가 행
+    rng = np.random.default_rng(seed)
+    x = rng.normal(0.0, 1.0, size=(n, N_FEATURES))
+    x[:, 4] = rng.choice([0, 1, 4, 7, 11, 12, 30, -1, -0.5, 0.5, 3.9, 1e10, np.inf], size=n)
+    x[rng.random(x.shape) < 0.1] = np.nan
+    x[rng.random(x.shape) < 0.1] = 0.0
+    x[rng.random(x.shape) < 0.02] = 1e-36  # kZeroThreshold 이하
+    return x
+
+
+def _train(x, y, rounds=30, categorical=(), **params):
+    params = dict({"objective": "regression", "verbose": -1, "num_leaves": 15, "min_data_in_leaf": 5}, **params)
+    return lgb.train(params, lgb.Dataset(x, y, categorical_feature=list(categorical)), rounds)
+
+
+def _split_kinds(booster):
+    kinds = set()
+
+    def walk(n):
+        if "leaf_value" in n:
+            return
+        kinds.add((n["decision_type"], n["missing_type"], n["default_left"]))
+        walk(n["left_child"])
+        walk(n["right_child"])
+
+    for t in booster.dump_model()["tree_info"]:
+        walk(t["tree_structure"])
+    return kinds
+
+
+def _assert_exact(booster, x):
+    trees = FlatTrees.from_booster(booster)
+    expected = booster.predict(x)
+    assert np.array_equal(trees.predict(x), expected)
+    # 한 행씩 (런타임 predict_fast 경로)
+    for row in x[:50]:
+        assert trees.predict(row.reshape(1, -1))[0] == booster.predict(row.reshape(1, -1))[0]
+
+
+def test_nan_missing_with_default_left():
+    x, y = _data()
+    x[np.random.default_rng(2).random(x.shape) < 0.2] = np.nan
+    booster = _train(x, y)
+    kinds = _split_kinds(booster)
+    assert ("<=", "NaN", True) in kinds and ("<=", "NaN", False) in kinds
+    _assert_exact(booster, _probe_rows())
+
+
+def test_zero_as_missing():
+    x, y = _data()
+    x[np.random.default_rng(3).random(x.shape) < 0.2] = 0.0
+    booster = _train(x, y, zero_as_missing=True)
+    assert any(mt == "Zero" for _, mt, _ in _split_kinds(booster))
+    _assert_exact(booster, _probe_rows())
+
+
+def test_missing_disabled_treats_nan_as_zero():
+    x, y = _data()
+    booster = _train(x, y, use_missing=False)
+    assert {mt for _, mt, _ in _split_kinds(booster)} == {"None"}
+    _assert_exact(booster, _probe_rows())
+
+
+def test_categorical_splits():
+    x, y = _data()
+    x[np.random.default_rng(4).random(x.shape) < 0.1] = np.nan
+    booster = _train(x, y, categorical=[4], min_data_per_group=5, cat_smooth=1.0)
+    assert any(dt == "==" for dt, _, _ in _split_kinds(booster))
+    _assert_exact(booster, _probe_rows())
+
+
+def test_single_leaf_trees():
+    x, _ = _data()
+    # 상수 라벨: 분기 없는 잎 하나짜리 트리
+    const = _train(x, np.full(len(x), 0.25), rounds=5)
+    assert all("leaf_value" in t["tree_structure"] for t in const.dump_model()["tree_info"])
+    _assert_exact(const, _probe_rows())
+
+    # 잎 하나짜리 트리 뒤에 일반 트리가 이어지는 모델 (init_model 로 이어서 학습)
+    x2, y2 = _data(seed=5)
+    mixed = lgb.train({"objective": "regression", "verbose": -1, "num_leaves": 7},
+                      lgb.Dataset(x2, y2), 10, init_model=const)
+    info = mixed.dump_model()["tree_info"]
+    assert "leaf_value" in info[0]["tree_structure"] and "leaf_value" not in info[-1]["tree_structure"]
+    _assert_exact(mixed, _probe_rows())
+
+
+def test_deep_trees_with_many_leaves():
+    x, y = _data(n=20000)
+    booster = _train(x, y, rounds=5, num_leaves=150, min_data_in_leaf=2)
+    assert max(t["num_leaves"] for t in booster.dump_model()["tree_info"]) > 64
+    assert int(FlatTrees.from_booster(booster).arrays["max_depth"]) > 8
+    _assert_exact(booster, _probe_rows())
+
+
+def test_saved_arrays_round_trip(tmp_path):
+    x, y = _data()
+    x[np.random.default_rng(6).random(x.shape) < 0.1] = np.nan
+    booster = _train(x, y, categorical=[4], min_data_per_group=5, cat_smooth=1.0)
+    path = str(tmp_path / "flat_trees.npz")
+    FlatTrees.from_booster(booster).save(path)
+    probe = _probe_rows()
+    assert np.array_equal(FlatTrees.load(path).predict(probe), booster.predict(probe))
+
+
+def test_stale_arrays_rejected(tmp_path):
+    x, y = _data()
+    arrays = dict(FlatTrees.from_booster(_train(x, y, rounds=3)).arrays)
+    del arrays["cat_bits"]
+    path = str(tmp_path / "flat_trees.npz")
+    np.savez(path, **arrays)
+    with pytest.raises(ValueError):
+        FlatTrees.load(path)
+
+
+def test_unsupported_objective_rejected():
+    x, y = _data()
+    booster = _train(x, (y > 0).astype(float), rounds=3, objective="binary")
+    with pytest.raises(ValueError):
+        FlatTrees.from_booster(booster)